@@ -1,6 +1,7 @@
 import logging
 
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -17,7 +18,7 @@ from rest_framework.views import APIView
 
 from users.models import Profile
 from users.api.views import _LenientPaginatorMixin
-from users.notifications import send_push_notification
+from users.notifications import queue_notification
 from bookings.models import Engagement, Payment
 from bookings.services.payments import PaymentService
 from .serializers import (
@@ -135,13 +136,14 @@ class CreateHireRequestAPIView(APIView):
                 {"detail": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        engagement.save()
-        send_push_notification(
-            user=performer_profile.user,
-            title="New hire request!",
-            body=f"{request.user.username} wants to book you for {engagement.occasion}",
-            data={"screen": "Bookings", "id": engagement.pk},
-        )
+        with transaction.atomic():
+            engagement.save()
+            queue_notification(
+                user=performer_profile.user,
+                title="New hire request!",
+                body=f"{request.user.username} wants to book you for {engagement.occasion}",
+                data={"screen": "Bookings", "id": engagement.pk},
+            )
         return Response(
             EngagementSerializer(engagement).data, status=status.HTTP_201_CREATED
         )
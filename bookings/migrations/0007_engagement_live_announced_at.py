@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:27
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_announced(apps, schema_editor):
+    """Everything accepted so far was broadcast inline already."""
+    Engagement = apps.get_model("bookings", "Engagement")
+    Engagement.objects.filter(accepted_at__isnull=False).update(
+        live_announced_at=F("accepted_at")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0006_alter_engagement_payment_status_alter_payment_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="engagement",
+            name="live_announced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_announced, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 # Create your models here.
 
@@ -102,6 +102,10 @@ class Engagement(models.Model):
     refunded_at = models.DateTimeField(null=True, blank=True)
     # Stamped when the RazorpayX payout is fired (payouts mode only).
     payout_initiated_at = models.DateTimeField(null=True, blank=True)
+    # Stamped when the "new live event" digest broadcast announced this
+    # engagement (users.tasks.send_live_event_digest); accepted + null =
+    # still waiting for the next digest.
+    live_announced_at = models.DateTimeField(null=True, blank=True)
 
     # Cancellation (mandatory reason after Phase 3 rewrite)
     cancellation_reason = models.TextField(blank=True)
@@ -295,7 +299,8 @@ class Engagement(models.Model):
               performer+date are cancelled.
 
         Also stamps accepted_at — that timestamp starts the client's
-        payment window (see payment_deadline()).
+        payment window (see payment_deadline()). The accept writes and the
+        client's "booking confirmed" outbox row commit together.
         """
         self._ensure_pending()
         self._ensure_accept_within_24h()
@@ -316,31 +321,33 @@ class Engagement(models.Model):
                 "You already accepted a different event on this date."
             )
 
-        # Cancel other pending requests for same performer + date
-        Engagement.objects.filter(
-            performer=self.performer,
-            date=self.date,
-            status=self.STATUS_PENDING,
-        ).exclude(pk=self.pk).update(status=self.STATUS_CANCELLED_PERFORMER)
-
-        self.status = self.STATUS_ACCEPTED
-        self.accepted_at = timezone.now()
-        self.save(update_fields=["status", "accepted_at"])
-
         # Import here to avoid circular imports (bookings.models ↔ users.models).
-        from users.notifications import send_push_notification
+        from users.notifications import queue_notification
         from users.tasks import notify_new_live_event
 
-        # 1) Private notification to the client: "your booking is confirmed"
-        send_push_notification(
-            user=self.client,
-            title="Booking confirmed!",
-            body=f"{self.performer.username} accepted your booking for {self.occasion} on {self.date.strftime('%b %d')}",
-            data={
-                "screen": "Bookings",
-                "id": self.pk,
-            },
-        )
+        with transaction.atomic():
+            # Cancel other pending requests for same performer + date
+            Engagement.objects.filter(
+                performer=self.performer,
+                date=self.date,
+                status=self.STATUS_PENDING,
+            ).exclude(pk=self.pk).update(status=self.STATUS_CANCELLED_PERFORMER)
+
+            self.status = self.STATUS_ACCEPTED
+            self.accepted_at = timezone.now()
+            self.save(update_fields=["status", "accepted_at"])
+
+            # 1) Private notification to the client: "your booking is
+            #    confirmed" (sent by the outbox dispatcher after commit)
+            queue_notification(
+                user=self.client,
+                title="Booking confirmed!",
+                body=f"{self.performer.username} accepted your booking for {self.occasion} on {self.date.strftime('%b %d')}",
+                data={
+                    "screen": "Bookings",
+                    "id": self.pk,
+                },
+            )
 
         # 2) Broadcast to ALL users: "new live event on ArtKhoj"
         notify_new_live_event.delay(self.pk)
@@ -16,10 +16,10 @@ import hmac
 import logging
 
 from django.conf import settings
-from django.db import transaction
+from django.db import DatabaseError, transaction
 from django.utils import timezone
 
-from users.notifications import send_push_notification
+from users.notifications import queue_notification
 
 from ..models import Engagement, Payment
 from .razorpay_client import get_client
@@ -27,6 +27,20 @@ from .razorpay_client import get_client
 logger = logging.getLogger(__name__)
 
 
+def _queue_notification(user, title, body, data):
+    """
+    Queue a push in the caller's transaction, inside its own savepoint.
+
+    Callers have already moved money, so a failed outbox insert is logged
+    and dropped — it must never roll back the payment-state write around it.
+    """
+    try:
+        with transaction.atomic():
+            queue_notification(user=user, title=title, body=body, data=data)
+    except DatabaseError:
+        logger.exception("Could not queue %r push for user %s", title, user.pk)
+
+
 class PaymentService:
     """Thin layer between bookings/views.py and the razorpay SDK."""
 
@@ -335,18 +349,15 @@ class PaymentService:
             engagement.released_at = timezone.now()
             engagement.save(update_fields=["payment_status", "released_at"])
 
-        # Deferred to commit: the Razorpay unhold above already moved real
-        # money and can't be rolled back, so a failure in the notification
-        # (a malformed 2xx body, the dead-token DELETE) must not unwind the
-        # payment_status/released_at writes along with it.
-        transaction.on_commit(
-            lambda: send_push_notification(
+            # Queued with the released state, so nothing reaches Expo unless
+            # it commits; the helper's savepoint keeps an outbox failure from
+            # unwinding it.
+            _queue_notification(
                 user=engagement.performer,
                 title="Payment sent!",
                 body=f"₹{payment.performer_share} has been sent to your bank account",
                 data={"screen": "Bookings", "id": engagement.pk},
             )
-        )
 
     # ── Payouts mode: ensure a RazorpayX fund account exists ────────
     @staticmethod
@@ -602,16 +613,12 @@ class PaymentService:
             eng.refunded_at = timezone.now()
             eng.save(update_fields=["payment_status", "refunded_at"])
 
-        # Deferred to commit — same reasoning as release_to_performer: the
-        # Razorpay refund above already moved real money.
-        transaction.on_commit(
-            lambda: send_push_notification(
+            _queue_notification(
                 user=engagement.client,
                 title="Refund initiated",
                 body=f"₹{engagement.fee} refund initiated — will be credited within 5-7 days",
                 data={"screen": "Bookings", "id": engagement.pk},
             )
-        )
 
     # ── Webhook signature verification ──────────────────────────────
     @staticmethod
@@ -848,16 +855,11 @@ class PaymentService:
         eng.released_at = timezone.now()
         eng.save(update_fields=["payment_status", "released_at"])
 
-        # Deferred to commit — same reasoning as release_to_performer: this
-        # is driven by RazorpayX's payout.processed webhook, i.e. the money
-        # has already landed in the performer's bank account.
-        transaction.on_commit(
-            lambda: send_push_notification(
-                user=eng.performer,
-                title="Payment sent!",
-                body=f"₹{payment.performer_share} has been sent to your bank account",
-                data={"screen": "Bookings", "id": eng.pk},
-            )
+        _queue_notification(
+            user=eng.performer,
+            title="Payment sent!",
+            body=f"₹{payment.performer_share} has been sent to your bank account",
+            data={"screen": "Bookings", "id": eng.pk},
         )
 
     @staticmethod
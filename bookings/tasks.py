@@ -26,6 +26,8 @@ from celery import shared_task
 from django.conf import settings
 from django.utils import timezone
 
+from myproject import cache_registry
+
 from .models import Engagement
 from .services.payments import PaymentService
 
@@ -55,6 +57,11 @@ def expire_unpaid_engagements() -> int:
         Engagement.objects.filter(pk__in=to_expire).update(
             status=Engagement.STATUS_AUTO_EXPIRED
         )
+        # .update() skips post_save — drop them from the live-events pages
+        # and performer gig counts explicitly.
+        cache_registry.invalidate(
+            [e for e in candidates if e.pk in to_expire], update_fields={"status"}
+        )
 
     expired_count = len(to_expire)
     logger.info(
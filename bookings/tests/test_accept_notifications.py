@@ -3,7 +3,7 @@ Tests that Engagement.accept() fires both notifications:
 1) a direct "booking confirmed" push to the client
 2) a broadcast "new live event" push to everyone else, via Celery
 
-send_push_notification and notify_new_live_event.delay are monkey-patched
+queue_notification and notify_new_live_event.delay are monkey-patched
 so these tests never touch Expo's API or a real Celery broker.
 """
 
@@ -18,7 +18,7 @@ class TestAcceptNotifications:
         self, engagement, client_user, monkeypatch
     ):
         mock_send = MagicMock()
-        monkeypatch.setattr("users.notifications.send_push_notification", mock_send)
+        monkeypatch.setattr("users.notifications.queue_notification", mock_send)
         monkeypatch.setattr("users.tasks.notify_new_live_event.delay", MagicMock())
 
         engagement.accept()
@@ -32,7 +32,7 @@ class TestAcceptNotifications:
         assert kwargs["data"] == {"screen": "Bookings", "id": engagement.pk}
 
     def test_accept_broadcasts_new_live_event_via_celery(self, engagement, monkeypatch):
-        monkeypatch.setattr("users.notifications.send_push_notification", MagicMock())
+        monkeypatch.setattr("users.notifications.queue_notification", MagicMock())
         mock_delay = MagicMock()
         monkeypatch.setattr("users.tasks.notify_new_live_event.delay", mock_delay)
 
@@ -3,7 +3,7 @@ Tests for the "new hire request" push notification trigger (issue #81,
 remaining trigger #3) — must fire from BOTH the web view and the API view,
 since they're two independent entry points to the same action.
 
-send_push_notification is monkey-patched in each module it's imported into
+queue_notification is monkey-patched in each module it's imported into
 so these tests never touch Expo's API.
 """
 
@@ -22,7 +22,7 @@ from bookings.models import Engagement
 class TestCreateHireRequestWebNotifies:
     def test_notifies_performer(self, client_user, performer_user, monkeypatch):
         mock_send = MagicMock()
-        monkeypatch.setattr("bookings.views.send_push_notification", mock_send)
+        monkeypatch.setattr("bookings.views.queue_notification", mock_send)
 
         web_client = DjangoTestClient()
         web_client.force_login(client_user)
@@ -49,7 +49,7 @@ class TestCreateHireRequestWebNotifies:
 class TestCreateHireRequestAPINotifies:
     def test_notifies_performer(self, client_user, performer_user, monkeypatch):
         mock_send = MagicMock()
-        monkeypatch.setattr("bookings.api.views.send_push_notification", mock_send)
+        monkeypatch.setattr("bookings.api.views.queue_notification", mock_send)
 
         token = Token.objects.create(user=client_user)
         api_client = APIClient()
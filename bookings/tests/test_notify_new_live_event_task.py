@@ -1,25 +1,49 @@
 """
-Tests for the notify_new_live_event Celery task (users/tasks.py).
+Tests for the notify_new_live_event / send_live_event_digest Celery tasks
+(users/tasks.py).
 
-We call the task function directly (no Celery worker needed).
-broadcast_push_notification is monkey-patched so these tests never touch
-Expo's API — they only verify the task builds the right call.
+We call the task functions directly (no Celery worker needed).
+fan_out_broadcast is monkey-patched so these tests never touch
+Expo's API — they only verify the tasks build the right call.
 """
 
+from datetime import date, time, timedelta
 from unittest.mock import MagicMock
 
 import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
 
-from users.tasks import notify_new_live_event
+from bookings.models import Engagement
+from users.tasks import notify_new_live_event, send_live_event_digest
+
+
+def _accept(engagement):
+    Engagement.objects.filter(pk=engagement.pk).update(
+        status=Engagement.STATUS_ACCEPTED, accepted_at=timezone.now()
+    )
+
+
+@pytest.fixture
+def mock_broadcast(monkeypatch):
+    mock = MagicMock()
+    monkeypatch.setattr("users.tasks.fan_out_broadcast", mock)
+    return mock
+
+
+@pytest.fixture
+def no_window(settings):
+    settings.LIVE_EVENT_DIGEST = {"WINDOW_SECONDS": 0}
 
 
 @pytest.mark.django_db
+@pytest.mark.usefixtures("no_window")
 class TestNotifyNewLiveEvent:
     def test_broadcasts_with_performer_excluded(
-        self, engagement, performer_user, monkeypatch
+        self, engagement, performer_user, mock_broadcast
     ):
-        mock_broadcast = MagicMock()
-        monkeypatch.setattr("users.tasks.broadcast_push_notification", mock_broadcast)
+        _accept(engagement)
 
         notify_new_live_event(engagement.pk)
 
@@ -31,10 +55,87 @@ class TestNotifyNewLiveEvent:
         assert engagement.occasion in kwargs["body"]
         assert kwargs["data"] == {"screen": "LiveEvents"}
 
-    def test_missing_engagement_is_a_noop(self, db, monkeypatch):
-        mock_broadcast = MagicMock()
-        monkeypatch.setattr("users.tasks.broadcast_push_notification", mock_broadcast)
-
+    def test_missing_engagement_is_a_noop(self, db, mock_broadcast):
         notify_new_live_event(999999)
 
         mock_broadcast.assert_not_called()
+
+    def test_each_event_is_announced_once(self, engagement, mock_broadcast):
+        _accept(engagement)
+
+        notify_new_live_event(engagement.pk)
+        notify_new_live_event(engagement.pk)
+
+        mock_broadcast.assert_called_once()
+        engagement.refresh_from_db()
+        assert engagement.live_announced_at is not None
+
+
+@pytest.mark.django_db
+class TestLiveEventDigest:
+    @pytest.fixture(autouse=True)
+    def window(self, settings):
+        settings.LIVE_EVENT_DIGEST = {"WINDOW_SECONDS": 120}
+        cache.clear()
+
+    def _more_events(self, client_user, n):
+        events = []
+        for i in range(n):
+            performer = User.objects.create_user(f"act{i}", password="x")
+            events.append(
+                Engagement.objects.create(
+                    client=client_user,
+                    performer=performer,
+                    date=date.today() + timedelta(days=5 + i),
+                    time=time(20, 0),
+                    venue="Venue",
+                    occasion=f"Show {i}",
+                    fee=1000,
+                )
+            )
+        return events
+
+    def test_burst_schedules_one_digest(self, engagement, monkeypatch):
+        schedule = MagicMock()
+        monkeypatch.setattr("users.tasks.send_live_event_digest.apply_async", schedule)
+
+        for _ in range(3):
+            notify_new_live_event(engagement.pk)
+
+        schedule.assert_called_once_with(countdown=120)
+
+    def test_digest_merges_the_window(
+        self, engagement, client_user, mock_broadcast, monkeypatch
+    ):
+        monkeypatch.setattr(
+            "users.tasks.send_live_event_digest.apply_async", MagicMock()
+        )
+        events = [engagement, *self._more_events(client_user, 2)]
+        for e in events:
+            _accept(e)
+            notify_new_live_event(e.pk)
+
+        send_live_event_digest()
+
+        mock_broadcast.assert_called_once()
+        _, kwargs = mock_broadcast.call_args
+        assert kwargs["title"] == "3 new live events!"
+        assert kwargs["body"] == "performer1, act0 and 1 more are performing soon"
+        assert kwargs["exclude_user"] is None
+        assert not Engagement.objects.filter(live_announced_at__isnull=True).exists()
+
+        # The next accept opens a new window instead of riding the old one.
+        mock_broadcast.reset_mock()
+        assert send_live_event_digest() == "nothing to announce"
+        mock_broadcast.assert_not_called()
+        assert notify_new_live_event(engagement.pk).startswith("digest scheduled")
+
+    def test_cancelled_before_digest_is_skipped(self, engagement, mock_broadcast):
+        _accept(engagement)
+        Engagement.objects.filter(pk=engagement.pk).update(
+            status=Engagement.STATUS_CANCELLED_PERFORMER
+        )
+
+        send_live_event_digest()
+
+        mock_broadcast.assert_not_called()
@@ -8,20 +8,20 @@ remaining triggers #4 and #5):
       webhook — release_to_performer() only *starts* the payout there)
 - Refund initiated -> notify client, fired from refund_to_client()
 
-send_push_notification is monkey-patched so these tests never touch Expo's
+queue_notification is monkey-patched so these tests never touch Expo's
 API, and mock_razorpay/mock_razorpayx keep them off the real Razorpay APIs.
 
-All three send sites are wrapped in transaction.on_commit() (money already
-moved by the time they fire, so a notification failure must not roll back
-the payment-state write) — tests that expect the notification to actually
-fire use the django_capture_on_commit_callbacks fixture to run those
-deferred callbacks, since pytest-django wraps each test in a transaction
-that's rolled back, not committed.
+All three sites queue the notification (NotificationOutbox) in the same
+transaction as the payment-state write, so nothing talks to Expo before
+the money state has committed — and inside a savepoint: money already
+moved by then, so a notification failure must not roll back the
+payment-state write.
 """
 
 from unittest.mock import MagicMock
 
 import pytest
+from django.db import DatabaseError
 
 from bookings.models import Engagement, Payment
 from bookings.services.payments import PaymentService
@@ -30,7 +30,7 @@ from bookings.services.payments import PaymentService
 @pytest.fixture
 def mock_send(monkeypatch):
     mock = MagicMock()
-    monkeypatch.setattr("bookings.services.payments.send_push_notification", mock)
+    monkeypatch.setattr("bookings.services.payments.queue_notification", mock)
     return mock
 
 
@@ -175,6 +175,28 @@ class TestRefundToClientNotifies:
         assert kwargs["user"] == engagement.client
         assert str(engagement.fee) in kwargs["body"]
 
+    def test_queue_failure_does_not_roll_back_the_refund(
+        self, engagement, mock_razorpay, mock_send
+    ):
+        engagement.payment_status = Engagement.PAYMENT_PAID
+        engagement.save()
+        Payment.objects.create(
+            engagement=engagement,
+            amount=2000,
+            razorpay_order_id="order_X",
+            razorpay_payment_id="pay_Y",
+            status="captured",
+        )
+        mock_razorpay.payment.refund.return_value = {"id": "rfnd_XYZ"}
+        mock_send.side_effect = DatabaseError("outbox unavailable")
+
+        PaymentService.refund_to_client(engagement)
+
+        mock_send.assert_called_once()
+        engagement.refresh_from_db()
+        assert engagement.payment_status == Engagement.PAYMENT_REFUNDED
+        assert Payment.objects.get(engagement=engagement).status == "refunded"
+
     def test_does_not_notify_if_not_paid(self, engagement, mock_razorpay, mock_send):
         PaymentService.refund_to_client(engagement)  # status=unpaid, no-op
 
@@ -8,16 +8,17 @@ from django.shortcuts import render
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
 from django.db.models import Prefetch
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-from django.core.cache import cache
+from myproject.cache_fill import cached
 from django.views.decorators.http import require_POST
 
 from users.models import Profile
-from users.notifications import send_push_notification
+from users.notifications import queue_notification
 from .forms import EngagementRequestForm, CancelEngagementForm, DisputeForm
 from .models import Engagement, Payment
 from .services.payments import PaymentService
@@ -60,9 +61,10 @@ def create_hire_request(request, performer_id):
         return redirect("profile-detail", user_id=performer_profile.user.id)
 
     # Stats for the hire-card footer — cached 5 min (slowly-changing data).
-    stats = cache.get("hire_form:stats")
-    if stats is None:
-        stats = {
+    stats = cached(
+        "hire_form:stats",
+        300,
+        lambda: {
             "total_events": Engagement.objects.filter(
                 status=Engagement.STATUS_ACCEPTED
             ).count(),
@@ -74,8 +76,8 @@ def create_hire_request(request, performer_id):
                 .distinct()
                 .count()
             ),
-        }
-        cache.set("hire_form:stats", stats, 300)
+        },
+    )
 
     if request.method == "POST":
         form = EngagementRequestForm(request.POST)
@@ -103,13 +105,14 @@ def create_hire_request(request, performer_id):
                     {"form": form, "performer_profile": performer_profile, **stats},
                 )
 
-            engagement.save()
-            send_push_notification(
-                user=performer_profile.user,
-                title="New hire request!",
-                body=f"{request.user.username} wants to book you for {engagement.occasion}",
-                data={"screen": "Bookings", "id": engagement.pk},
-            )
+            with transaction.atomic():
+                engagement.save()
+                queue_notification(
+                    user=performer_profile.user,
+                    title="New hire request!",
+                    body=f"{request.user.username} wants to book you for {engagement.occasion}",
+                    data={"screen": "Bookings", "id": engagement.pk},
+                )
             messages.success(request, "Hiring request sent.")
             return redirect("bookings:client-engagements")
     else:
@@ -0,0 +1,171 @@
+"""
+Stampede-safe cache fill: single-flight recompute + stale-while-revalidate.
+
+A plain get -> compute -> set lets every greenlet on every pod recompute the
+same query the moment a hot key (feed page 1, upcoming events) expires — or
+the moment cache_registry bumps its generation. That is the Postgres spike
+we see at TTL boundaries in load tests. cached() avoids it three ways:
+
+1. Probabilistic early expiry ("XFetch"): each read may volunteer to refresh
+   a little before the logical expiry, with a probability that grows as
+   expiry approaches and with how slow the value is to compute. Refreshes
+   get spread out instead of landing on the same instant.
+2. Single flight: a refresh first takes a short lock (cache.add — atomic
+   SET NX on Redis) holding a per-call token. Only the lock holder
+   recomputes, and it releases the lock with a compare-and-delete, so a
+   recompute that outlives LOCK_TIMEOUT can't delete the next holder's lock.
+3. Stale-while-revalidate: entries are stored physically longer than their
+   logical TTL, so callers that lose the lock race get the previous value
+   instead of queueing on Postgres. Only a true cold miss (new generation,
+   flushed Redis) makes losers wait, briefly, for the winner's result.
+
+Values are wrapped in a small _Entry envelope; anything else found under the
+key (e.g. a pre-deploy raw value) is treated as a miss. When the L1 tier is
+enabled (myproject.cache_l1), fresh entries are also kept in-process and
+served from there until their logical expiry.
+"""
+
+import logging
+import math
+import random
+import time
+from collections import namedtuple
+from uuid import uuid4
+
+from django.core.cache import cache, caches
+from django_redis.cache import RedisCache
+
+from myproject import cache_l1, redis_client
+
+log = logging.getLogger(__name__)
+
+# How long a stale value may still be served after its logical TTL, as a
+# multiple of that TTL.
+STALE_GRACE_FACTOR = 1
+# XFetch aggressiveness. 1.0 is the paper's recommended default; >1 refreshes
+# earlier, 0 disables early refresh.
+BETA = 1.0
+# Lock lifetime — bounds how long a crashed recompute can block others.
+LOCK_TIMEOUT = 10
+# Cold-miss waiters poll this often, up to LOCK_TIMEOUT, before computing
+# themselves. time.sleep yields under gevent.
+WAIT_INTERVAL = 0.05
+
+_Entry = namedtuple("_Entry", ["value", "delta", "expires_at"])
+
+# Delete KEYS[1] only while it still holds our token (ARGV[1]).
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _lock_token():
+    # An int, because django-redis stores ints as plain digits (everything
+    # else is pickled) — so the Lua script can compare it as-is.
+    return uuid4().int
+
+
+def _release_lock(lock_key, token):
+    """Drop `lock_key` unless it expired and another caller now holds it."""
+    if isinstance(caches["default"], RedisCache):
+        try:
+            redis_client.get_client().eval(
+                _RELEASE_LOCK, 1, cache.make_key(lock_key), token
+            )
+        except Exception:
+            # Leave it to expire; waiters fall back after LOCK_TIMEOUT.
+            log.warning("could not release %s", lock_key, exc_info=True)
+        return
+    # Non-Redis backends (tests, local dev): not atomic, but single-process.
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _should_refresh(entry, now, beta):
+    if now >= entry.expires_at:
+        return True
+    if beta <= 0 or entry.delta <= 0:
+        return False
+    # -log(U) is Exp(1)-distributed: occasionally large, usually small.
+    jitter = -entry.delta * beta * math.log(random.random() or 1e-12)
+    return now + jitter >= entry.expires_at
+
+
+def _fill(key, timeout, compute_fn):
+    start = time.monotonic()
+    value = compute_fn()
+    delta = time.monotonic() - start
+    entry = _Entry(value, delta, time.time() + timeout)
+    cache.set(key, entry, timeout + int(timeout * STALE_GRACE_FACTOR))
+    cache_l1.set(key, entry, max_ttl=timeout)
+    return value
+
+
+def cached(key, timeout, compute_fn, beta=BETA):
+    """Return the cached value for `key`, recomputing at most once at a time.
+
+    `timeout` is the logical freshness window in seconds; `compute_fn` is a
+    zero-argument callable producing a picklable value (never None).
+    """
+    now = time.time()
+    # L1 copies are capped at the entry's logical expiry, so a hit is fresh.
+    entry = cache_l1.get(key)
+    if entry is not None:
+        return entry.value
+
+    entry = cache.get(key)
+    if not isinstance(entry, _Entry):
+        entry = None
+    if entry is not None and not _should_refresh(entry, now, beta):
+        cache_l1.set(key, entry, max_ttl=entry.expires_at - now)
+        return entry.value
+
+    lock_key = f"lock:{key}"
+    token = _lock_token()
+    if cache.add(lock_key, token, LOCK_TIMEOUT):
+        try:
+            return _fill(key, timeout, compute_fn)
+        except Exception:
+            if entry is None:
+                raise
+            log.exception("cache refresh failed for %s — serving stale", key)
+            return entry.value
+        finally:
+            _release_lock(lock_key, token)
+
+    # Someone else is refreshing.
+    if entry is not None:
+        return entry.value
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if isinstance(entry, _Entry):
+            return entry.value
+        if cache.get(lock_key) is None:
+            break  # winner gave up (error) — compute ourselves
+    return _fill(key, timeout, compute_fn)
+
+
+def warm(key, timeout, compute_fn, min_remaining):
+    """Recompute `key` unless it stays fresh for at least `min_remaining` s.
+
+    For background warmers: refreshes a hot entry just before it expires, so
+    no request ever sees the miss. Returns True if this call recomputed.
+    """
+    entry = cache.get(key)
+    if isinstance(entry, _Entry) and entry.expires_at - time.time() >= min_remaining:
+        return False
+    lock_key = f"lock:{key}"
+    token = _lock_token()
+    if not cache.add(lock_key, token, LOCK_TIMEOUT):
+        return False  # a request is already refreshing it
+    try:
+        _fill(key, timeout, compute_fn)
+    finally:
+        _release_lock(lock_key, token)
+    return True
@@ -0,0 +1,186 @@
+"""
+Optional in-process L1 tier in front of the shared Redis cache.
+
+The hottest reads — generation tokens (one per make_key() call), feed page 1,
+upcoming events, professions, hire-form stats — are identical for every
+request, yet each one costs a Redis round trip plus an unpickle, on every
+greenlet of every pod. With CACHE_L1["ENABLED"] those values are also kept in
+a small per-process LRU, so repeat reads never leave the process.
+
+Only key families listed in CACHE_L1["TTLS"] are kept, each for at most its
+own L1 TTL. Most entries need no invalidation beyond that: data keys embed
+their family's generation (cache_registry.make_key), so a bump makes them
+unreachable everywhere at once. Generation tokens themselves do change in
+place, so cache_registry.bump() drops them locally and publishes the keys on
+a Redis pub/sub channel; every process runs one listener thread that drops
+the same keys from its own L1. The L1 TTL is the backstop if a message is
+lost (listener reconnecting, Redis failover).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from myproject import redis_client
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "cache:l1:invalidate"
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = None
+_local_pid = None
+_listener_started = False
+
+
+def _config():
+    return getattr(settings, "CACHE_L1", {})
+
+
+def enabled():
+    return bool(_config().get("ENABLED"))
+
+
+def _store():
+    # Rebuilt after fork so a preloaded master's entries (and lock) are never
+    # shared with workers.
+    global _local, _local_pid, _listener_started
+    pid = os.getpid()
+    if _local is None or _local_pid != pid:
+        _local = LRUCache(_config().get("MAX_ENTRIES", 2048))
+        _local_pid = pid
+        _listener_started = False
+    if not _listener_started:
+        _listener_started = True
+        _start_listener()
+    return _local
+
+
+def ttl_for(key):
+    """L1 TTL for `key`'s family, or None if the family isn't kept in L1."""
+    best = None
+    for prefix, ttl in _config().get("TTLS", {}).items():
+        if key.startswith(prefix + ":") and (best is None or len(prefix) > best[0]):
+            best = (len(prefix), ttl)
+    return best[1] if best else None
+
+
+def get(key, default=None):
+    if not enabled() or ttl_for(key) is None:
+        return default
+    return _store().get(key, default)
+
+
+def set(key, value, max_ttl=None):
+    """Keep `value` in L1 for its family TTL (capped at `max_ttl` seconds)."""
+    if not enabled():
+        return
+    ttl = ttl_for(key)
+    if ttl is None:
+        return
+    if max_ttl is not None:
+        ttl = min(ttl, max_ttl)
+    if ttl > 0:
+        _store().set(key, value, ttl)
+
+
+def invalidate(keys):
+    """Drop `keys` here and, via pub/sub, in every other process."""
+    if not enabled():
+        return
+    keys = [k for k in keys if ttl_for(k) is not None]
+    if not keys:
+        return
+    _store().delete_many(keys)
+    try:
+        _redis().publish(CHANNEL, json.dumps(keys))
+    except Exception:
+        log.warning("L1 invalidation publish failed", exc_info=True)
+
+
+def clear():
+    if _local is not None:
+        _local.clear()
+
+
+def _redis():
+    return redis_client.get_client()
+
+
+def handle_message(message):
+    """Apply one pub/sub invalidation message to this process's L1."""
+    if message.get("type") != "message" or _local is None:
+        return
+    try:
+        keys = json.loads(message["data"])
+    except (TypeError, ValueError):
+        log.warning("Malformed L1 invalidation message: %r", message.get("data"))
+        return
+    _local.delete_many(keys)
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            for message in pubsub.listen():
+                handle_message(message)
+        except Exception:
+            log.warning("L1 invalidation listener lost Redis; retrying", exc_info=True)
+        # Anything published while disconnected was missed — start clean.
+        clear()
+        time.sleep(1)
+
+
+def _start_listener():
+    if not _config().get("PUBSUB", True):
+        return
+    threading.Thread(target=_listen, name="cache-l1-listener", daemon=True).start()
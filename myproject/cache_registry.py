@@ -0,0 +1,206 @@
+"""
+Generation-based cache invalidation.
+
+Every cached view key belongs to a *family* ("me", "feed", "events", ...).
+Families are either per-entity (one generation per user id) or global. The
+key actually stored embeds the family's current generation:
+
+    make_key("me", entity=42)          -> "me:42:g1718000000000000000"
+    make_key("feed", page, profs)      -> "feed:g1718000000000000000:2:Dancer"
+
+Invalidating a family just writes a new generation token, so every old
+entry becomes unreachable at once (and ages out by TTL) without anybody
+having to know the exact keys that were cached — including every feed page
+and profession-filter combination.
+
+REGISTRY is the single place that says which model writes touch which
+families. post_save / post_delete handlers (connected from
+UsersConfig.ready) resolve the families for the saved row and bump them all
+with one cache.set_many() — a single pipelined MSET on the Redis backend.
+Views never hand-delete cache keys.
+
+Bumps happen immediately AND again on transaction commit: the immediate bump
+covers autocommit code paths, the on-commit bump stops a concurrent reader
+from re-caching pre-commit data under the new generation.
+
+Families with a public, CDN-cached rendition ("feed", "events", "profile")
+are also purged at the edge via surrogate keys (myproject.edge_cache).
+
+Generation tokens are read on every make_key() call, so they are the main
+customer of the in-process L1 tier (myproject.cache_l1); bump() evicts them
+there and broadcasts the eviction to every other process.
+"""
+
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+from myproject import cache_l1, edge_cache
+
+# Fields that show up on a feed card (FeedCard) — saves touching only other
+# Profile columns (KYC, payout bookkeeping) leave the feed alone.
+_FEED_FIELDS = {
+    "profession",
+    "profile_picture",
+    "profile_picture_renditions",
+    "is_performer",
+    "bio",
+}
+# Columns profile search matches on (users.utils.search).
+_SEARCH_FIELDS = {
+    "profession",
+    "location",
+    "bio",
+    "profile_picture",
+    "profile_picture_renditions",
+    "is_performer",
+}
+# Engagement columns rendered on the live-events pages / gig counts.
+_EVENT_FIELDS = {"status", "date", "time", "venue", "occasion"}
+
+
+# Resolver result meaning "nothing to invalidate for this family".
+_SKIP = object()
+
+
+def _user_id(obj):
+    return obj.user_id
+
+
+def _self_id(obj):
+    return obj.id
+
+
+def _upload_owner(upload):
+    # A cascade delete (user -> profile -> uploads) sends post_delete after the
+    # profile row is gone; the Profile handler already bumped that user.
+    try:
+        return upload.profile.user_id
+    except ObjectDoesNotExist:
+        return _SKIP
+
+
+def _performer_id(engagement):
+    return engagement.performer_id
+
+
+# model label -> [(family, entity resolver or None for global, watched fields)]
+# watched fields = None means "any save"; otherwise a save(update_fields=...)
+# that touches none of them doesn't bump the family.
+REGISTRY = {
+    "auth.User": [
+        ("me", _self_id, {"username"}),
+        ("profile", _self_id, {"username"}),
+        ("web:profile", _self_id, {"username"}),
+        ("feed", None, {"username"}),
+        ("search", None, {"username"}),
+    ],
+    "users.Profile": [
+        ("me", _user_id, None),
+        ("profile", _user_id, None),
+        ("web:profile", _user_id, None),
+        ("feed", None, _FEED_FIELDS),
+        ("professions", None, {"profession"}),
+        ("search", None, _SEARCH_FIELDS),
+    ],
+    "users.Upload": [
+        ("uploads", _upload_owner, None),
+        ("profile", _upload_owner, None),
+        ("web:profile", _upload_owner, None),
+    ],
+    "bookings.Engagement": [
+        ("events", None, _EVENT_FIELDS),
+        ("profile", _performer_id, {"status", "date"}),
+        ("web:profile", _performer_id, {"status", "date"}),
+    ],
+}
+
+
+def _gen_key(family, entity=None):
+    return f"gen:{family}" if entity is None else f"gen:{family}:{entity}"
+
+
+def generation(family, entity=None):
+    """Current generation token for a family, creating one on first use."""
+    gk = _gen_key(family, entity)
+    gen = cache_l1.get(gk)
+    if gen is not None:
+        return gen
+    gen = cache.get(gk)
+    if gen is None:
+        # Time-based seed: a generation key lost to eviction can never
+        # resurrect entries cached under an older token.
+        gen = time.time_ns()
+        if not cache.add(gk, gen, timeout=None):
+            gen = cache.get(gk, gen)
+    cache_l1.set(gk, gen)
+    return gen
+
+
+def make_key(family, *parts, entity=None):
+    """Versioned cache key for `family` (plus optional key parts)."""
+    base = family if entity is None else f"{family}:{entity}"
+    return ":".join([base, f"g{generation(family, entity)}", *map(str, parts)])
+
+
+def version(targets):
+    """Combined generation of (family, entity) pairs — changes on any bump."""
+    return ":".join(str(generation(f, e)) for f, e in targets)
+
+
+def bump(targets):
+    """Invalidate (family, entity) pairs with one pipelined write."""
+    targets = set(targets)
+    if not targets:
+        return
+    token = time.time_ns()
+    keys = {_gen_key(f, e): token for f, e in targets}
+    cache.set_many(keys, timeout=None)
+    cache_l1.invalidate(list(keys))
+
+
+def targets_for(instance, update_fields=None):
+    """(family, entity) pairs a write to `instance` invalidates."""
+    out = set()
+    for family, resolve, watched in REGISTRY.get(instance._meta.label, ()):
+        if update_fields is not None and watched and watched.isdisjoint(update_fields):
+            continue
+        entity = resolve(instance) if resolve else None
+        if entity is not _SKIP:
+            out.add((family, entity))
+    return out
+
+
+def invalidate(instances, update_fields=None):
+    """Bump every family touched by writes to `instances`."""
+    targets = set()
+    for obj in instances:
+        targets |= targets_for(obj, update_fields)
+    if not targets:
+        return
+    bump(targets)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump(targets))
+    edge_cache.purge(edge_cache.keys_for_targets(targets))
+
+
+def _on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        invalidate([instance], update_fields)
+
+
+def _on_delete(sender, instance, **kwargs):
+    invalidate([instance])
+
+
+def connect_signals():
+    for label in REGISTRY:
+        model = apps.get_model(label)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f"cachegen:{label}")
+        post_delete.connect(
+            _on_delete, sender=model, dispatch_uid=f"cachegen-del:{label}"
+        )
@@ -44,4 +44,31 @@ app.conf.beat_schedule = {
         "task": "bookings.tasks.release_completed_event_payouts",
         "schedule": crontab(hour=2, minute=0),
     },
+    # Every minute: re-fill the most requested feed / live-events cache
+    # entries just before they expire, so users never hit a cold cache.
+    "warm-hot-caches": {
+        "task": "users.tasks.warm_hot_caches",
+        "schedule": crontab(),
+    },
+    # Daily at 03:30 local: delete media objects no row references any more
+    # (unconfirmed presigned uploads, raw originals, superseded images).
+    # Resumes where the previous run stopped if it ran out of budget.
+    "collect-orphan-media": {
+        "task": "users.tasks.collect_orphan_media",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    # Every 15 minutes: fetch Expo push receipts for tickets sent 15+ minutes
+    # ago and delete the tokens of uninstalled apps, so broadcasts stop
+    # paying for dead devices.
+    "check-push-receipts": {
+        "task": "users.tasks.check_push_receipts",
+        "schedule": crontab(minute="*/15"),
+    },
+    # Every minute: drain the notification outbox. Each queued notification
+    # also kicks the dispatcher on commit; this sweep catches rows whose kick
+    # was lost (broker down) or landed while another dispatcher held the lock.
+    "dispatch-notifications": {
+        "task": "users.tasks.dispatch_notifications",
+        "schedule": crontab(),
+    },
 }
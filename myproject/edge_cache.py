@@ -0,0 +1,105 @@
+"""
+Edge (CDN) caching for the public feed / live-events listings.
+
+Public responses are marked `public, s-maxage=...` and tagged with surrogate
+keys — sent both as Cloudflare's `Cache-Tag` and the generic
+`Surrogate-Key` header — so the CDN can hold them for minutes yet drop them
+the moment the underlying rows change:
+
+    feed                    every public feed page
+    events                  every public live-events page
+    profile-<user_id>       any public page showing that user
+
+Surrogate keys mirror cache_registry families: whenever a model write bumps
+"feed", "events" or a user's "profile" generation, invalidate() also calls
+purge() with the matching keys. The purge goes out after the transaction
+commits (so the CDN can't re-fetch pre-commit data) via the
+users.tasks.purge_edge_cache Celery task, as one POST of {"tags": [...]} to
+EDGE_CACHE["PURGE_URL"] — Cloudflare's purge_cache endpoint in production,
+or the local stand-in view (users.api.views.EdgePurgeStandInView) in dev
+and tests. Without a PURGE_URL, purging is a no-op.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+
+log = logging.getLogger(__name__)
+
+# cache_registry families that have a public, edge-cached rendition.
+EDGE_FAMILIES = {"feed", "events", "profile"}
+
+# Cloudflare accepts at most 30 tags per purge request.
+PURGE_BATCH = 30
+
+# Where the local stand-in purge endpoint records what it was asked to purge.
+STANDIN_LOG_KEY = "edge:standin:purged"
+
+
+def _conf():
+    return settings.EDGE_CACHE
+
+
+def surrogate_key(family, entity=None):
+    return family if entity is None else f"{family}-{entity}"
+
+
+def keys_for_targets(targets):
+    """Surrogate keys for cache_registry (family, entity) bump targets."""
+    return {surrogate_key(f, e) for f, e in targets if f in EDGE_FAMILIES}
+
+
+def make_public(response, keys):
+    """Mark `response` edge-cacheable and tag it with surrogate `keys`."""
+    conf = _conf()
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=conf["MAX_AGE"],
+        s_maxage=conf["S_MAXAGE"],
+    )
+    keys = sorted(keys)
+    response["Cache-Tag"] = ",".join(keys)
+    response["Surrogate-Key"] = " ".join(keys)
+    return response
+
+
+def purge(keys):
+    """Purge surrogate `keys` at the edge once the current transaction commits."""
+    keys = sorted(set(keys))
+    if not keys or not _conf()["PURGE_URL"]:
+        return
+
+    def enqueue():
+        from users.tasks import purge_edge_cache
+
+        purge_edge_cache.delay(keys)
+
+    transaction.on_commit(enqueue)
+
+
+def send_purge(keys):
+    """POST `keys` to the purge endpoint in PURGE_BATCH-sized requests."""
+    import requests
+
+    conf = _conf()
+    headers = {"Authorization": f"Bearer {conf['PURGE_TOKEN']}"}
+    for i in range(0, len(keys), PURGE_BATCH):
+        response = requests.post(
+            conf["PURGE_URL"],
+            json={"tags": keys[i : i + PURGE_BATCH]},
+            headers=headers,
+            timeout=10,
+        )
+        response.raise_for_status()
+
+
+def record_standin_purge(keys):
+    """Local stand-in for the CDN: remember purged keys (newest last)."""
+    purged = cache.get(STANDIN_LOG_KEY, [])
+    purged = (purged + list(keys))[-1000:]
+    cache.set(STANDIN_LOG_KEY, purged, None)
+    log.info("edge stand-in purge: %s", ", ".join(keys))
@@ -0,0 +1,21 @@
+"""
+Shared raw redis-py client for the few features the Django cache API can't
+express (pub/sub, sorted sets). One lazily-built connection pool per process.
+"""
+
+import os
+
+from django.conf import settings
+
+_client = None
+_client_pid = None
+
+
+def get_client():
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        import redis
+
+        _client = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=2)
+        _client_pid = os.getpid()
+    return _client
@@ -0,0 +1,74 @@
+"""
+Process-wide boto3 S3/R2 connection shared by media storage and presigning.
+
+Building a boto3 Session loads and parses the service model JSON, and every
+client resolves its endpoint and credentials on top — tens of ms each.
+django-storages builds a session + resource per *thread*, and under gevent
+every greenlet counts as a thread, so requests kept paying that cost;
+presigning built yet another client per call.
+
+Here: one Session per process and one resource (with its thread-safe
+low-level client and urllib3 pool) per endpoint, rebuilt after fork like
+myproject.redis_client. Creation is lock-guarded — gevent patches
+threading, so the lock is greenlet-aware. The shared resource only hands
+out fresh Bucket/Object handles per call, so no mutable state is shared.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_pid = None
+_session = None
+_resources = {}
+
+
+def _config():
+    from botocore.config import Config
+
+    return Config(
+        signature_version=getattr(settings, "AWS_S3_SIGNATURE_VERSION", "s3v4"),
+        # One pool per process, shared by every greenlet: size it for the
+        # worker's concurrency rather than botocore's default of 10.
+        max_pool_connections=getattr(settings, "AWS_S3_MAX_POOL_CONNECTIONS", 50),
+        retries={"max_attempts": 3, "mode": "standard"},
+        tcp_keepalive=True,
+        connect_timeout=5,
+        read_timeout=60,
+    )
+
+
+def get_resource(endpoint_url=None):
+    """boto3 S3 resource for `endpoint_url` (default AWS_S3_ENDPOINT_URL)."""
+    global _pid, _session, _resources
+    endpoint_url = endpoint_url or getattr(settings, "AWS_S3_ENDPOINT_URL", None)
+    if _pid == os.getpid() and endpoint_url in _resources:
+        return _resources[endpoint_url]
+    with _lock:
+        if _pid != os.getpid():
+            # Forked (gunicorn / Celery prefork): the parent's sockets aren't ours.
+            _pid, _session, _resources = os.getpid(), None, {}
+        if endpoint_url not in _resources:
+            if _session is None:
+                import boto3
+
+                # Explicit keys if configured, else boto3's default chain
+                # (EC2 instance profile).
+                _session = boto3.session.Session(
+                    aws_access_key_id=getattr(settings, "AWS_ACCESS_KEY_ID", None),
+                    aws_secret_access_key=getattr(
+                        settings, "AWS_SECRET_ACCESS_KEY", None
+                    ),
+                    region_name=getattr(settings, "AWS_S3_REGION_NAME", None),
+                )
+            _resources[endpoint_url] = _session.resource(
+                "s3", endpoint_url=endpoint_url, config=_config()
+            )
+        return _resources[endpoint_url]
+
+
+def get_client(endpoint_url=None):
+    """Low-level S3 client sharing get_resource()'s connection pool."""
+    return get_resource(endpoint_url).meta.client
@@ -85,6 +85,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # trigram / full-text lookups for profile search
     "silk",
     "corsheaders",
     "allauth",
@@ -349,8 +350,13 @@ if USE_S3:
 
     AWS_S3_OBJECT_PARAMETERS = {"CacheControl": "public, max-age=31536000, immutable"}
     AWS_S3_FILE_OVERWRITE = False
+    # Objects opened for processing (image/video tasks) spill to a temp file
+    # past 5 MB instead of being buffered whole in memory (default: no limit).
+    AWS_S3_MAX_MEMORY_SIZE = 5 * 1024 * 1024
     AWS_DEFAULT_ACL = None
     AWS_QUERYSTRING_AUTH = False
+    # Connection pool of the shared boto3 client (myproject.s3_client).
+    AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", "50"))
 
     # Presigned URL endpoint — the URL the CLIENT uses to POST files.
     # In production: not set → presign.py falls back to AWS_S3_ENDPOINT_URL.
@@ -361,7 +367,7 @@ if USE_S3:
 
     STORAGES = {
         "default": {
-            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            "BACKEND": "myproject.storage.SharedS3Storage",
         },
         "staticfiles": {
             "BACKEND": "myproject.storage.ForgivingStaticFilesStorage",
@@ -389,6 +395,15 @@ else:
         },
     }
 
+# Local stand-in for presigned R2 uploads (users.api.views.UploadStandInView).
+# With USE_S3=0 and ENABLED, presign endpoints hand out signed URLs to this
+# server instead of returning 501, so the direct-upload path (and the
+# bench_uploads command) runs offline. BASE_URL is what clients PUT to.
+UPLOAD_STANDIN = {
+    "ENABLED": not USE_S3 and os.getenv("UPLOAD_LOCAL_STANDIN", "0") == "1",
+    "BASE_URL": os.getenv("UPLOAD_STANDIN_BASE_URL", "http://localhost:8000"),
+}
+
 LOGOUT_REDIRECT_URL = "login"  # Use the name of your sign-in URL pattern
 
 LOGIN_URL = "/users/login/"
@@ -473,6 +488,129 @@ CACHES = {
     },
 }
 
+# Optional per-process L1 tier in front of Redis (myproject.cache_l1). Off by
+# default; turn on per deployment with CACHE_L1_ENABLED=1.
+CACHE_L1 = {
+    "ENABLED": os.getenv("CACHE_L1_ENABLED", "0") == "1",
+    "MAX_ENTRIES": int(os.getenv("CACHE_L1_MAX_ENTRIES", "2048")),
+    # Cross-process invalidation over Redis pub/sub (one listener thread per
+    # process). Without it, L1 entries only age out by TTL.
+    "PUBSUB": True,
+    # Key family (prefix before ":") -> max seconds an L1 copy may be served.
+    # Families not listed (per-user keys) are never kept in L1.
+    "TTLS": {
+        "gen": 30,
+        "feed": 30,
+        "events": 30,
+        "professions": 300,
+        "hire_form": 60,
+    },
+}
+
+# Cache warming (users.tasks.warm_hot_caches, every minute via beat): re-fill
+# the TOP_N most requested feed / live-events payloads that expire within
+# AHEAD seconds. Demand is sampled at HIT_SAMPLE_RATE of reads. BASE_URL is
+# the scheme + host clients reach the API on: warmed feed cards get their
+# absolute media URLs from it, and only requests to that host read them.
+CACHE_WARM = {
+    "TOP_N": int(os.getenv("CACHE_WARM_TOP_N", "50")),
+    "AHEAD": 90,
+    "HIT_SAMPLE_RATE": float(os.getenv("CACHE_WARM_HIT_SAMPLE_RATE", "0.1")),
+    "BASE_URL": os.getenv("CACHE_WARM_BASE_URL", "http://localhost:8000"),
+}
+
+# Edge (CDN) caching of the public feed / live-events listings
+# (myproject.edge_cache). PURGE_URL is Cloudflare's
+# https://api.cloudflare.com/client/v4/zones/<zone_id>/purge_cache in
+# production; empty disables purging. LOCAL_STANDIN=1 enables the local
+# stand-in purge endpoint (/api/edge/purge/) for dev and tests.
+EDGE_CACHE = {
+    "PURGE_URL": os.getenv("EDGE_PURGE_URL", ""),
+    "PURGE_TOKEN": os.getenv("EDGE_PURGE_TOKEN", ""),
+    "LOCAL_STANDIN": os.getenv("EDGE_LOCAL_STANDIN", "0") == "1",
+    # Browsers re-check after MAX_AGE; the edge holds pages for S_MAXAGE,
+    # relying on purges for freshness.
+    "MAX_AGE": 30,
+    "S_MAXAGE": 600,
+}
+
+# Video delivery (users.tasks.compress_upload_video / build_upload_hls). A
+# poster JPEG is always extracted; with ENABLED the task also packages an HLS
+# adaptive-bitrate ladder. LADDER rungs are (short edge px, video kbps);
+# rungs above the source resolution are skipped.
+VIDEO_HLS = {
+    "ENABLED": os.getenv("VIDEO_HLS_ENABLED", "0") == "1",
+    "SEGMENT_SECONDS": 4,
+    "LADDER": [(360, 800), (720, 2800), (1080, 5000)],
+    "AUDIO_KBPS": 128,
+}
+
+# Segment-parallel encoding (users.tasks.compress_upload_video): videos longer
+# than PARALLEL_MIN_SECONDS are split at keyframes into ~CHUNK_SECONDS chunks
+# and encoded as a Celery chord across workers.
+VIDEO_ENCODE = {
+    "CHUNK_SECONDS": 30,
+    "PARALLEL_MIN_SECONDS": 60,
+}
+
+# Image deduplication (users.models.ImageFingerprint): a profile re-uploading
+# a photo it already has reuses the stored object. Byte-identical files always
+# match; re-encoded/resized copies match within MAX_DISTANCE bits of dHash and
+# MAX_COLOR_DISTANCE (0-255, per channel) of mean colour.
+IMAGE_DEDUP = {
+    "ENABLED": os.getenv("IMAGE_DEDUP_ENABLED", "1") == "1",
+    "MAX_DISTANCE": 4,
+    "MAX_COLOR_DISTANCE": 12,
+}
+
+# Orphaned media cleanup (users.utils.media_gc, daily via beat + the gc_media
+# command). Only objects older than MIN_AGE_HOURS are candidates, so presigned
+# uploads awaiting confirmation and in-flight processing are safe. A run scans
+# at most MAX_KEYS_PER_RUN keys and resumes from its checkpoint next time.
+MEDIA_GC = {
+    "MIN_AGE_HOURS": int(os.getenv("MEDIA_GC_MIN_AGE_HOURS", "24")),
+    "BATCH_SIZE": 1000,
+    "MAX_KEYS_PER_RUN": int(os.getenv("MEDIA_GC_MAX_KEYS_PER_RUN", "200000")),
+}
+
+# Expo push sending (users.notifications). Broadcasts keep up to MAX_IN_FLIGHT
+# batches of 100 in flight over one keep-alive pool; a 429/5xx is retried up
+# to MAX_RETRIES times, waiting Retry-After or BACKOFF_BASE * 2^attempt
+# seconds (jittered, capped at BACKOFF_MAX) — and every in-flight batch of
+# that broadcast waits with it. users.tasks.fan_out_broadcast splits an
+# audience into BROADCAST_CHUNK-token id ranges, one Celery sub-task each.
+# Push receipts (users.tasks.check_push_receipts, beat) are fetched for
+# tickets at least RECEIPT_DELAY seconds old — Expo's recommended wait —
+# at most RECEIPT_MAX_PER_RUN per run.
+EXPO_PUSH = {
+    "MAX_IN_FLIGHT": int(os.getenv("EXPO_PUSH_MAX_IN_FLIGHT", "6")),
+    "TIMEOUT": 10,
+    "MAX_RETRIES": 4,
+    "BACKOFF_BASE": 0.5,
+    "BACKOFF_MAX": 30,
+    "BROADCAST_CHUNK": int(os.getenv("EXPO_PUSH_BROADCAST_CHUNK", "2000")),
+    "RECEIPT_DELAY": 15 * 60,
+    "RECEIPT_MAX_PER_RUN": 100000,
+}
+
+# Notification outbox (users.notifications.queue_notification /
+# dispatch_outbox). Rows are drained BATCH_SIZE at a time by one dispatcher at
+# a time (LOCK_TIMEOUT bounds a crashed holder); a push that keeps failing is
+# dropped after MAX_ATTEMPTS runs.
+NOTIFICATION_OUTBOX = {
+    "BATCH_SIZE": 500,
+    "MAX_ATTEMPTS": 5,
+    "LOCK_TIMEOUT": 300,
+}
+
+# "New live event" broadcasts (users.tasks.notify_new_live_event) are
+# debounced: accepts within WINDOW_SECONDS of the first one go out together
+# as one digest push, so users get at most one per window. 0 = send each
+# accept immediately.
+LIVE_EVENT_DIGEST = {
+    "WINDOW_SECONDS": int(os.getenv("LIVE_EVENT_DIGEST_WINDOW_SECONDS", "120")),
+}
+
 # Sessions: DB + cache (so reads are fast but still durable in Postgres)
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 SESSION_CACHE_ALIAS = "default"
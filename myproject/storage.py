@@ -1,5 +1,8 @@
+from storages.backends.s3 import S3Storage
 from whitenoise.storage import CompressedManifestStaticFilesStorage
 
+from myproject import s3_client
+
 
 class ForgivingStaticFilesStorage(CompressedManifestStaticFilesStorage):
     """
@@ -14,3 +17,18 @@ class ForgivingStaticFilesStorage(CompressedManifestStaticFilesStorage):
     """
 
     manifest_strict = False
+
+
+class SharedS3Storage(S3Storage):
+    """
+    Media storage on the process-wide boto3 connection (myproject.s3_client).
+
+    Stock S3Storage keeps a session + resource per thread — per greenlet
+    under gevent — so opens, size checks and deletes from views and Celery
+    tasks kept re-creating clients. This one reuses the shared resource and
+    its pooled connections.
+    """
+
+    @property
+    def connection(self):
+        return s3_client.get_resource(self.endpoint_url)
@@ -2,7 +2,7 @@ from django.contrib import admin
 
 # Register your models here.
 from .models import Profile, Upload
-from .notifications import send_push_notification
+from .notifications import queue_notification
 
 
 @admin.register(Profile)
@@ -41,7 +41,7 @@ class ProfileAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
         if change and obj.client_approved and not was_approved:
-            send_push_notification(
+            queue_notification(
                 user=obj.user,
                 title="You're approved!",
                 body="You can now hire performers",
@@ -0,0 +1,307 @@
+"""
+Cached feed / live-events payloads shared by the API and the web views.
+
+Each builder returns plain dicts and lists (ints, strings, dates): cheap to
+pickle, small in Redis, and stable across deploys, unlike pickled Page or
+model-instance graphs. GlobalFeedAPIView / LiveEventsAPIView and
+users.views.global_feed / live_events read the SAME cache entries, so a page
+computed for the app is a hit for the browser and vice versa.
+
+Payloads are shared across users; callers strip the requester post-cache.
+
+Every builder is split into a *spec* — (key, ttl, compute) — and the public
+read path. Reads also record a sampled hit in an hourly Redis sorted set, so
+users.tasks.warm_hot_caches can re-fill the most requested pages just before
+they expire (warm()), instead of letting the first request after expiry — or
+after a deploy / Redis flush — pay for the miss.
+
+Feed cards carry absolute media URLs built from the request, so feed keys
+include that URL base; warming builds them against CACHE_WARM["BASE_URL"]
+and so fills exactly the entries requests to that host read.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import time
+from datetime import date
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.paginator import Paginator
+
+from bookings.models import Engagement
+from myproject import cache_fill, redis_client
+from myproject.cache_fill import cached
+from myproject.cache_registry import make_key
+from users.models import FeedCard, Profile
+from users.utils.cursor import keyset_page, ranked_keyset_page
+from users.utils.search import search_feed_cards
+
+from .serializers import FeedCardSerializer
+
+log = logging.getLogger(__name__)
+
+FEED_PAGE_SIZE = 20
+EVENTS_PAGE_SIZE = 10
+PAST_EVENTS_LIMIT = 20
+FEED_TTL = 300
+EVENTS_TTL = 300
+PROFESSIONS_TTL = 3600
+SEARCH_PAGE_SIZE = 20
+SEARCH_TTL = 120
+
+HITS_KEY = "cachewarm:hits:{bucket}"
+# Always warmed, even with no recorded hits (e.g. right after a Redis flush).
+ALWAYS_WARM = [
+    ("feed", "1", []),
+    ("feed_c", []),
+    ("events", "upcoming", "1"),
+    ("past",),
+    ("professions",),
+]
+
+
+def _feed_queryset(professions):
+    qs = FeedCard.objects.order_by("profile")
+    if professions:
+        qs = qs.filter(profession__in=professions)
+    return qs
+
+
+def _page_meta(paginator, page_obj):
+    return {
+        "count": paginator.count,
+        "num_pages": paginator.num_pages,
+        "page": page_obj.number,
+        "has_next": page_obj.has_next(),
+        "has_previous": page_obj.has_previous(),
+    }
+
+
+def _professions(values):
+    return sorted(p for p in values if p)
+
+
+class _BaseURLRequest:
+    """Just enough of a request for the serializers' absolute URLs."""
+
+    def __init__(self, base):
+        self.base = base
+
+    def build_absolute_uri(self, location="/"):
+        return urljoin(self.base, location)
+
+
+def _url_request(request):
+    # Request-free callers (the warmer) resolve URLs against the public base.
+    return request or _BaseURLRequest(settings.CACHE_WARM["BASE_URL"])
+
+
+def _feed_page_spec(request, page, professions):
+    request = _url_request(request)
+    key = make_key("feed", request.build_absolute_uri("/"), page, ",".join(professions))
+
+    def compute():
+        paginator = Paginator(_feed_queryset(professions), FEED_PAGE_SIZE)
+        page_obj = paginator.get_page(page)
+        ser = FeedCardSerializer(
+            page_obj.object_list, many=True, context={"request": request}
+        )
+        return {**_page_meta(paginator, page_obj), "results": ser.data}
+
+    return key, FEED_TTL, compute
+
+
+def feed_page(request, page, professions):
+    """One page of feed cards (Paginator.get_page semantics: never 404s)."""
+    professions = _professions(professions)
+    record_hit("feed", page, professions)
+    return cached(*_feed_page_spec(request, page, professions))
+
+
+def _feed_keyset_spec(request, cursor, professions):
+    request = _url_request(request)
+    key = make_key(
+        "feed", "c", request.build_absolute_uri("/"), cursor, ",".join(professions)
+    )
+
+    def compute():
+        rows, next_cursor = keyset_page(
+            _feed_queryset(professions), cursor, FEED_PAGE_SIZE
+        )
+        ser = FeedCardSerializer(rows, many=True, context={"request": request})
+        return {"next_cursor": next_cursor, "results": ser.data}
+
+    return key, FEED_TTL, compute
+
+
+def feed_keyset(request, cursor, professions):
+    """Keyset (?cursor=) slice of feed cards: no COUNT(*), no OFFSET."""
+    professions = _professions(professions)
+    if not cursor:
+        # Only the first slice is worth warming — later cursors are one-offs.
+        record_hit("feed_c", professions)
+    return cached(*_feed_keyset_spec(request, cursor, professions))
+
+
+def _event_row(e):
+    return {
+        "id": e.id,
+        "date": e.date,
+        "time": e.time,
+        "venue": e.venue,
+        "occasion": e.occasion,
+        "status": e.status,
+        "client": {"id": e.client.id, "username": e.client.username},
+        "performer": {
+            "id": e.performer.id,
+            "username": e.performer.username,
+            "profession": e.performer.profile.profession,
+        },
+    }
+
+
+def _accepted_events(scope):
+    qs = Engagement.objects.filter(status=Engagement.STATUS_ACCEPTED).select_related(
+        "client", "performer", "performer__profile"
+    )
+    if scope == "past":
+        # Past accepted events, newest first
+        return qs.filter(date__lt=date.today()).order_by("-date", "-time")
+    # Default: upcoming accepted events, soonest first
+    return qs.filter(date__gte=date.today()).order_by("date", "time")
+
+
+def _events_page_spec(scope, page):
+    key = make_key("events", scope, page)
+
+    def compute():
+        paginator = Paginator(_accepted_events(scope), EVENTS_PAGE_SIZE)
+        page_obj = paginator.get_page(page)
+        return {
+            **_page_meta(paginator, page_obj),
+            "results": [_event_row(e) for e in page_obj.object_list],
+        }
+
+    return key, EVENTS_TTL, compute
+
+
+def events_page(scope, page):
+    """One page of accepted events; scope is "upcoming" (default) or "past"."""
+    record_hit("events", scope, page)
+    return cached(*_events_page_spec(scope, page))
+
+
+def _recent_past_spec():
+    def compute():
+        return [_event_row(e) for e in _accepted_events("past")[:PAST_EVENTS_LIMIT]]
+
+    return make_key("events", "past-recent"), EVENTS_TTL, compute
+
+
+def recent_past_events():
+    """The PAST_EVENTS_LIMIT most recent accepted events (web sidebar list)."""
+    return cached(*_recent_past_spec())
+
+
+def _professions_spec():
+    def compute():
+        return list(
+            Profile.objects.exclude(profession__isnull=True)
+            .exclude(profession__exact="")
+            .values_list("profession", flat=True)
+            .distinct()
+            .order_by("profession")
+        )
+
+    return make_key("professions"), PROFESSIONS_TTL, compute
+
+
+def professions():
+    """Distinct non-empty professions, for the feed filter options."""
+    return cached(*_professions_spec())
+
+
+def search(request, q, cursor):
+    """Ranked, keyset-paginated profile search for a normalized query `q`."""
+    digest = hashlib.sha256(q.encode()).hexdigest()[:32]
+    key = make_key("search", digest, cursor)
+
+    def compute():
+        rows, next_cursor = ranked_keyset_page(
+            search_feed_cards(q), cursor, SEARCH_PAGE_SIZE
+        )
+        ser = FeedCardSerializer(rows, many=True, context={"request": request})
+        return {"next_cursor": next_cursor, "results": ser.data}
+
+    return cached(key, SEARCH_TTL, compute)
+
+
+# ---------------------------------------------------------------------------
+# Demand tracking + warming
+# ---------------------------------------------------------------------------
+
+# Warming runs outside a request; feed specs fall back to
+# CACHE_WARM["BASE_URL"] for absolute URLs (see _url_request).
+_SPECS = {
+    "feed": lambda page, profs: _feed_page_spec(None, page, profs),
+    "feed_c": lambda profs: _feed_keyset_spec(None, "", profs),
+    "events": _events_page_spec,
+    "past": _recent_past_spec,
+    "professions": _professions_spec,
+}
+
+
+def _bucket(offset=0):
+    return HITS_KEY.format(bucket=int(time.time() // 3600) - offset)
+
+
+def record_hit(kind, *args):
+    """Count a (sampled) read of a warmable payload. Never raises."""
+    if random.random() >= settings.CACHE_WARM["HIT_SAMPLE_RATE"]:
+        return
+    member = json.dumps([kind, *args])
+    if len(member) > 200:
+        return  # junk query strings aren't worth warming
+    key = _bucket()
+    try:
+        pipe = redis_client.get_client().pipeline(transaction=False)
+        pipe.zincrby(key, 1, member)
+        pipe.expire(key, 2 * 3600)
+        pipe.execute()
+    except Exception:
+        log.debug("cache hit tracking unavailable", exc_info=True)
+
+
+def hot_payloads(n):
+    """The `n` most requested payloads over the last two hours, plus ALWAYS_WARM."""
+    scores = {}
+    try:
+        client = redis_client.get_client()
+        for offset in (0, 1):
+            for member, score in client.zrevrange(
+                _bucket(offset), 0, n - 1, withscores=True
+            ):
+                scores[member] = scores.get(member, 0) + score
+    except Exception:
+        log.warning("cache hit stats unavailable — warming defaults only")
+    ranked = sorted(scores, key=scores.get, reverse=True)[:n]
+    out = [tuple(p) for p in ALWAYS_WARM]
+    for member in ranked:
+        try:
+            spec = tuple(json.loads(member))
+        except (TypeError, ValueError):
+            continue
+        if spec not in out:
+            out.append(spec)
+    return out
+
+
+def warm(kind, *args, min_remaining):
+    """Re-fill one payload if it expires within `min_remaining` seconds."""
+    spec = _SPECS.get(kind)
+    if spec is None:
+        return False
+    return cache_fill.warm(*spec(*args), min_remaining=min_remaining)
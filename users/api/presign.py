@@ -3,46 +3,101 @@ Presigned URL generation for direct-to-R2 uploads.
 
 Isolated from views for testability. The generate_presigned_url() call
 is a LOCAL crypto operation (~5 ms) — it signs the request using the
-secret key without making any network call to R2/S3.
+secret key without making any network call to R2/S3. The client comes from
+myproject.s3_client, built once per process.
+
+With USE_S3=0 and UPLOAD_STANDIN["ENABLED"], URLs are signed by
+StandInSigner instead and point at the local stand-in PUT endpoint
+(users.api.views.UploadStandInView), which writes the body to the default
+(filesystem) storage under the signed key — so the whole presign → PUT →
+confirm → process path runs offline (see the bench_uploads command).
 """
 
 import uuid
 
-import boto3
 from django.conf import settings
+from django.core import signing
+from django.urls import reverse
 
+from myproject import s3_client
 
-def generate_upload_presign(
-    user_id, content_type="image/jpeg", max_bytes=25 * 1024 * 1024
-):
-    """Generate a presigned PUT URL for direct-to-R2 upload.
 
-    Returns { url, key, content_type } — the client PUTs raw file bytes
-    directly to `url` with Content-Type header set to `content_type`.
+ALLOWED_CONTENT_TYPES = ("image/jpeg", "image/png", "video/mp4")
+
+STANDIN_SALT = "users.upload-standin"
+
+
+def presign_available():
+    """True if presigned uploads can be issued (R2, or the local stand-in)."""
+    return getattr(settings, "USE_S3", False) or settings.UPLOAD_STANDIN["ENABLED"]
+
+
+class StandInSigner:
+    """generate_presigned_url() look-alike for the local stand-in endpoint.
+
+    The token is a Django signature over (key, content type, lifetime), so
+    the endpoint accepts exactly the PUT it was issued for, once.
     """
-    ext = "mp4" if "video" in content_type else "jpg"
-    key = f"profile_pics/user_{user_id}/{uuid.uuid4()}.{ext}"
 
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        token = signing.TimestampSigner(salt=STANDIN_SALT).sign_object(
+            {"key": Params["Key"], "ct": Params["ContentType"], "ttl": ExpiresIn}
+        )
+        base = settings.UPLOAD_STANDIN["BASE_URL"].rstrip("/")
+        return f"{base}{reverse('api-upload-standin')}?token={token}"
+
+
+def read_standin_token(token):
+    """(key, content type) from a stand-in URL token.
+
+    Raises django.core.signing.BadSignature (or its SignatureExpired
+    subclass) for a forged or expired token.
+    """
+    signer = signing.TimestampSigner(salt=STANDIN_SALT)
+    ttl = signer.unsign_object(token)["ttl"]
+    claims = signer.unsign_object(token, max_age=ttl)
+    return claims["key"], claims["ct"]
+
+
+def _client():
+    if not getattr(settings, "USE_S3", False):
+        return StandInSigner()
     presign_endpoint = (
         getattr(settings, "PRESIGN_ENDPOINT_URL", None) or settings.AWS_S3_ENDPOINT_URL
     )
+    return s3_client.get_client(presign_endpoint)
 
-    s3 = boto3.client(
-        "s3",
-        endpoint_url=presign_endpoint,
-        region_name=settings.AWS_S3_REGION_NAME,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
 
+def _presign(s3, user_id, content_type):
+    ext = "mp4" if "video" in content_type else "jpg"
+    key = f"profile_pics/user_{user_id}/{uuid.uuid4()}.{ext}"
     url = s3.generate_presigned_url(
         "put_object",
         Params={
-            "Bucket": settings.AWS_STORAGE_BUCKET_NAME,
+            "Bucket": getattr(settings, "AWS_STORAGE_BUCKET_NAME", None),
             "Key": key,
             "ContentType": content_type,
         },
         ExpiresIn=300,
     )
-
     return {"url": url, "key": key, "content_type": content_type}
+
+
+def generate_upload_presign(
+    user_id, content_type="image/jpeg", max_bytes=25 * 1024 * 1024
+):
+    """Generate a presigned PUT URL for direct-to-R2 upload.
+
+    Returns { url, key, content_type } — the client PUTs raw file bytes
+    directly to `url` with Content-Type header set to `content_type`.
+    """
+    return _presign(_client(), user_id, content_type)
+
+
+def generate_upload_presigns(user_id, content_types):
+    """Presigned PUT URLs for a multi-file upload, one per content type.
+
+    Same shape as generate_upload_presign() per item.
+    """
+    s3 = _client()
+    return [_presign(s3, user_id, ct) for ct in content_types]
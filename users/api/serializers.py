@@ -1,9 +1,11 @@
 from datetime import date
 from bookings.models import Engagement
 from rest_framework import serializers
-from users.models import Profile, Upload, PAN_RE, IFSC_RE, PHONE_RE
+from users.models import FeedCard, Profile, Upload, PAN_RE, IFSC_RE, PHONE_RE
 from users.validators import validate_no_profanity
 
+from .presign import ALLOWED_CONTENT_TYPES
+
 
 def _abs_url(request, file_field) -> str:
     """
@@ -19,10 +21,44 @@ def _abs_url(request, file_field) -> str:
     return request.build_absolute_uri(url) if request else url
 
 
+def _abs_storage_url(request, storage, name) -> str:
+    """Absolute URL for a storage key that isn't a model file field."""
+    url = storage.url(name)
+    return request.build_absolute_uri(url) if request else url
+
+
+def _srcset(request, file_field, renditions) -> dict:
+    """
+    Rendition map -> {format: {width: absolute URL}}, e.g.
+    {"avif": {"320": ".../abc_320w.avif"}, "webp": {...}}. Empty until the
+    renditions task has run (or if the image is smaller than every width).
+    """
+    if not file_field or not renditions:
+        return {}
+    return {
+        fmt: {
+            width: _abs_storage_url(request, file_field.storage, name)
+            for width, name in widths.items()
+        }
+        for fmt, widths in renditions.items()
+    }
+
+
+def _smallest_rendition_url(request, file_field, renditions):
+    """Narrowest WebP rendition (decodes everywhere), else the full image."""
+    webp = (renditions or {}).get("webp")
+    if not file_field or not webp:
+        return _abs_url(request, file_field) or None
+    return _abs_storage_url(request, file_field.storage, webp[min(webp, key=int)])
+
+
 class UploadSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     image_thumbnail_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     video_url = serializers.SerializerMethodField()
+    hls_url = serializers.SerializerMethodField()
+    poster_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Upload
@@ -34,7 +70,10 @@ class UploadSerializer(serializers.ModelSerializer):
             "video",
             "image_url",
             "image_thumbnail_url",
+            "image_srcset",
             "video_url",
+            "hls_url",
+            "poster_url",
         ]
         extra_kwargs = {
             "image": {"write_only": True, "required": False},
@@ -45,11 +84,28 @@ class UploadSerializer(serializers.ModelSerializer):
         return _abs_url(self.context.get("request"), obj.image)
 
     def get_image_thumbnail_url(self, obj):
-        return _abs_url(self.context.get("request"), obj.image) if obj.image else None
+        return _smallest_rendition_url(
+            self.context.get("request"), obj.image, obj.image_renditions
+        )
+
+    def get_image_srcset(self, obj):
+        return _srcset(self.context.get("request"), obj.image, obj.image_renditions)
 
     def get_video_url(self, obj):
         return _abs_url(self.context.get("request"), obj.video)
 
+    def get_hls_url(self, obj):
+        # Empty until build_upload_hls has run (or with HLS disabled):
+        # clients fall back to video_url.
+        if not obj.video or not obj.video_hls:
+            return ""
+        return _abs_storage_url(
+            self.context.get("request"), obj.video.storage, obj.video_hls
+        )
+
+    def get_poster_url(self, obj):
+        return _abs_url(self.context.get("request"), obj.video_poster)
+
     def validate(self, attrs):
         # On update (PATCH), media fields aren't required — only caption changes.
         if self.instance is not None:
@@ -79,6 +135,36 @@ class PresignedUploadSerializer(serializers.Serializer):
         return value
 
 
+class PresignedUploadBatchSerializer(serializers.Serializer):
+    """Batch confirm: {"uploads": [{key, caption}, ...]} from one presign-batch."""
+
+    uploads = serializers.ListField(
+        child=PresignedUploadSerializer(),
+        min_length=1,
+        max_length=Upload.MAX_UPLOADS_PER_USER,
+    )
+
+    def validate_uploads(self, value):
+        keys = [u["key"] for u in value]
+        if len(set(keys)) != len(keys):
+            raise serializers.ValidationError("Duplicate storage keys.")
+        # presign-batch issues keys under the requester's own prefix
+        prefix = f"profile_pics/user_{self.context['request'].user.id}/"
+        if not all(k.startswith(prefix) for k in keys):
+            raise serializers.ValidationError("Invalid storage key.")
+        return value
+
+
+class PresignBatchSerializer(serializers.Serializer):
+    """Batch presign: {"content_types": ["image/jpeg", "video/mp4", ...]}."""
+
+    content_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=ALLOWED_CONTENT_TYPES),
+        min_length=1,
+        max_length=Upload.MAX_UPLOADS_PER_USER,
+    )
+
+
 class GlobalFeedProfileSerializer(serializers.ModelSerializer):
     """
     GLOBAL FEED serializer (other users). Mirrors users.views.global_feed:
@@ -88,6 +174,7 @@ class GlobalFeedProfileSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
     profile_picture_url = serializers.SerializerMethodField()
+    profile_picture_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
@@ -97,6 +184,7 @@ class GlobalFeedProfileSerializer(serializers.ModelSerializer):
             "username",
             "profession",
             "profile_picture_url",
+            "profile_picture_srcset",
             "is_performer",
             "bio",
         ]
@@ -104,6 +192,45 @@ class GlobalFeedProfileSerializer(serializers.ModelSerializer):
     def get_profile_picture_url(self, obj):
         return _abs_url(self.context.get("request"), obj.profile_picture)
 
+    def get_profile_picture_srcset(self, obj):
+        return _srcset(
+            self.context.get("request"),
+            obj.profile_picture,
+            obj.profile_picture_renditions,
+        )
+
+
+class FeedCardSerializer(serializers.ModelSerializer):
+    """
+    Same output shape as GlobalFeedProfileSerializer, read from the FeedCard
+    projection instead of Profile ⋈ auth_user — every field is a local column.
+    """
+
+    profile_picture_url = serializers.SerializerMethodField()
+    profile_picture_srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FeedCard
+        fields = [
+            "user_id",
+            "username",
+            "profession",
+            "profile_picture_url",
+            "profile_picture_srcset",
+            "is_performer",
+            "bio",
+        ]
+
+    def get_profile_picture_url(self, obj):
+        return _abs_url(self.context.get("request"), obj.profile_picture)
+
+    def get_profile_picture_srcset(self, obj):
+        return _srcset(
+            self.context.get("request"),
+            obj.profile_picture,
+            obj.profile_picture_renditions,
+        )
+
 
 class MeProfileSerializer(serializers.ModelSerializer):
     """
@@ -114,7 +241,9 @@ class MeProfileSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
     profile_picture_url = serializers.SerializerMethodField()
+    profile_picture_srcset = serializers.SerializerMethodField()
     cover_photo_url = serializers.SerializerMethodField()
+    cover_photo_srcset = serializers.SerializerMethodField()
     bank_account_last4 = serializers.SerializerMethodField()
     can_receive_payments = serializers.BooleanField(read_only=True)
 
@@ -128,8 +257,10 @@ class MeProfileSerializer(serializers.ModelSerializer):
             "bio",
             "profile_picture",  # write (multipart)
             "profile_picture_url",  # read
+            "profile_picture_srcset",  # read
             "cover_photo",  # write (multipart)
             "cover_photo_url",  # read
+            "cover_photo_srcset",  # read
             "is_performer",
             "is_potential_client",
             "client_approved",
@@ -161,6 +292,18 @@ class MeProfileSerializer(serializers.ModelSerializer):
     def get_cover_photo_url(self, obj):
         return _abs_url(self.context.get("request"), obj.cover_photo)
 
+    def get_profile_picture_srcset(self, obj):
+        return _srcset(
+            self.context.get("request"),
+            obj.profile_picture,
+            obj.profile_picture_renditions,
+        )
+
+    def get_cover_photo_srcset(self, obj):
+        return _srcset(
+            self.context.get("request"), obj.cover_photo, obj.cover_photo_renditions
+        )
+
     def get_bank_account_last4(self, obj):
         if not obj.bank_account_number:
             return ""
@@ -180,7 +323,9 @@ class PublicProfileDetailSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
     profile_picture_url = serializers.SerializerMethodField()
+    profile_picture_srcset = serializers.SerializerMethodField()
     cover_photo_url = serializers.SerializerMethodField()
+    cover_photo_srcset = serializers.SerializerMethodField()
     uploads = serializers.SerializerMethodField()
     gigs_count = serializers.SerializerMethodField()
     last_engagement = serializers.SerializerMethodField()
@@ -195,7 +340,9 @@ class PublicProfileDetailSerializer(serializers.ModelSerializer):
             "location",
             "bio",
             "profile_picture_url",
+            "profile_picture_srcset",
             "cover_photo_url",
+            "cover_photo_srcset",
             "is_performer",
             "uploads",
             "gigs_count",
@@ -209,6 +356,18 @@ class PublicProfileDetailSerializer(serializers.ModelSerializer):
     def get_cover_photo_url(self, obj):
         return _abs_url(self.context.get("request"), obj.cover_photo)
 
+    def get_profile_picture_srcset(self, obj):
+        return _srcset(
+            self.context.get("request"),
+            obj.profile_picture,
+            obj.profile_picture_renditions,
+        )
+
+    def get_cover_photo_srcset(self, obj):
+        return _srcset(
+            self.context.get("request"), obj.cover_photo, obj.cover_photo_renditions
+        )
+
     def get_uploads(self, obj):
         request = self.context.get("request")
         qs = Upload.objects.filter(profile=obj).order_by("-upload_date")[:50]
@@ -6,3 +6,11 @@ class AuthRateThrottle(AnonRateThrottle):
     # instead of colliding with the global AnonRateThrottle cache key.
     scope = "auth"
     rate = "5/minute"
+
+
+class PublicReadThrottle(AnonRateThrottle):
+    # Public listings are mostly answered by the CDN; origin fetches come
+    # from a handful of edge IPs, so the global 100/hour anon budget is far
+    # too small. Still bounded so cache-busting scrapers can't hammer Django.
+    scope = "public"
+    rate = "300/minute"
@@ -21,7 +21,14 @@ from .views import (
     MyUploadsAPIView,
     MyUploadDeleteAPIView,
     PresignUploadAPIView,
+    PresignUploadBatchAPIView,
+    ConfirmUploadBatchAPIView,
     GlobalFeedAPIView,
+    PublicFeedAPIView,
+    PublicLiveEventsAPIView,
+    EdgePurgeStandInView,
+    UploadStandInView,
+    ProfileSearchAPIView,
     ProfileDetailAPIView,
     RegisterPushTokenView,
     ProfessionsAPIView,
@@ -62,6 +69,16 @@ urlpatterns = [
         PresignUploadAPIView.as_view(),
         name="api-users-me-uploads-presign",
     ),
+    path(
+        "users/me/uploads/presign-batch/",
+        PresignUploadBatchAPIView.as_view(),
+        name="api-users-me-uploads-presign-batch",
+    ),
+    path(
+        "users/me/uploads/confirm-batch/",
+        ConfirmUploadBatchAPIView.as_view(),
+        name="api-users-me-uploads-confirm-batch",
+    ),
     path(
         "users/me/uploads/<int:upload_id>/",
         MyUploadDeleteAPIView.as_view(),
@@ -69,6 +86,8 @@ urlpatterns = [
     ),
     # Global feed (other users) — mirrors users.views.global_feed
     path("users/feed/", GlobalFeedAPIView.as_view(), name="api-users-feed"),
+    # Profile search (ranked, keyset-paginated)
+    path("users/search/", ProfileSearchAPIView.as_view(), name="api-users-search"),
     path(
         "users/profiles/<int:user_id>/",
         ProfileDetailAPIView.as_view(),
@@ -82,6 +101,19 @@ urlpatterns = [
         "users/live-events/", LiveEventsAPIView.as_view(), name="api-users-live-events"
     ),
     path("users/push-token/", RegisterPushTokenView.as_view(), name="api-push-token"),
+    # Public, CDN-cacheable listings (no auth) + local stand-in purge API
+    path("public/feed/", PublicFeedAPIView.as_view(), name="api-public-feed"),
+    path(
+        "public/live-events/",
+        PublicLiveEventsAPIView.as_view(),
+        name="api-public-live-events",
+    ),
+    path("edge/purge/", EdgePurgeStandInView.as_view(), name="api-edge-purge"),
+    path(
+        "uploads/standin/",
+        UploadStandInView.as_view(),
+        name="api-upload-standin",
+    ),
     # -------------------------
     # BOOKINGS (hire creation)
     # -------------------------
@@ -1,8 +1,7 @@
+import hmac
 import logging
-from datetime import date
 
 from django.contrib.auth import authenticate
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404
@@ -23,14 +22,28 @@ from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 
 from users.models import Profile, PushToken, Upload
-from bookings.models import Engagement
-
-from .presign import generate_upload_presign
-from .throttles import AuthRateThrottle
+from users.utils.search import normalize_query
+
+from myproject import edge_cache
+from myproject.renderers import ORJSONRenderer
+from myproject.cache_fill import cached
+from myproject.cache_registry import make_key
+
+from . import payloads
+from .etags import etag_from_cache
+from .presign import (
+    ALLOWED_CONTENT_TYPES,
+    generate_upload_presign,
+    generate_upload_presigns,
+    presign_available,
+    read_standin_token,
+)
+from .throttles import AuthRateThrottle, PublicReadThrottle
 from .serializers import (
     MeProfileSerializer,
-    GlobalFeedProfileSerializer,
     PublicProfileDetailSerializer,
+    PresignBatchSerializer,
+    PresignedUploadBatchSerializer,
     PresignedUploadSerializer,
     UploadSerializer,
     SignupSerializer,
@@ -39,13 +52,18 @@ from .serializers import (
 )
 
 
+def _requester(request, view_kwargs):
+    return request.user.id
+
+
 def _cached(key, timeout, compute_fn):
-    """Try cache first; fall through to compute_fn on miss."""
-    data = cache.get(key)
-    if data is None:
-        data = compute_fn()
-        cache.set(key, data, timeout)
-    return data
+    """Try cache first; fall through to compute_fn on miss.
+
+    Keys come from cache_registry.make_key(), so model writes invalidate
+    them via generation bumps — views never delete keys by hand. Fills go
+    through cache_fill.cached: one recompute at a time, stale served meanwhile.
+    """
+    return cached(key, timeout, compute_fn)
 
 
 # -------------------------------------------------------------------
@@ -224,23 +242,21 @@ class MeProfileAPIView(generics.RetrieveUpdateAPIView):
         return profile
 
     @method_decorator(cache_control(private=True, max_age=15))
+    @etag_from_cache(("me", _requester))
     def retrieve(self, request, *args, **kwargs):
-        key = f"me:{request.user.id}"
+        key = make_key("me", entity=request.user.id)
 
         def compute():
             instance = self.get_object()
             serializer = self.get_serializer(instance)
             return serializer.data
 
-        return Response(_cached(key, 15, compute))
+        return Response(_cached(key, 300, compute))
 
     @method_decorator(cache_control(no_store=True))
     def update(self, request, *args, **kwargs):
-        response = super().update(request, *args, **kwargs)
-        cache.delete(f"me:{request.user.id}")
-        cache.delete(f"profile:{request.user.id}")
-        cache.delete(f"web:profile:{request.user.id}")
-        return response
+        # Cache invalidation rides on Profile post_save (cache_registry).
+        return super().update(request, *args, **kwargs)
 
 
 class PaymentDetailsAPIView(APIView):
@@ -343,10 +359,6 @@ class PaymentDetailsAPIView(APIView):
                         "Details saved; Razorpay onboarding will be retried."
                     )
 
-        cache.delete(f"me:{request.user.id}")
-        cache.delete(f"profile:{request.user.id}")
-        cache.delete(f"web:profile:{request.user.id}")
-
         data = MeProfileSerializer(profile, context={"request": request}).data
         if warnings:
             data = {**data, "warnings": warnings}
@@ -359,14 +371,14 @@ class PresignUploadAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        if not getattr(django_settings, "USE_S3", False):
+        if not presign_available():
             return Response(
                 {"error": "Direct upload not available in local dev (USE_S3=0)"},
                 status=status.HTTP_501_NOT_IMPLEMENTED,
             )
 
         content_type = request.data.get("content_type", "image/jpeg")
-        allowed = ("image/jpeg", "image/png", "video/mp4")
+        allowed = ALLOWED_CONTENT_TYPES
         if content_type not in allowed:
             return Response(
                 {"error": f"content_type must be one of {allowed}"},
@@ -378,6 +390,65 @@ class PresignUploadAPIView(APIView):
         return Response(data)
 
 
+class PresignUploadBatchAPIView(APIView):
+    """
+    POST /api/users/me/uploads/presign-batch/ {"content_types": [...]}
+    Presigned PUT URLs for a whole multi-file upload in one round trip;
+    pair with confirm-batch.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not presign_available():
+            return Response(
+                {"error": "Direct upload not available in local dev (USE_S3=0)"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        ser = PresignBatchSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        uploads = generate_upload_presigns(
+            request.user.id, ser.validated_data["content_types"]
+        )
+        return Response({"uploads": uploads})
+
+
+class ConfirmUploadBatchAPIView(APIView):
+    """
+    POST /api/users/me/uploads/confirm-batch/ {"uploads": [{key, caption}, ...]}
+    Registers every presigned upload of a batch at once: one limit check,
+    one bulk INSERT, one cache bump, one grouped Celery enqueue for the
+    image/video processing. All-or-nothing.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        from celery import group
+
+        from users.tasks import compress_upload_video, process_uploaded_image
+
+        ser = PresignedUploadBatchSerializer(
+            data=request.data, context={"request": request}
+        )
+        ser.is_valid(raise_exception=True)
+        items = [
+            (u["key"], u.get("caption", "")) for u in ser.validated_data["uploads"]
+        ]
+        try:
+            uploads = Upload.create_batch(request.user.profile, items)
+        except ValidationError as e:
+            return Response({"detail": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        group(
+            compress_upload_video.s(u.id) if u.video else process_uploaded_image.s(u.id)
+            for u in uploads
+        ).apply_async()
+
+        out = UploadSerializer(uploads, many=True, context={"request": request})
+        return Response({"uploads": out.data}, status=status.HTTP_201_CREATED)
+
+
 class MyUploadsAPIView(generics.ListCreateAPIView):
     """
     GET/POST /api/users/me/uploads/
@@ -400,15 +471,16 @@ class MyUploadsAPIView(generics.ListCreateAPIView):
         return qs
 
     @method_decorator(cache_control(private=True, max_age=30))
+    @etag_from_cache(("uploads", _requester))
     def list(self, request, *args, **kwargs):
-        key = f"uploads:{request.user.id}"
+        key = make_key("uploads", entity=request.user.id)
 
         def compute():
             queryset = self.get_queryset()
             serializer = self.get_serializer(queryset, many=True)
             return serializer.data
 
-        return Response(_cached(key, 30, compute))
+        return Response(_cached(key, 300, compute))
 
     def create(self, request, *args, **kwargs):
         # --- Presigned flow: JSON body with { key, caption } ---
@@ -439,10 +511,6 @@ class MyUploadsAPIView(generics.ListCreateAPIView):
                     {"detail": e.message}, status=status.HTTP_400_BAD_REQUEST
                 )
 
-            cache.delete(f"uploads:{request.user.id}")
-            cache.delete(f"profile:{request.user.id}")
-            cache.delete(f"web:profile:{request.user.id}")
-
             # Background tasks
             if is_video:
                 from users.tasks import compress_upload_video
@@ -466,9 +534,6 @@ class MyUploadsAPIView(generics.ListCreateAPIView):
             upload = serializer.save(profile=profile)
         except ValidationError as e:
             raise serializers.ValidationError(e.message)
-        cache.delete(f"uploads:{self.request.user.id}")
-        cache.delete(f"profile:{self.request.user.id}")
-        cache.delete(f"web:profile:{self.request.user.id}")
         # Background ffmpeg re-encode for videos (no-op for images).
         # If the worker is offline, the message queues in Redis silently.
         if upload.video:
@@ -489,71 +554,43 @@ class MyUploadDeleteAPIView(generics.UpdateAPIView, generics.DestroyAPIView):
     lookup_url_kwarg = "upload_id"
 
     def get_queryset(self):
-        return Upload.objects.filter(profile__user=self.request.user)
-
-    def perform_update(self, serializer):
-        serializer.save()
-        cache.delete(f"uploads:{self.request.user.id}")
-        cache.delete(f"profile:{self.request.user.id}")
-        cache.delete(f"web:profile:{self.request.user.id}")
-
-    def perform_destroy(self, instance):
-        super().perform_destroy(instance)
-        cache.delete(f"uploads:{self.request.user.id}")
-        cache.delete(f"profile:{self.request.user.id}")
-        cache.delete(f"web:profile:{self.request.user.id}")
+        # select_related: the cache_registry post_save/post_delete handlers
+        # resolve the owner via upload.profile.user_id.
+        return Upload.objects.filter(profile__user=self.request.user).select_related(
+            "profile"
+        )
 
 
-class GlobalFeedAPIView(_LenientPaginatorMixin, generics.GenericAPIView):
+class GlobalFeedAPIView(APIView):
     """
     GET /api/users/feed/?professions=A&professions=B&page=1
+    GET /api/users/feed/?cursor=<opaque>  (keyset mode — infinite scroll)
 
-    Shared cache: one Redis entry per (page, profession-filter) serves ALL users.
+    Shared cache: one Redis entry per (page, profession-filter) serves ALL users
+    — and the web global_feed view too (see users.api.payloads).
     Self-exclusion happens after cache retrieval — a microsecond list filter
     instead of a per-user DB query + serialization.
+
+    Reads the FeedCard projection, so a cache miss is a single-table indexed
+    scan — no auth_user join, no deferred-field query per row.
+
+    Cursor mode is opt-in: pass `cursor` (empty for the first page) and follow
+    `next_cursor` until it is null. It skips the COUNT(*) and OFFSET scan, so
+    deep scrolling costs the same as page 1. The response carries no
+    count/num_pages in this mode.
     """
 
     permission_classes = [IsAuthenticated]
-    serializer_class = GlobalFeedProfileSerializer
 
     @method_decorator(cache_control(private=True, max_age=30))
+    @etag_from_cache("feed")
     def get(self, request):
-        profs = ",".join(sorted(request.query_params.getlist("profession", [])))
-        page = request.query_params.get("page", "1")
-        key = f"feed:{page}:{profs}"
+        professions = request.query_params.getlist("profession")
+        if "cursor" in request.query_params:
+            return self._get_keyset(request, professions)
 
-        def compute():
-            qs = (
-                Profile.objects.select_related("user")
-                .only(
-                    "user__id",
-                    "user__username",
-                    "profession",
-                    "profile_picture",
-                    "is_performer",
-                )
-                .order_by("id")
-            )
-
-            professions = [p for p in request.query_params.getlist("profession") if p]
-            if professions:
-                qs = qs.filter(profession__in=professions)
-
-            paginator, page_obj = self.paginate_lenient(qs, request)
-            ser = self.get_serializer(
-                page_obj.object_list, many=True, context={"request": request}
-            )
-
-            return {
-                "count": paginator.count,
-                "num_pages": paginator.num_pages,
-                "page": page_obj.number,
-                "has_next": page_obj.has_next(),
-                "has_previous": page_obj.has_previous(),
-                "results": ser.data,
-            }
-
-        data = _cached(key, 30, compute)
+        page = request.query_params.get("page", "1")
+        data = payloads.feed_page(request, page, professions)
 
         # Post-cache: strip the requesting user from results
         filtered = [p for p in data["results"] if p["user_id"] != request.user.id]
@@ -569,6 +606,211 @@ class GlobalFeedAPIView(_LenientPaginatorMixin, generics.GenericAPIView):
             }
         )
 
+    def _get_keyset(self, request, professions):
+        cursor = request.query_params.get("cursor", "")
+        data = payloads.feed_keyset(request, cursor, professions)
+
+        return Response(
+            {
+                "next_cursor": data["next_cursor"],
+                "has_next": data["next_cursor"] is not None,
+                "results": [
+                    p for p in data["results"] if p["user_id"] != request.user.id
+                ],
+            }
+        )
+
+
+class ProfileSearchAPIView(APIView):
+    """
+    GET /api/users/search/?q=kathak+bangalore&cursor=<opaque>
+
+    Ranked search over username, profession, location and bio — full-text
+    plus trigram (typo-tolerant) matching on Postgres, see users.utils.search.
+    Keyset-paginated like the feed's cursor mode: follow `next_cursor` until
+    it is null. One shared cache entry per (normalized query, cursor); the
+    requester is stripped post-cache.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @method_decorator(cache_control(private=True, max_age=30))
+    @etag_from_cache("search")
+    def get(self, request):
+        q = normalize_query(request.query_params.get("q"))
+        if len(q) < 2:
+            return Response(
+                {"error": "Query must be at least 2 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        data = payloads.search(request, q, request.query_params.get("cursor", ""))
+        return Response(
+            {
+                "next_cursor": data["next_cursor"],
+                "has_next": data["next_cursor"] is not None,
+                "results": [
+                    p for p in data["results"] if p["user_id"] != request.user.id
+                ],
+            }
+        )
+
+
+class PublicFeedAPIView(APIView):
+    """
+    GET /api/public/feed/?profession=A&page=1
+
+    Anonymous, edge-cacheable rendition of the feed: same cached payload as
+    GlobalFeedAPIView, but `Cache-Control: public, s-maxage` plus surrogate
+    keys, so Cloudflare answers most reads and model writes purge it
+    (myproject.edge_cache). No auth — nothing here varies by viewer, and
+    the requester isn't stripped.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [PublicReadThrottle]
+    # JSON only: a browsable-API HTML page must never reach the edge cache.
+    renderer_classes = [ORJSONRenderer]
+
+    @etag_from_cache("feed", public=True)
+    def get(self, request):
+        data = payloads.feed_page(
+            request,
+            request.query_params.get("page", "1"),
+            request.query_params.getlist("profession"),
+        )
+        keys = {"feed"} | {
+            edge_cache.surrogate_key("profile", p["user_id"]) for p in data["results"]
+        }
+        return edge_cache.make_public(Response(data), keys)
+
+
+class PublicLiveEventsAPIView(APIView):
+    """
+    GET /api/public/live-events/?scope=upcoming&page=1
+
+    Anonymous, edge-cacheable rendition of LiveEventsAPIView (see
+    PublicFeedAPIView). Client identities are dropped — only the performer
+    side of a booking is public.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [PublicReadThrottle]
+    # JSON only: a browsable-API HTML page must never reach the edge cache.
+    renderer_classes = [ORJSONRenderer]
+
+    @etag_from_cache("events", public=True)
+    def get(self, request):
+        data = payloads.events_page(
+            request.query_params.get("scope", "upcoming"),
+            request.query_params.get("page", "1"),
+        )
+        results = [
+            {k: v for k, v in e.items() if k != "client"} for e in data["results"]
+        ]
+        keys = {"events"} | {
+            edge_cache.surrogate_key("profile", e["performer"]["id"]) for e in results
+        }
+        return edge_cache.make_public(Response({**data, "results": results}), keys)
+
+
+class EdgePurgeStandInView(APIView):
+    """
+    POST /api/edge/purge/  Body: {"tags": ["feed", "profile-42"]}
+
+    Local stand-in for Cloudflare's purge_cache endpoint, so the purge path
+    (edge_cache.purge -> purge_edge_cache task -> HTTP) runs end to end in
+    dev and tests. Only live with EDGE_CACHE["LOCAL_STANDIN"]; requires the
+    same bearer token the purge task sends.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @method_decorator(cache_control(no_store=True))
+    def post(self, request):
+        conf = django_settings.EDGE_CACHE
+        if not conf["LOCAL_STANDIN"]:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        expected = f"Bearer {conf['PURGE_TOKEN']}"
+        supplied = request.headers.get("Authorization", "")
+        if not conf["PURGE_TOKEN"] or not hmac.compare_digest(supplied, expected):
+            return Response(
+                {"success": False, "errors": ["invalid token"]},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        tags = request.data.get("tags")
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            return Response(
+                {"success": False, "errors": ["tags must be a list of strings"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        edge_cache.record_standin_purge(tags)
+        return Response({"success": True, "result": {"id": "standin"}})
+
+
+class UploadStandInView(APIView):
+    """
+    PUT /api/uploads/standin/?token=<signed>  Body: raw file bytes
+
+    Local stand-in for R2's presigned PUT, so presign → PUT → confirm →
+    process runs offline with USE_S3=0. Only live with
+    UPLOAD_STANDIN["ENABLED"]. Like a presigned URL, the token is the only
+    credential: it names the storage key and content type (see
+    users.api.presign.StandInSigner) and expires with the presign.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    # R2 doesn't throttle PUTs either; presign is already rate-limited
+    throttle_classes = []
+
+    def put(self, request):
+        from io import BytesIO
+
+        from django.core import signing
+        from django.core.files.base import File
+        from django.core.files.storage import default_storage
+
+        if not django_settings.UPLOAD_STANDIN["ENABLED"] or django_settings.USE_S3:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        try:
+            key, content_type = read_standin_token(
+                request.query_params.get("token", "")
+            )
+        except signing.BadSignature:
+            return Response(
+                {"error": "invalid or expired token"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if request.content_type != content_type:
+            return Response(
+                {"error": f"Content-Type must be {content_type}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Sized from the header and streamed to storage: request.body would
+        # buffer the whole file and trip DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MiB).
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or "")
+        except ValueError:
+            return Response(
+                {"error": "Content-Length required"},
+                status=status.HTTP_411_LENGTH_REQUIRED,
+            )
+        max_bytes = 120 * 1024 * 1024 if "video" in content_type else 25 * 1024 * 1024
+        if length > max_bytes:
+            return Response(
+                {"error": "file too large"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if default_storage.exists(key):
+            return Response(
+                {"error": "already uploaded"}, status=status.HTTP_409_CONFLICT
+            )
+        default_storage.save(key, File(request.stream or BytesIO()))
+        return Response(status=status.HTTP_200_OK)
+
 
 class RegisterPushTokenView(generics.CreateAPIView):
     """
@@ -619,16 +861,17 @@ class ProfileDetailAPIView(generics.RetrieveAPIView):
         )
 
     @method_decorator(cache_control(private=True, max_age=60))
+    @etag_from_cache(("profile", lambda request, kw: kw["user_id"]))
     def retrieve(self, request, *args, **kwargs):
         user_id = self.kwargs["user_id"]
-        key = f"profile:{user_id}"
+        key = make_key("profile", entity=user_id)
 
         def compute():
             instance = self.get_object()
             serializer = self.get_serializer(instance)
             return serializer.data
 
-        return Response(_cached(key, 300, compute))
+        return Response(_cached(key, 600, compute))
 
 
 class ProfessionsAPIView(APIView):
@@ -641,82 +884,23 @@ class ProfessionsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     @method_decorator(cache_control(private=True, max_age=300))
+    @etag_from_cache("professions")
     def get(self, request):
-        def compute():
-            return list(
-                Profile.objects.exclude(profession__isnull=True)
-                .exclude(profession__exact="")
-                .values_list("profession", flat=True)
-                .distinct()
-                .order_by("profession")
-            )
+        return Response({"professions": payloads.professions()})
 
-        return Response({"professions": _cached("professions", 300, compute)})
 
-
-class LiveEventsAPIView(_LenientPaginatorMixin, APIView):
+class LiveEventsAPIView(APIView):
     """
     GET /api/users/live-events/?page=1
     Mirrors users.views.live_events: accepted upcoming engagements, paginated.
+    Shares its cache entries with that view (users.api.payloads).
     """
 
     permission_classes = [IsAuthenticated]
-    page_size = 10  # matches users.views.live_events page size
 
     @method_decorator(cache_control(private=True, max_age=30))
+    @etag_from_cache("events")
     def get(self, request):
         scope = request.query_params.get("scope", "upcoming")
         page = request.query_params.get("page", "1")
-        key = f"events:{scope}:{page}"
-
-        def compute():
-            if scope == "past":
-                # Past accepted events, newest first
-                qs = (
-                    Engagement.objects.filter(
-                        status=Engagement.STATUS_ACCEPTED,
-                        date__lt=date.today(),
-                    )
-                    .select_related("client", "performer")
-                    .order_by("-date", "-time")
-                )
-            else:
-                # Default: upcoming accepted events, soonest first
-                qs = (
-                    Engagement.objects.filter(
-                        status=Engagement.STATUS_ACCEPTED,
-                        date__gte=date.today(),
-                    )
-                    .select_related("client", "performer")
-                    .order_by("date", "time")
-                )
-
-            paginator, page_obj = self.paginate_lenient(qs, request)
-
-            results = [
-                {
-                    "id": e.id,
-                    "date": e.date,
-                    "time": e.time,
-                    "venue": e.venue,
-                    "occasion": e.occasion,
-                    "status": e.status,
-                    "client": {"id": e.client.id, "username": e.client.username},
-                    "performer": {
-                        "id": e.performer.id,
-                        "username": e.performer.username,
-                    },
-                }
-                for e in page_obj.object_list
-            ]
-
-            return {
-                "count": paginator.count,
-                "num_pages": paginator.num_pages,
-                "page": page_obj.number,
-                "has_next": page_obj.has_next(),
-                "has_previous": page_obj.has_previous(),
-                "results": results,
-            }
-
-        return Response(_cached(key, 30, compute))
+        return Response(payloads.events_page(scope, page))
@@ -6,3 +6,6 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         import users.signals  # noqa: F401 — side-effect import, activates Django signals
+        from myproject import cache_registry
+
+        cache_registry.connect_signals()
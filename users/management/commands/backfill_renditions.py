@@ -0,0 +1,48 @@
+"""
+Queue thumbnail renditions for images stored before renditions existed.
+
+New uploads get their AVIF/WebP widths at upload time
+(users.utils.image.build_renditions); this command enqueues
+generate_image_renditions for every avatar, cover photo and gallery image
+whose rendition map is still empty. Safe to re-run.
+
+    docker compose exec web python manage.py backfill_renditions [--limit N]
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.models import Profile, Upload
+from users.tasks import generate_image_renditions
+
+# (model, image field, IMAGE_PROFILES kind)
+TARGETS = (
+    (Profile, "profile_picture", "avatar"),
+    (Profile, "cover_photo", "cover"),
+    (Upload, "image", "gallery"),
+)
+
+
+class Command(BaseCommand):
+    help = "Enqueue thumbnail rendition generation for images that have none."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=0, help="Max images per field (0 = all)."
+        )
+
+    def handle(self, *args, limit=0, **options):
+        for model, field, kind in TARGETS:
+            qs = (
+                model.objects.exclude(**{f"{field}__isnull": True})
+                .exclude(**{field: ""})
+                .filter(**{f"{field}_renditions": {}})
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            if limit:
+                qs = qs[:limit]
+            count = 0
+            for pk in qs.iterator():
+                generate_image_renditions.delay(model._meta.label, pk, field, kind)
+                count += 1
+            self.stdout.write(f"{model._meta.label}.{field}: queued {count}")
@@ -0,0 +1,249 @@
+"""
+Benchmark the direct-upload path end to end and report p50/p95 per stage:
+
+    presign   POST /api/users/me/uploads/presign/
+    put       PUT of the file to the presigned URL (R2, or the local stand-in)
+    confirm   POST /api/users/me/uploads/ {"key": ...}
+    process   confirm -> renditions listed by GET /api/users/me/uploads/
+              (process_uploaded_image has finished)
+
+Each upload runs as its own throwaway user (bench_upload_<run>_<i>; exactly
+the users this run created are deleted at the end unless --keep), so
+per-user upload limits and throttles don't skew the numbers. Refuses to run
+against R2 (USE_S3=1): it is meant for the local stand-in / filesystem
+storage only. Images are random-noise JPEGs generated up front; the default
+2000x1500 comes out around 2.6 MB at quality 90 — above
+process_uploaded_image's 2 MB threshold, so the Pillow pass is part of
+"process" (1600x1200 is only ~1.7 MB and would skip it).
+
+Offline, against the local stand-in (USE_S3=0 UPLOAD_LOCAL_STANDIN=1, web
+server + Celery worker running):
+
+    python manage.py bench_uploads --base-url http://localhost:8000 -n 50 -c 8
+
+--in-process drives the views through Django's test client instead of HTTP
+(no server needed; with eager Celery, processing is timed inside confirm).
+Stored files are left for gc_media.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.authtoken.models import Token
+
+PRESIGN = "/api/users/me/uploads/presign/"
+UPLOADS = "/api/users/me/uploads/"
+STAGES = ("presign", "put", "confirm", "process", "total")
+USER_PREFIX = "bench_upload_"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def noise_jpeg(width, height):
+    img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+class HTTPTransport:
+    """Talks to a running server with requests (keep-alive sessions)."""
+
+    def __init__(self, base_url, token):
+        import requests
+
+        self.base = base_url.rstrip("/")
+        self.api = requests.Session()
+        self.api.headers["Authorization"] = f"Token {token}"
+        # No auth header on the PUT: presigned URLs carry their own signature.
+        self.raw = requests.Session()
+
+    def post(self, path, body):
+        r = self.api.post(self.base + path, json=body, timeout=60)
+        return r.status_code, r.json()
+
+    def get(self, path):
+        r = self.api.get(self.base + path, timeout=60)
+        return r.status_code, r.json()
+
+    def put(self, url, data, content_type):
+        r = self.raw.put(
+            url, data=data, headers={"Content-Type": content_type}, timeout=120
+        )
+        return r.status_code
+
+
+class InProcessTransport:
+    """Calls the views through django.test.Client — no server needed."""
+
+    def __init__(self, token):
+        from django.test import Client
+
+        self.client = Client(
+            SERVER_NAME="localhost", HTTP_AUTHORIZATION=f"Token {token}"
+        )
+
+    def post(self, path, body):
+        r = self.client.post(path, body, content_type="application/json")
+        return r.status_code, r.json()
+
+    def get(self, path):
+        r = self.client.get(path)
+        return r.status_code, r.json()
+
+    def put(self, url, data, content_type):
+        parts = urlsplit(url)
+        r = self.client.put(
+            f"{parts.path}?{parts.query}", data, content_type=content_type
+        )
+        return r.status_code
+
+
+def upload_once(api, data, timeout=120, poll=0.25):
+    """Run one upload through every stage; returns {stage: seconds}."""
+    t0 = time.perf_counter()
+    code, presign = api.post(PRESIGN, {"content_type": "image/jpeg"})
+    if code != 200:
+        raise RuntimeError(f"presign failed: {code} {presign}")
+    t1 = time.perf_counter()
+    code = api.put(presign["url"], data, "image/jpeg")
+    if code not in (200, 201, 204):
+        raise RuntimeError(f"PUT failed: {code}")
+    t2 = time.perf_counter()
+    code, upload = api.post(UPLOADS, {"key": presign["key"]})
+    if code != 201:
+        raise RuntimeError(f"confirm failed: {code} {upload}")
+    t3 = time.perf_counter()
+    while True:
+        _code, items = api.get(UPLOADS)
+        if any(i["id"] == upload["id"] and i["image_srcset"] for i in items):
+            break
+        if time.perf_counter() - t3 > timeout:
+            raise RuntimeError(f"upload {upload['id']} not processed in {timeout}s")
+        time.sleep(poll)
+    t4 = time.perf_counter()
+    return {
+        "presign": t1 - t0,
+        "put": t2 - t1,
+        "confirm": t3 - t2,
+        "process": t4 - t3,
+        "total": t4 - t0,
+    }
+
+
+def _capture(fn, *args):
+    try:
+        return True, fn(*args)
+    except Exception as e:
+        return False, str(e)
+
+
+class Command(BaseCommand):
+    help = "Time presign -> PUT -> confirm -> processing for N concurrent uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--uploads", type=int, default=20)
+        parser.add_argument("-c", "--concurrency", type=int, default=4)
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--in-process",
+            action="store_true",
+            help="Use Django's test client instead of HTTP.",
+        )
+        parser.add_argument("--width", type=int, default=2000)
+        parser.add_argument("--height", type=int, default=1500)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=120,
+            help="Seconds to wait for processing per upload.",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the bench users afterwards."
+        )
+
+    def handle(self, *args, **opts):
+        n, concurrency = opts["uploads"], opts["concurrency"]
+        if n < 1 or concurrency < 1:
+            raise CommandError("--uploads and --concurrency must be positive.")
+        if settings.USE_S3:
+            raise CommandError(
+                "bench_uploads only runs against local storage (USE_S3=0)."
+            )
+
+        user_pks, tokens = self._bench_users(n)
+        self.stdout.write(f"Generating {n} {opts['width']}x{opts['height']} images...")
+        images = [noise_jpeg(opts["width"], opts["height"]) for _ in range(n)]
+
+        def run(i):
+            if opts["in_process"]:
+                api = InProcessTransport(tokens[i])
+            else:
+                api = HTTPTransport(opts["base_url"], tokens[i])
+            try:
+                return upload_once(api, images[i], timeout=opts["timeout"])
+            finally:
+                if concurrency > 1:
+                    connections.close_all()  # this pool thread's own connections
+
+        started = time.perf_counter()
+        results, errors = [], []
+        try:
+            if concurrency == 1:
+                outcomes = [_capture(run, i) for i in range(n)]
+            else:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    outcomes = list(pool.map(lambda i: _capture(run, i), range(n)))
+            for ok, value in outcomes:
+                (results if ok else errors).append(value)
+        finally:
+            if not opts["keep"]:
+                User.objects.filter(pk__in=user_pks).delete()
+        wall = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(results)}/{n} uploads in {wall:.2f}s (concurrency {concurrency})"
+        )
+        if results:
+            self.stdout.write(
+                f"{'stage':<10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+            )
+            for stage in STAGES:
+                values = [r[stage] * 1000 for r in results]
+                self.stdout.write(
+                    f"{stage:<10}{percentile(values, 50):>10.1f}"
+                    f"{percentile(values, 95):>10.1f}{max(values):>10.1f}"
+                )
+        for error in errors[:10]:
+            self.stderr.write(f"  {error}")
+        if errors:
+            raise CommandError(f"{len(errors)} uploads failed.")
+
+    def _bench_users(self, n):
+        """Fresh bench users (profile via post_save), one per upload.
+
+        Returns (their pks, their tokens). Names carry a per-run id, so they
+        never collide with an earlier run or a real account.
+        """
+        run = uuid4().hex[:8]
+        pks, tokens = [], []
+        for i in range(n):
+            # "!" is an unusable password hash — no hashing cost, no logins
+            user = User.objects.create(username=f"{USER_PREFIX}{run}_{i}", password="!")
+            pks.append(user.pk)
+            tokens.append(Token.objects.create(user=user).key)
+        return pks, tokens
@@ -0,0 +1,69 @@
+"""
+Delete media objects that no database row references any more.
+
+Unconfirmed presigned uploads, raw originals left behind by a failed delete,
+superseded avatars/covers and their renditions, abandoned video chunks and
+the HLS ladders of deleted uploads (see users.utils.media_gc). Only objects
+older than MEDIA_GC["MIN_AGE_HOURS"] are touched. Resumable: a run stopped by
+--max-keys (or killed) carries on from its checkpoint next time.
+
+    docker compose exec web python manage.py gc_media --dry-run
+    docker compose exec web python manage.py gc_media [--max-keys N] [--prefix P]
+"""
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from users.utils.media_gc import CHECKPOINT_KEY, collect_orphans
+
+
+class Command(BaseCommand):
+    help = "Delete orphaned media objects (dry-run reports only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report orphans without deleting anything.",
+        )
+        parser.add_argument(
+            "--max-keys",
+            type=int,
+            default=0,
+            help="Stop after scanning N keys (0 = MEDIA_GC default).",
+        )
+        parser.add_argument(
+            "--prefix", default=None, help="Scan only this prefix, from the start."
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Forget the checkpoint and scan from the first key.",
+        )
+
+    def handle(
+        self,
+        *args,
+        dry_run=False,
+        max_keys=0,
+        prefix=None,
+        restart=False,
+        **options,
+    ):
+        if restart:
+            cache.delete(CHECKPOINT_KEY)
+        report = collect_orphans(dry_run=dry_run, max_keys=max_keys, only=prefix)
+        for name, stats in report["prefixes"].items():
+            self.stdout.write(
+                f"{name}: scanned {stats['scanned']}, orphans {stats['orphans']}"
+                f" ({stats['bytes'] / 1024 / 1024:.1f} MB), deleted {stats['deleted']}"
+            )
+            if dry_run:
+                for key in stats["sample"]:
+                    self.stdout.write(f"    {key}")
+        if not report["complete"]:
+            self.stdout.write("Key budget reached — run again to resume.")
+        elif dry_run:
+            self.stdout.write(self.style.WARNING("Dry run — nothing deleted."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0015_pushtoken"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["profession", "id"], name="users_profi_profess_97e097_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_feed_cards(apps, schema_editor):
+    """Project every existing Profile into a FeedCard (batched)."""
+    Profile = apps.get_model("users", "Profile")
+    FeedCard = apps.get_model("users", "FeedCard")
+    batch = []
+    for p in Profile.objects.select_related("user").iterator(chunk_size=2000):
+        batch.append(
+            FeedCard(
+                profile_id=p.pk,
+                user_id=p.user_id,
+                username=p.user.username,
+                profession=p.profession,
+                profile_picture=p.profile_picture.name or None,
+                is_performer=p.is_performer,
+                bio=p.bio,
+            )
+        )
+        if len(batch) >= 2000:
+            FeedCard.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        FeedCard.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0016_profile_users_profi_profess_97e097_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedCard",
+            fields=[
+                (
+                    "profile",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="feed_card",
+                        serialize=False,
+                        to="users.profile",
+                    ),
+                ),
+                ("user_id", models.IntegerField(unique=True)),
+                ("username", models.CharField(max_length=150)),
+                ("profession", models.CharField(blank=True, max_length=100)),
+                (
+                    "profile_picture",
+                    models.ImageField(blank=True, null=True, upload_to="profile_pics/"),
+                ),
+                ("is_performer", models.BooleanField(default=False)),
+                ("bio", models.CharField(blank=True, max_length=140)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["profession", "profile"],
+                        name="users_feedc_profess_b8c179_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_feed_cards, migrations.RunPython.noop),
+    ]
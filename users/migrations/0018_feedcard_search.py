@@ -0,0 +1,72 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:23
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# Must match the SearchVector built in users.utils.search exactly, or the
+# planner won't use the index.
+SEARCH_VECTOR_SQL = (
+    "to_tsvector('simple'::regconfig, "
+    "COALESCE(username, '') || ' ' || COALESCE(profession, '') || ' ' || "
+    "COALESCE(location, '') || ' ' || COALESCE(bio, ''))"
+)
+
+CREATE_SEARCH_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS users_feedcard_search_fts "
+    f"ON users_feedcard USING gin (({SEARCH_VECTOR_SQL}))",
+    "CREATE INDEX IF NOT EXISTS users_feedcard_username_trgm "
+    "ON users_feedcard USING gin (username gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS users_feedcard_profession_trgm "
+    "ON users_feedcard USING gin (profession gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS users_feedcard_location_trgm "
+    "ON users_feedcard USING gin (location gin_trgm_ops)",
+]
+
+DROP_SEARCH_INDEXES = [
+    "DROP INDEX IF EXISTS users_feedcard_search_fts",
+    "DROP INDEX IF EXISTS users_feedcard_username_trgm",
+    "DROP INDEX IF EXISTS users_feedcard_profession_trgm",
+    "DROP INDEX IF EXISTS users_feedcard_location_trgm",
+]
+
+
+def backfill_location(apps, schema_editor):
+    Profile = apps.get_model("users", "Profile")
+    FeedCard = apps.get_model("users", "FeedCard")
+    FeedCard.objects.update(
+        location=Subquery(
+            Profile.objects.filter(pk=OuterRef("profile_id")).values("location")[:1]
+        )
+    )
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        # GIN / pg_trgm don't exist elsewhere (settings_sqlite); search falls
+        # back to unindexed icontains there.
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0017_feedcard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feedcard",
+            name="location",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_location, migrations.RunPython.noop),
+        migrations.RunPython(
+            _run_on_postgres(CREATE_SEARCH_INDEXES),
+            _run_on_postgres(DROP_SEARCH_INDEXES),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0018_feedcard_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feedcard",
+            name="profile_picture_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="cover_photo_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="profile_picture_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="upload",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
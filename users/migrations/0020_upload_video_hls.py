@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0019_image_renditions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="upload",
+            name="video_hls",
+            field=models.CharField(
+                blank=True,
+                help_text="Storage key of the HLS master playlist.",
+                max_length=500,
+            ),
+        ),
+        migrations.AddField(
+            model_name="upload",
+            name="video_poster",
+            field=models.ImageField(blank=True, null=True, upload_to="video_posters"),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0020_upload_video_hls"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=10)),
+                ("sha256", models.CharField(max_length=64)),
+                ("dhash", models.CharField(max_length=16)),
+                (
+                    "color",
+                    models.CharField(help_text='Mean colour, "rrggbb".', max_length=6),
+                ),
+                ("width", models.PositiveIntegerField()),
+                ("height", models.PositiveIntegerField()),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Storage key of the image.", max_length=500
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("used_at", models.DateTimeField(auto_now=True)),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_fingerprints",
+                        to="users.profile",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "kind", "sha256"),
+                        name="uniq_image_fingerprint",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0023_notification_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="cover_photo_pending",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="profile_picture_pending",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.1.2 on 2026-10-17 05:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0024_profile_pending_images"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="profile",
+            name="users_profi_profess_97e097_idx",
+        ),
+    ]
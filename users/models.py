@@ -3,16 +3,55 @@ import re
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
-from users.utils.image import process_image, is_fresh_upload
+from users.utils.image import (
+    IMAGE_PROFILES,
+    color_distance,
+    hash_distance,
+    image_fingerprint,
+    is_fresh_upload,
+    process_image,
+    schedule_renditions,
+)
 
 PAN_RE = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]$")
 IFSC_RE = re.compile(r"^[A-Z]{4}0[A-Z0-9]{6}$")
 PHONE_RE = re.compile(r"^[6-9]\d{9}$")
 
 
+# Profile columns mirrored into FeedCard. Keep in sync with FeedCard.from_profile.
+FEED_CARD_FIELDS = frozenset(
+    {
+        "profession",
+        "profile_picture",
+        "profile_picture_renditions",
+        "is_performer",
+        "bio",
+        "location",
+    }
+)
+
+
+class ProfileQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Queryset .update() skips post_save, so the FeedCard read model and the
+        cache generations would silently go stale (admin bulk edits, webhook
+        handlers, tests). Re-project the affected cards when a feed-visible
+        column is touched, and bump the affected cache families.
+        """
+        from myproject import cache_registry
+
+        affected = list(self.only("pk", "user_id"))
+        rows = super().update(**kwargs)
+        if not FEED_CARD_FIELDS.isdisjoint(kwargs):
+            FeedCard.refresh_for([p.pk for p in affected])
+        cache_registry.invalidate(affected, update_fields=kwargs)
+        return rows
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     profession = models.CharField(max_length=100, blank=True, db_index=True)
@@ -21,6 +60,12 @@ class Profile(models.Model):
         upload_to="profile_pics/", blank=True, null=True
     )
     cover_photo = models.ImageField(upload_to="cover_photos/", blank=True, null=True)
+    # {format: {width: storage key}} — see users.utils.image.build_renditions
+    profile_picture_renditions = models.JSONField(default=dict, blank=True)
+    cover_photo_renditions = models.JSONField(default=dict, blank=True)
+    # Raw uploads waiting for process_profile_image; never served (see save())
+    profile_picture_pending = models.CharField(max_length=100, blank=True)
+    cover_photo_pending = models.CharField(max_length=100, blank=True)
     bio = models.CharField(max_length=140, blank=True)
 
     # --- Hiring system toggles / flags ---
@@ -118,6 +163,8 @@ class Profile(models.Model):
     )
     razorpayx_validation_id = models.CharField(max_length=64, blank=True)
 
+    objects = ProfileQuerySet.as_manager()
+
     @property
     def can_receive_payments(self) -> bool:
         """
@@ -180,12 +227,127 @@ class Profile(models.Model):
             )
 
     def save(self, *args, **kwargs):
-        # Compress only brand-new uploads. Re-saves (admin edits, etc.) skip this.
-        if is_fresh_upload(self.profile_picture):
-            self.profile_picture = process_image(self.profile_picture, "avatar")
-        if is_fresh_upload(self.cover_photo):
-            self.cover_photo = process_image(self.cover_photo, "cover")
+        # Brand-new avatar/cover files are stored raw right away, but only
+        # under <field>_pending: the raw file may carry EXIF/GPS, so the
+        # field (and the FeedCard / public feed projected from it) keeps the
+        # previous picture. The process_profile_image task swaps in the
+        # compressed, EXIF-free version (and its renditions) after commit,
+        # keeping Pillow off the gevent web worker. Re-saves (admin edits,
+        # the task's own swap) skip this.
+        fresh = []
+        for field, kind in (("profile_picture", "avatar"), ("cover_photo", "cover")):
+            fieldfile = getattr(self, field)
+            if not is_fresh_upload(fieldfile):
+                continue
+            fieldfile.save(fieldfile.name, fieldfile.file, save=False)
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Profile.objects.filter(pk=self.pk)
+                    .values_list(field, flat=True)
+                    .first()
+                )
+            setattr(self, f"{field}_pending", fieldfile.name)
+            setattr(self, field, previous)
+            fresh.append((field, kind, fieldfile.name))
+        if fresh and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                *(f"{field}_pending" for field, _, _ in fresh),
+            }
         super().save(*args, **kwargs)
+        if fresh:
+            from users.tasks import process_profile_image
+
+            pk = self.pk
+            for field, kind, raw in fresh:
+                transaction.on_commit(
+                    lambda f=field, k=kind, r=raw: process_profile_image.delay(
+                        pk, f, k, r
+                    )
+                )
+
+
+class FeedCard(models.Model):
+    """
+    Denormalized read model for the global feed — exactly the fields a feed
+    card renders, one row per Profile.
+
+    The feed used to select Profile joined to auth_user with .only(), and the
+    serializer's read of the deferred `bio` cost an extra query per row on
+    every cache miss. Reading FeedCard instead is a single-table indexed scan:
+    no join, no deferred loads.
+
+    Keyed by the profile's pk so feed ordering and keyset cursors are
+    identical to the Profile-based feed. Kept in sync by post_save handlers
+    in users.signals and by ProfileQuerySet.update(); deletes cascade.
+    """
+
+    profile = models.OneToOneField(
+        Profile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="feed_card",
+    )
+    user_id = models.IntegerField(unique=True)
+    username = models.CharField(max_length=150)
+    profession = models.CharField(max_length=100, blank=True)
+    profile_picture = models.ImageField(
+        upload_to="profile_pics/", blank=True, null=True
+    )
+    profile_picture_renditions = models.JSONField(default=dict, blank=True)
+    is_performer = models.BooleanField(default=False)
+    bio = models.CharField(max_length=140, blank=True)
+    # Not rendered on cards — kept for profile search (users.utils.search).
+    location = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        indexes = [
+            # filter(profession__in=...).order_by("profile") in one B-tree scan
+            models.Index(fields=["profession", "profile"]),
+        ]
+        # Search's GIN (full-text + trigram) indexes are Postgres-only, so
+        # they live in migration 0018 rather than here.
+
+    def __str__(self):
+        return f"FeedCard({self.username})"
+
+    @classmethod
+    def from_profile(cls, profile):
+        return cls(
+            profile_id=profile.pk,
+            user_id=profile.user_id,
+            username=profile.user.username,
+            profession=profile.profession,
+            profile_picture=profile.profile_picture.name or None,
+            profile_picture_renditions=profile.profile_picture_renditions,
+            is_performer=profile.is_performer,
+            bio=profile.bio,
+            location=profile.location,
+        )
+
+    @classmethod
+    def upsert(cls, profiles):
+        """Insert-or-update cards for `profiles` in one statement."""
+        cls.objects.bulk_create(
+            [cls.from_profile(p) for p in profiles],
+            update_conflicts=True,
+            unique_fields=["profile"],
+            update_fields=[
+                "user_id",
+                "username",
+                "profession",
+                "profile_picture",
+                "profile_picture_renditions",
+                "is_performer",
+                "bio",
+                "location",
+            ],
+        )
+
+    @classmethod
+    def refresh_for(cls, profile_ids):
+        cls.upsert(Profile.objects.filter(pk__in=profile_ids).select_related("user"))
 
 
 class PushToken(models.Model):
@@ -212,6 +374,52 @@ class PushToken(models.Model):
         return f"PushToken({self.user.username}, {self.token[:30]}...)"
 
 
+class PushTicket(models.Model):
+    """
+    An Expo push ticket awaiting its receipt.
+
+    Expo's send response only says a message was *accepted*; whether Apple /
+    Google delivered it (or said the device is gone) shows up ~15 minutes
+    later in a push receipt, looked up by ticket id. Every ok ticket is
+    recorded here with the token it was for; users.tasks.check_push_receipts
+    fetches the receipts, deletes DeviceNotRegistered tokens and then the
+    tickets. Expo keeps receipts for 24h, so older tickets are just dropped.
+    """
+
+    ticket_id = models.CharField(max_length=64, unique=True)
+    token = models.CharField(max_length=200)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"PushTicket({self.ticket_id})"
+
+
+class NotificationOutbox(models.Model):
+    """
+    A push notification waiting to be sent.
+
+    Written by users.notifications.queue_notification() in the same
+    transaction as the state change it announces, so a rolled-back hire or
+    accept never notifies anyone and a committed one always does — and the
+    request never waits on Expo. users.tasks.dispatch_notifications drains
+    the table in batches, merging a user's pending rows into one push.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    title = models.CharField(max_length=200)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"NotificationOutbox({self.user_id}, {self.title})"
+
+
 class Upload(models.Model):
     MAX_UPLOADS_PER_USER = 9
 
@@ -220,6 +428,13 @@ class Upload(models.Model):
     )
     image = models.ImageField(upload_to="profile_pics", blank=True, null=True)
     video = models.FileField(upload_to="profile_videos", blank=True, null=True)
+    # {format: {width: storage key}} — see users.utils.image.build_renditions
+    image_renditions = models.JSONField(default=dict, blank=True)
+    # Set by users.tasks.compress_upload_video / build_upload_hls
+    video_poster = models.ImageField(upload_to="video_posters", blank=True, null=True)
+    video_hls = models.CharField(
+        max_length=500, blank=True, help_text="Storage key of the HLS master playlist."
+    )
     caption = models.TextField(blank=True)
     upload_date = models.DateTimeField(auto_now_add=True)
 
@@ -239,9 +454,171 @@ class Upload(models.Model):
                 raise ValidationError(
                     f"Maximum {self.MAX_UPLOADS_PER_USER} uploads allowed."
                 )
-        if is_fresh_upload(self.image):
-            self.image = process_image(self.image, "gallery")
+        fresh = is_fresh_upload(self.image)
+        duplicate = None
+        if fresh:
+            fingerprint = image_fingerprint(self.image)
+            duplicate = ImageFingerprint.find_duplicate(
+                self.profile_id, "gallery", fingerprint
+            )
+            if duplicate:
+                # Already stored for this profile: no Pillow, no second copy.
+                self.image, self.image_renditions = duplicate
+            else:
+                self.image = process_image(self.image, "gallery")
+                self.image_renditions = {}
         super().save(*args, **kwargs)
+        if fresh and not duplicate:
+            ImageFingerprint.record(
+                self.profile_id, "gallery", fingerprint, self.image.name
+            )
+        if fresh and not self.image_renditions:
+            schedule_renditions(self, "image", "gallery")
+
+    @classmethod
+    def create_batch(cls, profile, items):
+        """Insert presigned uploads [(key, caption), ...] in one statement.
+
+        MAX_UPLOADS_PER_USER is checked once for the whole batch, under a row
+        lock on the profile so concurrent batches can't overshoot it. Skips
+        save(): presigned keys are already in storage, so there's nothing to
+        process inline — and bulk_create sends no post_save, so the owner's
+        cache families are bumped here, once.
+        """
+        from myproject import cache_registry
+
+        with transaction.atomic():
+            Profile.objects.select_for_update().only("pk").get(pk=profile.pk)
+            count = cls.objects.filter(profile=profile).count()
+            if count + len(items) > cls.MAX_UPLOADS_PER_USER:
+                raise ValidationError(
+                    f"Maximum {cls.MAX_UPLOADS_PER_USER} uploads allowed."
+                )
+            rows = []
+            for key, caption in items:
+                upload = cls(profile=profile, caption=caption)
+                if key.endswith(".mp4"):
+                    upload.video.name = key
+                else:
+                    upload.image.name = key
+                rows.append(upload)
+            created = cls.objects.bulk_create(rows)
+            cache_registry.invalidate(created)
+        return created
+
+
+class ImageFingerprint(models.Model):
+    """
+    Content + perceptual hash of a stored, processed image, per profile and
+    kind ("avatar", "cover", "gallery" — see users.utils.image.IMAGE_PROFILES).
+
+    Users re-upload the same photos (and seed_showcase re-seeds them), and
+    each copy used to be decoded, re-encoded and stored again. Upload.save(),
+    process_uploaded_image and process_profile_image look the new file up
+    here first and, on a match, point the row at the existing object and its
+    renditions instead.
+
+    Only the profile's own images are candidates. A file the profile no
+    longer uses (a replaced avatar, a deleted upload) still matches while it
+    exists in storage — re-picking last week's avatar is the common case —
+    and its row is dropped on lookup once it's gone. `used_at` records the
+    last match.
+    """
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="image_fingerprints"
+    )
+    kind = models.CharField(max_length=10)
+    sha256 = models.CharField(max_length=64)
+    dhash = models.CharField(max_length=16)
+    color = models.CharField(max_length=6, help_text='Mean colour, "rrggbb".')
+    # Displayed size of the source, before processing
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    name = models.CharField(max_length=500, help_text="Storage key of the image.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    used_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "kind", "sha256"], name="uniq_image_fingerprint"
+            ),
+        ]
+
+    def __str__(self):
+        return f"ImageFingerprint({self.kind}, {self.name})"
+
+    @classmethod
+    def find_duplicate(cls, profile_id, kind, fingerprint):
+        """(name, renditions) of a stored image matching `fingerprint`, or None.
+
+        `fingerprint` comes from users.utils.image.image_fingerprint. An
+        exact content match always wins. A perceptual match must have the
+        same aspect ratio and at least the resolution this upload would keep
+        after processing, so a re-upload in higher quality isn't swapped for
+        an older, smaller copy. `renditions` is {} when no row uses the file
+        any more; callers regenerate them (same deterministic keys).
+        """
+        if fingerprint is None or not settings.IMAGE_DEDUP["ENABLED"]:
+            return None
+        sha256, dhash, color, (w, h) = fingerprint
+        conf = settings.IMAGE_DEDUP
+        keep = min(max(w, h), IMAGE_PROFILES[kind][0])
+        rows = cls.objects.filter(profile_id=profile_id, kind=kind)
+        for row in sorted(rows, key=lambda r: r.sha256 != sha256):
+            if row.sha256 != sha256 and (
+                hash_distance(row.dhash, dhash) > conf["MAX_DISTANCE"]
+                or color_distance(row.color, color) > conf["MAX_COLOR_DISTANCE"]
+                or abs(row.width * h - row.height * w) > 0.01 * row.width * h
+                or min(max(row.width, row.height), IMAGE_PROFILES[kind][0]) < keep
+            ):
+                continue
+            renditions = row._renditions_in_use()
+            if renditions is None:
+                if not row._storage().exists(row.name):
+                    row.delete()
+                    continue
+                renditions = {}
+            row.save(update_fields=["used_at"])
+            return row.name, renditions
+        return None
+
+    @classmethod
+    def record(cls, profile_id, kind, fingerprint, name):
+        """Index the stored image `name` under `fingerprint` (None: no-op)."""
+        if fingerprint is None or not settings.IMAGE_DEDUP["ENABLED"]:
+            return
+        sha256, dhash, color, (w, h) = fingerprint
+        cls.objects.update_or_create(
+            profile_id=profile_id,
+            kind=kind,
+            sha256=sha256,
+            defaults={
+                "dhash": dhash,
+                "color": color,
+                "width": w,
+                "height": h,
+                "name": name,
+            },
+        )
+
+    def _field(self):
+        if self.kind == "gallery":
+            return Upload, "image"
+        return Profile, "profile_picture" if self.kind == "avatar" else "cover_photo"
+
+    def _storage(self):
+        model, field = self._field()
+        return model._meta.get_field(field).storage
+
+    def _renditions_in_use(self):
+        """Renditions map of a row of this profile still using `name`, or None."""
+        model, field = self._field()
+        owner = "profile_id" if model is Upload else "pk"
+        rows = model.objects.filter(**{owner: self.profile_id, field: self.name})
+        found = list(rows.values_list(f"{field}_renditions", flat=True)[:1])
+        return found[0] if found else None
 
 
 class Message(models.Model):
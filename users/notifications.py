@@ -1,29 +1,213 @@
 # users/notifications.py
 #
 # Central utility for sending push notifications via Expo's free Push API.
-# Every notification trigger in the codebase calls send_push_notification().
+# Every notification trigger in the codebase calls queue_notification(), which
+# writes a NotificationOutbox row in the caller's transaction; the
+# dispatch_notifications task drains the outbox with dispatch_outbox(), one
+# (coalesced) push per user. send_push_notification() sends one directly.
 #
-# How it works:
+# How sending works:
 # 1. Look up all push tokens (delivery addresses) for the target user.
 # 2. Build one message per token (same notification to each of their devices).
 # 3. POST them to Expo's API in a single batch request.
 # 4. If Expo reports a token as dead (user uninstalled the app), delete it
 #    from our database so we stop trying to reach a dead device.
+# 5. Record the ticket id of every accepted message. Most dead devices only
+#    show up later, in Expo's push receipts; check_receipts() (a beat task)
+#    fetches those and prunes the tokens they name.
+#
+# Broadcasts (everyone's devices) stream tokens from the DB in batches of 100
+# and keep up to EXPO_PUSH["MAX_IN_FLIGHT"] batches in flight over one pooled
+# keep-alive session, backing off when Expo rate-limits us.
 #
 # Expo's push API is free, requires no API key, and handles both iOS and
 # Android. The push token itself (issued by Expo to the app) is the auth.
 # Docs: https://docs.expo.dev/push-notifications/sending-notifications/
 
 import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from itertools import islice
+
 import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
-from users.models import PushToken
+from users.models import NotificationOutbox, PushTicket, PushToken
 
 logger = logging.getLogger(__name__)
 
 # Expo's free push notification endpoint. No signup or API key needed.
 # Accepts up to 100 messages per request.
 EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+# Delivery receipts for earlier tickets; up to 1000 ids per request.
+EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
+RECEIPT_BATCH = 1000
+BATCH_SIZE = 100
+
+_session_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+def get_session():
+    """
+    Process-wide keep-alive session for Expo, rebuilt after fork.
+
+    A fresh requests.post() opens (and TLS-handshakes) a new connection every
+    time; the session's urllib3 pool keeps up to MAX_IN_FLIGHT of them open
+    so concurrent broadcast batches reuse warm connections.
+    """
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.EXPO_PUSH["MAX_IN_FLIGHT"],
+                ),
+            )
+            session.headers.update(
+                {
+                    "Content-Type": "application/json",
+                    "Accept-Encoding": "gzip, deflate",
+                }
+            )
+            _session, _session_pid = session, os.getpid()
+    return _session
+
+
+class _RateLimit:
+    """
+    Backoff shared by every in-flight batch of one broadcast.
+
+    When Expo answers 429 (or 5xx), the batch that saw it sets a pause that
+    the other batches also wait out before their next POST — otherwise they
+    would keep hammering an API that just told us to slow down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = 0.0
+
+    @property
+    def until(self):
+        """time.monotonic() at which the current pause ends."""
+        return self._until
+
+    def wait(self):
+        delay = self._until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def back_off(self, response, attempt):
+        conf = settings.EXPO_PUSH
+        try:
+            delay = float(response.headers.get("Retry-After", ""))
+        except (TypeError, ValueError):
+            # Exponential backoff with full jitter
+            delay = random.uniform(0, conf["BACKOFF_BASE"] * 2**attempt)
+        delay = min(delay, conf["BACKOFF_MAX"])
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + delay)
+
+
+def _post(
+    payload, timeout, retries=0, rate_limit=None, url=EXPO_PUSH_URL, deadline=None
+):
+    """
+    POST one batch (messages, or receipt ids) to Expo and return the response.
+
+    Rate-limited (429) and server-error (5xx) responses are retried up to
+    `retries` times with backoff; the last response is returned either way.
+    Network errors raise requests.RequestException and are not retried —
+    push is best-effort. With a `deadline` (a time.monotonic() value), no
+    attempt starts that could outlast it: the last response is returned
+    early, or None if the batch was never sent.
+    """
+    rate_limit = rate_limit or _RateLimit()
+    response = None
+    for attempt in range(retries + 1):
+        if (
+            deadline is not None
+            and max(rate_limit.until, time.monotonic()) + timeout > deadline
+        ):
+            break
+        rate_limit.wait()
+        response = get_session().post(url, json=payload, timeout=timeout)
+        if response.status_code != 429 and response.status_code < 500:
+            break
+        if attempt < retries:
+            rate_limit.back_off(response, attempt)
+    return response
+
+
+def _message(token, title, body, data):
+    return {
+        "to": token,
+        "title": title,
+        "body": body,
+        "sound": "default",
+        "data": data or {},
+    }
+
+
+def _build_messages(tokens, title, body, data):
+    return [_message(token, title, body, data) for token in tokens]
+
+
+def _is_dead(result):
+    """Does a ticket or receipt say the device is gone?"""
+    return (
+        result.get("status") == "error"
+        and result.get("details", {}).get("error") == "DeviceNotRegistered"
+    )
+
+
+def _read_tickets(messages, results):
+    """
+    Split a send response into (dead tokens, [(ticket id, token), ...]).
+
+    Expo answers with one ticket per message, in order: either an error
+    (DeviceNotRegistered = dead now) or "ok" with an id whose receipt says
+    how delivery actually went.
+    """
+    dead, tickets = [], []
+    for msg, result in zip(messages, results):
+        if _is_dead(result):
+            dead.append(msg["to"])
+        elif result.get("status") == "ok" and result.get("id"):
+            tickets.append((result["id"], msg["to"]))
+    return dead, tickets
+
+
+def _record_tickets(tickets):
+    PushTicket.objects.bulk_create(
+        [PushTicket(ticket_id=ticket_id, token=token) for ticket_id, token in tickets],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def _delete_tokens(tokens):
+    deleted = 0
+    for i in range(0, len(tokens), 1000):
+        n, _ = PushToken.objects.filter(token__in=tokens[i : i + 1000]).delete()
+        deleted += n
+    if deleted:
+        logger.info("Removed %d dead push token(s)", deleted)
 
 
 def _clean_dead_tokens(messages, results):
@@ -32,21 +216,15 @@ def _clean_dead_tokens(messages, results):
 
     When a user uninstalls the app, Apple/Google tells Expo the token is dead.
     Expo returns "DeviceNotRegistered" for that token. We delete it so we stop
-    trying to reach a phone that can't hear us.
+    trying to reach a phone that can't hear us. Accepted messages' tickets
+    are recorded for check_receipts().
 
-    Used by both send_push_notification() (1:1) and
-    broadcast_push_notification() (batch).
+    Used by send_push_notification() (1:1); broadcasts collect dead tokens
+    across batches and delete them in bulk at the end.
     """
-    dead_tokens = []
-    for msg, result in zip(messages, results):
-        if result.get("status") == "error":
-            error_type = result.get("details", {}).get("error")
-            if error_type == "DeviceNotRegistered":
-                dead_tokens.append(msg["to"])
-
-    if dead_tokens:
-        deleted, _ = PushToken.objects.filter(token__in=dead_tokens).delete()
-        logger.info("Removed %d dead push token(s)", deleted)
+    dead, tickets = _read_tickets(messages, results)
+    _delete_tokens(dead)
+    _record_tickets(tickets)
 
 
 def send_push_notification(user, title, body, data=None):
@@ -76,25 +254,12 @@ def send_push_notification(user, title, body, data=None):
         return
 
     # Step 2: Build one message per device.
-    messages = [
-        {
-            "to": token,
-            "title": title,
-            "body": body,
-            "sound": "default",
-            "data": data or {},
-        }
-        for token in tokens
-    ]
-
-    # Step 3: Send to Expo's API in one batch request.
+    messages = _build_messages(tokens, title, body, data)
+
+    # Step 3: Send to Expo's API in one batch request. No retries: callers
+    # may be inside a request, so this stays bounded by the 5 s timeout.
     try:
-        response = requests.post(
-            EXPO_PUSH_URL,
-            json=messages,
-            headers={"Content-Type": "application/json"},
-            timeout=5,
-        )
+        response = _post(messages, timeout=5)
     except requests.RequestException:
         logger.warning("Failed to reach Expo push API for user %s", user.id)
         return
@@ -104,70 +269,376 @@ def send_push_notification(user, title, body, data=None):
         _clean_dead_tokens(messages, response.json().get("data", []))
 
 
-def broadcast_push_notification(title, body, data=None, exclude_user=None):
+def queue_notification(user, title, body, data=None):
     """
-    Send a push notification to ALL registered devices (broadcast).
+    Queue a push notification for `user`; same arguments as
+    send_push_notification().
 
-    This is for events that every user should see — like a new live event
-    appearing on the Live Events page. Unlike send_push_notification() which
-    targets one user, this queries EVERY push token in the database.
+    The outbox row is written in the caller's transaction — if that rolls
+    back, nothing is sent — and dispatch_notifications is kicked once it
+    commits. The caller never waits on Expo.
+    """
+    NotificationOutbox.objects.create(
+        user=user, title=title, body=body, data=data or {}
+    )
+    # robust: a broker hiccup must not fail a request that already committed;
+    # the beat sweep picks the row up anyway.
+    transaction.on_commit(_kick_dispatcher, robust=True)
 
-    Args:
-        title:        Notification title (e.g. "New live event!")
-        body:         Notification body (e.g. "Rajath is performing at Wedding on Aug 15")
-        data:         Optional dict for tap-to-navigate (e.g. {"screen": "LiveEvents"})
-        exclude_user: Optional User instance to skip (e.g. the performer who just
-                      accepted — they already know). Avoids a redundant notification.
 
-    Because this can mean thousands of tokens, it sends in batches of 100
-    (Expo's recommended limit per request). This function should be called
-    from a Celery task, NOT from a request/response cycle — it blocks while
-    it works through all batches.
+def _kick_dispatcher():
+    from users.tasks import dispatch_notifications
+
+    dispatch_notifications.delay()
+
+
+OUTBOX_LOCK_KEY = "notifications:outbox:lock"
+
+
+def _coalesce(rows):
     """
+    One (title, body, data) for a user's pending outbox rows, oldest first.
 
-    # Step 1: Get ALL tokens. If exclude_user is set, skip their devices.
-    qs = PushToken.objects.all()
-    if exclude_user:
-        qs = qs.exclude(user=exclude_user)
-    tokens = list(qs.values_list("token", flat=True))
+    A single row goes out as written. Several become the newest one with
+    "(+N more)" on its body; exact repeats don't count as more.
+    """
+    latest = rows[-1]
+    distinct = {(row.title, row.body) for row in rows}
+    body = latest.body
+    if len(distinct) > 1:
+        body = f"{body} (+{len(distinct) - 1} more)"
+    return latest.title, body, latest.data
 
-    if not tokens:
-        return
 
-    # Step 2: Split into chunks of 100. Expo accepts up to 100 messages per
-    # request. Sending more than 100 may get rate-limited or rejected.
-    BATCH_SIZE = 100
+def _dispatch_batch(rows, stats):
+    conf = settings.NOTIFICATION_OUTBOX
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row.user_id, []).append(row)
+    tokens = {}
+    for user_id, token in PushToken.objects.filter(user_id__in=by_user).values_list(
+        "user_id", "token"
+    ):
+        tokens.setdefault(user_id, []).append(token)
+
+    messages, owner = [], {}
+    for user_id, pending in by_user.items():
+        title, body, data = _coalesce(pending)
+        for token in tokens.get(user_id, ()):
+            messages.append(_message(token, title, body, data))
+            owner[token] = user_id
+    failed = []
+    if messages:
+        send_messages(messages, failed=failed)
+
+    # A user whose batch failed keeps their rows for the next run, up to
+    # MAX_ATTEMPTS; everyone else's are done (including users with no device).
+    retry_users = {owner[token] for token in failed}
+    done = [row.pk for row in rows if row.user_id not in retry_users]
+    retry = [row.pk for row in rows if row.user_id in retry_users]
+    NotificationOutbox.objects.filter(pk__in=done).delete()
+    if retry:
+        NotificationOutbox.objects.filter(pk__in=retry).update(
+            attempts=F("attempts") + 1
+        )
+        dropped, _ = NotificationOutbox.objects.filter(
+            pk__in=retry, attempts__gte=conf["MAX_ATTEMPTS"]
+        ).delete()
+        if dropped:
+            logger.warning("Outbox: gave up on %d notification(s)", dropped)
+    stats["rows"] += len(rows)
+    stats["pushes"] += len(messages) - len(failed)
+    stats["retried"] += len(retry)
+
+
+def dispatch_outbox():
+    """
+    Send everything in the NotificationOutbox, NOTIFICATION_OUTBOX["BATCH_SIZE"]
+    rows at a time, merging each user's pending rows into one push.
+
+    Runs single-flight behind a cache lock (a second dispatcher returns None
+    straight away). Rows whose push failed are retried by the next run;
+    everything else is deleted once sent. Returns {"rows", "pushes",
+    "retried"}.
+    """
+    conf = settings.NOTIFICATION_OUTBOX
+    if not cache.add(OUTBOX_LOCK_KEY, 1, conf["LOCK_TIMEOUT"]):
+        return None
+    stats = {"rows": 0, "pushes": 0, "retried": 0}
+    try:
+        last_id = 0
+        while True:
+            rows = list(
+                NotificationOutbox.objects.filter(id__gt=last_id).order_by("id")[
+                    : conf["BATCH_SIZE"]
+                ]
+            )
+            if not rows:
+                break
+            last_id = rows[-1].pk
+            _dispatch_batch(rows, stats)
+    finally:
+        cache.delete(OUTBOX_LOCK_KEY)
+    return stats
+
+
+def send_to_tokens(tokens, title, body, data=None, failed=None, deadline=None):
+    """Send one notification to every token in the iterable `tokens`."""
+    return send_messages(
+        (_message(token, title, body, data) for token in tokens),
+        failed=failed,
+        deadline=deadline,
+    )
 
-    for i in range(0, len(tokens), BATCH_SIZE):
-        batch = tokens[i : i + BATCH_SIZE]
 
-        messages = [
-            {
-                "to": token,
-                "title": title,
-                "body": body,
-                "sound": "default",
-                "data": data or {},
-            }
-            for token in batch
-        ]
+def send_messages(messages, failed=None, deadline=None):
+    """
+    Send an iterable of Expo message dicts.
+
+    Messages are consumed lazily in batches of BATCH_SIZE, with at most
+    EXPO_PUSH["MAX_IN_FLIGHT"] batches being sent at once, so memory stays
+    flat however many tokens there are. A failed batch is logged and
+    skipped; the rest still go out. If `failed` is a list, the tokens of
+    failed batches are appended to it (for a targeted retry). With a
+    `deadline` (time.monotonic()), batches that would have to wait or back
+    off past it are not sent and count as failed, so the caller finishes in
+    time to retry them.
+    DeviceNotRegistered tokens are deleted once all batches are done;
+    tickets are recorded for check_receipts() as they come in.
+
+    Returns {"tokens": n, "batches": n, "failed_batches": n}.
+    """
+    conf = settings.EXPO_PUSH
+    max_in_flight = conf["MAX_IN_FLIGHT"]
+    rate_limit = _RateLimit()
+    stats = {"tokens": 0, "batches": 0, "failed_batches": 0}
+    dead, tickets = [], []
+    in_flight = {}  # future -> the messages it is sending
 
+    def send(batch):
         try:
-            response = requests.post(
-                EXPO_PUSH_URL,
-                json=messages,
-                headers={"Content-Type": "application/json"},
-                timeout=10,
+            return _post(
+                batch,
+                timeout=conf["TIMEOUT"],
+                retries=conf["MAX_RETRIES"],
+                rate_limit=rate_limit,
+                deadline=deadline,
             )
         except requests.RequestException:
-            logger.warning("Broadcast batch %d-%d failed (network)", i, i + len(batch))
+            return None
+
+    # Results are handled here, on the calling thread, so only it touches
+    # the database.
+    def collect(futures):
+        for future in futures:
+            batch, response = in_flight.pop(future), future.result()
+            if response is None or not response.ok:
+                stats["failed_batches"] += 1
+                if failed is not None:
+                    failed.extend(m["to"] for m in batch)
+                logger.warning(
+                    "Push batch of %d failed (%s)",
+                    len(batch),
+                    "no response" if response is None else response.status_code,
+                )
+                continue
+            try:
+                batch_dead, batch_tickets = _read_tickets(
+                    batch, response.json().get("data", [])
+                )
+            except ValueError:
+                logger.warning("Push batch: unreadable Expo response")
+                continue
+            dead.extend(batch_dead)
+            tickets.extend(batch_tickets)
+            if len(tickets) >= 1000:
+                _record_tickets(tickets)
+                tickets.clear()
+
+    messages = iter(messages)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while batch := list(islice(messages, BATCH_SIZE)):
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight[pool.submit(send, batch)] = batch
+            stats["tokens"] += len(batch)
+            stats["batches"] += 1
+        collect(list(in_flight))
+
+    _delete_tokens(dead)
+    _record_tickets(tickets)
+    return stats
+
+
+def check_receipts(max_tickets=None):
+    """
+    Fetch receipts for tickets older than EXPO_PUSH["RECEIPT_DELAY"] and
+    delete the tokens whose receipt says DeviceNotRegistered.
+
+    Tickets are walked in id order, RECEIPT_BATCH ids per getReceipts call;
+    each batch's dead tokens are deleted in one query, then its tickets. A
+    ticket with no receipt yet is kept for the next run until Expo's 24h
+    retention has passed. Stops after `max_tickets` (default
+    EXPO_PUSH["RECEIPT_MAX_PER_RUN"]). Returns
+    {"checked": n, "dead": n, "errors": {error: n}}.
+    """
+    conf = settings.EXPO_PUSH
+    budget = max_tickets or conf["RECEIPT_MAX_PER_RUN"]
+    now = timezone.now()
+    # Expo keeps receipts for 24 hours; past that there is nothing to ask for.
+    PushTicket.objects.filter(created_at__lt=now - timedelta(hours=24)).delete()
+
+    pending = PushTicket.objects.filter(
+        created_at__lt=now - timedelta(seconds=conf["RECEIPT_DELAY"])
+    ).order_by("id")
+    rate_limit = _RateLimit()
+    stats = {"checked": 0, "dead": 0, "errors": {}}
+    last_id = 0
+    while stats["checked"] < budget:
+        batch = list(
+            pending.filter(id__gt=last_id).values_list("id", "ticket_id", "token")[
+                : min(RECEIPT_BATCH, budget - stats["checked"])
+            ]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        try:
+            response = _post(
+                {"ids": [ticket_id for _, ticket_id, _ in batch]},
+                timeout=conf["TIMEOUT"],
+                retries=conf["MAX_RETRIES"],
+                rate_limit=rate_limit,
+                url=EXPO_RECEIPTS_URL,
+            )
+            receipts = response.json().get("data", {}) if response.ok else None
+        except (requests.RequestException, ValueError):
+            receipts = None
+        if receipts is None:
+            logger.warning("Push receipts: batch of %d not fetched", len(batch))
+            break
+
+        dead, done = [], []
+        for pk, ticket_id, token in batch:
+            receipt = receipts.get(ticket_id)
+            if receipt is None:
+                continue  # not ready yet
+            done.append(pk)
+            if receipt.get("status") == "error":
+                error = receipt.get("details", {}).get("error", "unknown")
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+                if _is_dead(receipt):
+                    dead.append(token)
+        _delete_tokens(dead)
+        PushTicket.objects.filter(id__in=done).delete()
+        stats["checked"] += len(batch)
+        stats["dead"] += len(dead)
+
+    if stats["errors"]:
+        logger.info("Push receipts: %s", stats["errors"])
+    return stats
+
+
+def broadcast_tokens(exclude_user=None):
+    """Every PushToken a broadcast goes to; `exclude_user` is a User or id."""
+    qs = PushToken.objects.all()
+    if exclude_user:
+        qs = qs.exclude(user=exclude_user)
+    return qs
+
+
+def token_id_ranges(qs, size):
+    """
+    Split `qs` into consecutive PushToken id ranges of about `size` tokens.
+
+    Returns [(first_id, next_first_id), ...] — half-open, and the last
+    range is open-ended (None) so tokens registered after the split still
+    land in a chunk. One indexed keyset query per range; no ids are loaded.
+    """
+    ids = qs.order_by("id").values_list("id", flat=True)
+    lo = ids.first()
+    ranges = []
+    while lo is not None:
+        nxt = next(iter(ids.filter(id__gte=lo)[size : size + 1]), None)
+        ranges.append((lo, nxt))
+        lo = nxt
+    return ranges
+
+
+# Fan-out progress (users.tasks.fan_out_broadcast): one cache counter per
+# field, bumped atomically by each chunk task as it finishes.
+PROGRESS_FIELDS = ("chunks", "done", "sent", "failed")
+PROGRESS_TTL = 24 * 3600
+
+
+def _progress_key(broadcast_id, field):
+    return f"broadcast:{broadcast_id}:{field}"
+
+
+def start_progress(broadcast_id, chunks):
+    cache.set_many(
+        {
+            _progress_key(broadcast_id, field): chunks if field == "chunks" else 0
+            for field in PROGRESS_FIELDS
+        },
+        PROGRESS_TTL,
+    )
+
+
+def add_progress(broadcast_id, sent, failed, finished=True):
+    """Add `sent` delivered / `failed` given-up tokens; `finished` counts a chunk."""
+    for field, n in (("done", int(finished)), ("sent", sent), ("failed", failed)):
+        if not n:
             continue
+        try:
+            cache.incr(_progress_key(broadcast_id, field), n)
+        except ValueError:
+            pass  # counters expired; progress is informational only
+
 
-        if response.ok:
-            _clean_dead_tokens(messages, response.json().get("data", []))
+def broadcast_progress(broadcast_id):
+    """{"chunks", "done", "sent", "failed"} for a fan-out, or None if unknown."""
+    keys = {_progress_key(broadcast_id, f): f for f in PROGRESS_FIELDS}
+    found = cache.get_many(list(keys))
+    if not found:
+        return None
+    return {keys[k]: v for k, v in found.items()}
 
-    logger.info(
-        "Broadcast complete: %d tokens in %d batches",
-        len(tokens),
-        (len(tokens) + BATCH_SIZE - 1) // BATCH_SIZE,
+
+def broadcast_push_notification(title, body, data=None, exclude_user=None):
+    """
+    Send a push notification to ALL registered devices (broadcast).
+
+    This is for events that every user should see — like a new live event
+    appearing on the Live Events page. Unlike send_push_notification() which
+    targets one user, this queries EVERY push token in the database.
+
+    Args:
+        title:        Notification title (e.g. "New live event!")
+        body:         Notification body (e.g. "Rajath is performing at Wedding on Aug 15")
+        data:         Optional dict for tap-to-navigate (e.g. {"screen": "LiveEvents"})
+        exclude_user: Optional User instance to skip (e.g. the performer who just
+                      accepted — they already know). Avoids a redundant notification.
+
+    Tokens are streamed from the database (never all loaded at once) and sent
+    by send_to_tokens() in concurrent batches of 100 (Expo's per-request
+    limit). This should be called from a Celery task, NOT from a
+    request/response cycle. Large audiences should go through
+    users.tasks.fan_out_broadcast instead, which splits them across workers.
+    """
+    tokens = (
+        broadcast_tokens(exclude_user)
+        .order_by()
+        .values_list("token", flat=True)
+        .iterator(chunk_size=2000)
     )
+    stats = send_to_tokens(tokens, title, body, data)
+    if stats["tokens"]:
+        logger.info(
+            "Broadcast complete: %d tokens in %d batches (%d failed)",
+            stats["tokens"],
+            stats["batches"],
+            stats["failed_batches"],
+        )
+    return stats
@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import Profile
+from .models import FEED_CARD_FIELDS, FeedCard, Profile
 
 from allauth.account.signals import user_signed_up
 from django.contrib.auth import get_user_model
@@ -13,6 +13,24 @@ def create_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 
+@receiver(post_save, sender=Profile)
+def sync_feed_card(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return  # loaddata: profiles may arrive before their users
+    if update_fields is not None and FEED_CARD_FIELDS.isdisjoint(update_fields):
+        return  # e.g. KYC/payout bookkeeping — nothing the feed renders
+    FeedCard.upsert([instance])
+
+
+@receiver(post_save, sender=User)
+def sync_feed_card_username(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login only — skip them; new users get their card via
+    # the Profile post_save above.
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    FeedCard.objects.filter(user_id=instance.id).update(username=instance.username)
+
+
 User = get_user_model()
 
 
@@ -3,35 +3,106 @@ Celery tasks for the users app.
 
 `compress_upload_video` re-encodes a stored Upload.video to ~1080p H.264 CRF 24
 in the background. The user's upload completes immediately with the raw video;
-the worker swaps in the compressed version ~10-30s later, transparently.
+the worker swaps in the compressed version ~10-30s later, transparently. It
+also extracts a poster JPEG and, with VIDEO_HLS["ENABLED"], queues
+`build_upload_hls` to package an adaptive-bitrate HLS ladder — a chord of
+`encode_hls_rung` tasks, one per rung, joined by `finish_upload_hls`. Long
+videos are split at keyframes and encoded as a chord of `encode_video_chunk`
+tasks joined by `finish_chunked_video`.
 
 `process_uploaded_image` conditionally resizes/strips EXIF for presigned image
 uploads > 2 MB. Files ≤ 2 MB are assumed client-compressed and skipped.
+Either way it then writes the image's thumbnail renditions.
+
+`process_profile_image` does the same for avatars and cover photos: the raw
+file is stored by the request as pending (the previous picture stays up)
+and the compressed version (plus renditions) is swapped in here, after
+commit.
+
+`generate_image_renditions` writes the small AVIF/WebP widths for a stored
+image field (users.utils.image.build_renditions); Upload.save() queues it
+for fresh multipart uploads.
+
+`warm_hot_caches` (beat, every minute) re-fills the most requested feed and
+live-events cache entries just before they expire.
+
+`collect_orphan_media` (beat, daily) deletes media objects no row references
+any more (see users.utils.media_gc).
+
+`notify_new_live_event` debounces "new live event" broadcasts: the first
+accept in a LIVE_EVENT_DIGEST window schedules `send_live_event_digest`,
+which announces everything accepted meanwhile in one push via
+`fan_out_broadcast` — a group of `send_broadcast_chunk` tasks, one per
+PushToken id range, each retried on its own.
+
+`dispatch_notifications` sends what queue_notification() put in the
+NotificationOutbox — kicked on commit, and swept every minute by beat.
+
+`check_push_receipts` (beat, every 15 minutes) fetches Expo push receipts and
+prunes the tokens of devices that are gone.
+
+`purge_edge_cache` tells the CDN to drop public pages by surrogate key after
+a write (see myproject.edge_cache).
 
 Non-regression contract: ON ANY FAILURE the raw file stays in R2 unchanged —
 the Upload row is never broken; the file just stays at its original size.
 """
 
 import os
+import shutil
 import subprocess
 import tempfile
+import time
 import logging
 
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files import File
 
-from users.notifications import broadcast_push_notification
+from users.notifications import (
+    add_progress,
+    broadcast_tokens,
+    check_receipts,
+    dispatch_outbox,
+    send_to_tokens,
+    start_progress,
+    token_id_ranges,
+)
+from users.utils.video import (
+    MASTER_PLAYLIST,
+    compress_video,
+    concat_with_audio,
+    encode_chunk,
+    encode_rung,
+    extract_poster,
+    ladder_for,
+    master_playlist,
+    probe_dimensions,
+    probe_duration,
+    split_at_keyframes,
+    store_dir,
+)
 
 log = logging.getLogger(__name__)
 
+# Where chunks of segment-parallel encodes live while the chord runs.
+VIDEO_CHUNK_PREFIX = "tmp/video_chunks"
+
 
 @shared_task(time_limit=300, soft_time_limit=280)
 def compress_upload_video(upload_id):
-    """Re-encode Upload.video to ~1080p H.264 ~4 Mbps + AAC 128k.
+    """Re-encode Upload.video to ~1080p H.264 CRF 28 + AAC 128k.
 
     R2 egress is free, so downloading the raw and re-uploading the compressed
     version costs only storage. The raw key is deleted once the compressed
     version is saved successfully.
+
+    Videos longer than VIDEO_ENCODE["PARALLEL_MIN_SECONDS"] are encoded
+    segment-parallel instead: split at keyframes here (stream copy, seconds),
+    the chunks fanned out to encode_video_chunk as a chord across workers,
+    and joined by finish_chunked_video — so wall-clock time scales with the
+    worker count and no single task encodes more than CHUNK_SECONDS.
     """
     # Local import to avoid circular import at module load
     from users.models import Upload
@@ -43,43 +114,28 @@ def compress_upload_video(upload_id):
     if not upload.video:
         return
 
-    src = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
-    dst = src.name.replace(".mp4", "_out.mp4")
+    workdir = tempfile.mkdtemp(prefix="video_")
     try:
         # 1) Pull the raw video down from storage (R2 egress is free)
-        with upload.video.open("rb") as f:
-            for chunk in f.chunks():
-                src.write(chunk)
-        src.close()
+        src = os.path.join(workdir, "src.mp4")
+        _download(upload.video, src)
+
+        try:
+            duration = probe_duration(src)
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            OSError,
+            ValueError,
+        ):
+            duration = 0.0  # unknown length: single pass, as before
+        if duration > settings.VIDEO_ENCODE["PARALLEL_MIN_SECONDS"]:
+            return _start_chunked_encode(upload, src, workdir)
 
         # 2) Re-encode with ffmpeg. Fits inside 1920x1080 keeping aspect ratio.
+        dst = os.path.join(workdir, "out.mp4")
         try:
-            subprocess.run(
-                [
-                    "ffmpeg",
-                    "-i",
-                    src.name,
-                    "-vf",
-                    "scale=w=1920:h=1080:force_original_aspect_ratio=decrease:force_divisible_by=2",
-                    "-c:v",
-                    "libx264",
-                    "-crf",
-                    "28",
-                    "-preset",
-                    "fast",
-                    "-c:a",
-                    "aac",
-                    "-b:a",
-                    "128k",
-                    "-movflags",
-                    "+faststart",  # streaming-friendly
-                    "-y",
-                    dst,
-                ],
-                check=True,
-                capture_output=True,
-                timeout=270,
-            )
+            compress_video(src, dst, timeout=270)
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
             # ffmpeg blew up, timed out, or isn't installed at all
             # (OSError/FileNotFoundError) — leave the raw file in place;
@@ -88,41 +144,289 @@ def compress_upload_video(upload_id):
             log.warning("ffmpeg failed for upload %s: %s", upload_id, e)
             return
 
-        # 3) Swap the compressed file in. Pass only the basename — Django's
-        #    upload_to='profile_videos' will prepend the directory itself, so
-        #    passing the full path would double-prefix it.
-        #    AWS_S3_FILE_OVERWRITE=False also means storage assigns a new
-        #    unique suffix; we delete the raw original afterwards.
-        old_name = upload.video.name
-        basename = os.path.basename(old_name)
+        _swap_in_compressed(upload, dst, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _download(fieldfile, path):
+    with fieldfile.open("rb") as f, open(path, "wb") as out:
+        for chunk in f.chunks():
+            out.write(chunk)
+
+
+def _video_storage():
+    from users.models import Upload
+
+    return Upload._meta.get_field("video").storage
+
+
+def _start_chunked_encode(upload, src, workdir):
+    from uuid import uuid4
+
+    from celery import chord
+
+    chunk_dir = os.path.join(workdir, "chunks")
+    os.mkdir(chunk_dir)
+    try:
+        split_at_keyframes(
+            src, chunk_dir, settings.VIDEO_ENCODE["CHUNK_SECONDS"], timeout=240
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+        log.warning("keyframe split failed for upload %s: %s", upload.pk, e)
+        return "split failed"
+
+    prefix = f"{VIDEO_CHUNK_PREFIX}/{upload.pk}/{uuid4().hex}"
+    keys = store_dir(upload.video.storage, chunk_dir, prefix)
+    chord(encode_video_chunk.s(key) for key in keys)(
+        finish_chunked_video.s(upload.pk, upload.video.name)
+    )
+    return f"{len(keys)} chunks queued"
+
+
+@shared_task(time_limit=300, soft_time_limit=280)
+def encode_video_chunk(key):
+    """Encode one keyframe-aligned chunk (video only) for the chord.
+
+    Returns the encoded chunk's storage key, or None on failure — the chord
+    callback then gives up and the raw upload stays as it is.
+    """
+    storage = _video_storage()
+    workdir = tempfile.mkdtemp(prefix="chunk_")
+    try:
+        src = os.path.join(workdir, "in.mp4")
+        dst = os.path.join(workdir, "out.mp4")
+        with storage.open(key, "rb") as f, open(src, "wb") as out:
+            for chunk in f.chunks():
+                out.write(chunk)
+        try:
+            encode_chunk(src, dst, timeout=270)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            log.warning("chunk encode failed for %s: %s", key, e)
+            return None
+        encoded = key.replace(".mp4", "_enc.mp4")
+        if storage.exists(encoded):
+            storage.delete(encoded)
         with open(dst, "rb") as out:
-            upload.video.save(basename, File(out), save=True)
-        if upload.video.name != old_name:
-            try:
-                upload.video.storage.delete(old_name)
-            except Exception as e:
-                log.warning("Could not delete raw video %s: %s", old_name, e)
+            return storage.save(encoded, File(out))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        try:
+            storage.delete(key)
+        except Exception as e:
+            log.warning("Could not delete chunk %s: %s", key, e)
+
+
+@shared_task(time_limit=300, soft_time_limit=280)
+def finish_chunked_video(encoded_keys, upload_id, source_name):
+    """Chord callback: join the encoded chunks, add audio, swap the video in.
+
+    Joining is stream copy; only the audio track is encoded here, once, from
+    the raw upload. Skipped (raw kept) if any chunk failed or the video was
+    replaced meanwhile. Encoded chunks are deleted either way.
+    """
+    from users.models import Upload
 
+    storage = _video_storage()
+    workdir = tempfile.mkdtemp(prefix="join_")
+    try:
+        upload = Upload.objects.filter(pk=upload_id).first()
+        if None in encoded_keys:
+            return "chunk failed — raw kept"
+        if upload is None or upload.video.name != source_name:
+            return "video replaced — discarded"
+
+        chunks = []
+        for i, key in enumerate(encoded_keys):
+            path = os.path.join(workdir, f"chunk_{i:03d}.mp4")
+            with storage.open(key, "rb") as f, open(path, "wb") as out:
+                for chunk in f.chunks():
+                    out.write(chunk)
+            chunks.append(path)
+        src = os.path.join(workdir, "src.mp4")
+        _download(upload.video, src)
+
+        dst = os.path.join(workdir, "out.mp4")
+        try:
+            concat_with_audio(chunks, src, dst, timeout=240)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            log.warning("chunk join failed for upload %s: %s", upload_id, e)
+            return "join failed — raw kept"
+
+        _swap_in_compressed(upload, dst, workdir)
+        return f"joined {len(chunks)} chunks"
     finally:
-        for p in (src.name, dst):
-            try:
-                if os.path.exists(p):
-                    os.unlink(p)
-            except Exception:
-                pass
+        shutil.rmtree(workdir, ignore_errors=True)
+        for key in encoded_keys:
+            if key:
+                try:
+                    storage.delete(key)
+                except Exception as e:
+                    log.warning("Could not delete chunk %s: %s", key, e)
+
+
+def _swap_in_compressed(upload, dst, workdir):
+    """Poster + swap the compressed file in + drop the raw + queue HLS."""
+    # Poster frame for the player / grid tile. Optional — a failure just
+    # means the client shows its own placeholder.
+    poster = os.path.join(workdir, "poster.jpg")
+    try:
+        extract_poster(dst, poster)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+        log.warning("poster extraction failed for upload %s: %s", upload.pk, e)
+
+    # Swap the compressed file in. Pass only the basename — Django's
+    # upload_to='profile_videos' will prepend the directory itself, so
+    # passing the full path would double-prefix it.
+    # AWS_S3_FILE_OVERWRITE=False also means storage assigns a new
+    # unique suffix; we delete the raw original afterwards.
+    old_name = upload.video.name
+    basename = os.path.basename(old_name)
+    if os.path.exists(poster):
+        with open(poster, "rb") as p:
+            upload.video_poster.save(
+                os.path.splitext(basename)[0] + ".jpg", File(p), save=False
+            )
+    with open(dst, "rb") as out:
+        upload.video.save(basename, File(out), save=True)
+    if upload.video.name != old_name:
+        try:
+            upload.video.storage.delete(old_name)
+        except Exception as e:
+            log.warning("Could not delete raw video %s: %s", old_name, e)
+
+    if settings.VIDEO_HLS["ENABLED"]:
+        build_upload_hls.delay(upload.pk)
+
+
+@shared_task(time_limit=300, soft_time_limit=280)
+def build_upload_hls(upload_id):
+    """Package the (compressed) Upload.video as an HLS ladder.
+
+    Only picks the rungs here; each is encoded by its own encode_hls_rung
+    task, run as a chord across workers, so a long video costs one rung's
+    encode in wall-clock time rather than the whole ladder's, and no task
+    encodes more than one rung. Segments and playlists go under
+    `profile_videos/hls/<upload id>/`; finish_upload_hls writes the master
+    playlist and sets video_hls only once every rung is stored, so clients
+    never see a half-uploaded ladder. On failure video_hls stays empty and
+    clients keep playing the MP4.
+    """
+    from celery import chord
+
+    from users.models import Upload
+
+    try:
+        upload = Upload.objects.get(pk=upload_id)
+    except Upload.DoesNotExist:
+        return "upload not found"
+    if not upload.video:
+        return "no video"
+
+    workdir = tempfile.mkdtemp(prefix="hls_")
+    try:
+        src = os.path.join(workdir, "src.mp4")
+        _download(upload.video, src)
+        try:
+            rungs = ladder_for(*probe_dimensions(src))
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            OSError,
+            ValueError,
+        ) as e:
+            log.warning("HLS probe failed for upload %s: %s", upload_id, e)
+            return f"error: {e}"
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    source = upload.video.name
+    chord(encode_hls_rung.s(upload.pk, source, *rung) for rung in rungs)(
+        finish_upload_hls.s(upload.pk, source, rungs)
+    )
+    return f"{len(rungs)} rungs queued"
+
+
+def _hls_prefix(upload_id):
+    from users.models import Upload
+
+    return f"{Upload._meta.get_field('video').upload_to}/hls/{upload_id}"
+
+
+@shared_task(time_limit=300, soft_time_limit=280)
+def encode_hls_rung(upload_id, source_name, name, size, kbps):
+    """Encode and store one ladder rung (media playlist + segments).
+
+    Returns the rung name, or None on failure — finish_upload_hls then
+    leaves video_hls empty. Stored files of a ladder that never gets a
+    master playlist are unreferenced and go with the next gc_media run.
+    """
+    storage = _video_storage()
+    workdir = tempfile.mkdtemp(prefix="rung_")
+    try:
+        src = os.path.join(workdir, "src.mp4")
+        out_dir = os.path.join(workdir, "hls")
+        os.mkdir(out_dir)
+        try:
+            # OSError also covers a source deleted since the chord was queued
+            with storage.open(source_name, "rb") as f, open(src, "wb") as out:
+                for chunk in f.chunks():
+                    out.write(chunk)
+            encode_rung(src, out_dir, name, size, kbps, timeout=270)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            log.warning("HLS rung %s failed for upload %s: %s", name, upload_id, e)
+            return None
+        store_dir(storage, out_dir, _hls_prefix(upload_id))
+        return name
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@shared_task(time_limit=120, soft_time_limit=110)
+def finish_upload_hls(rung_names, upload_id, source_name, rungs):
+    """Chord callback: write the master playlist and publish video_hls.
+
+    Skipped if any rung failed or the video was replaced meanwhile.
+    """
+    from django.core.files.base import ContentFile
+
+    from users.models import Upload
+
+    if None in rung_names:
+        return "rung failed — MP4 only"
+    upload = Upload.objects.filter(pk=upload_id).first()
+    if upload is None or upload.video.name != source_name:
+        return "video replaced — discarded"
+
+    storage = upload.video.storage
+    key = f"{_hls_prefix(upload_id)}/{MASTER_PLAYLIST}"
+    if storage.exists(key):
+        storage.delete(key)
+    storage.save(key, ContentFile(master_playlist(rungs).encode()))
+    upload.video_hls = key
+    upload.save(update_fields=["video_hls"])
+    return f"{len(rungs)} rungs → {key}"
 
 
 @shared_task(time_limit=120, soft_time_limit=110)
 def process_uploaded_image(upload_id):
     """Conditionally resize/strip EXIF on presigned uploads > 2 MB.
 
+    The stored file is downloaded once, to a temp file, and that copy feeds
+    the fingerprint, the shrink and the renditions.
+
     - Files ≤ 2 MB: client already compressed (browser-image-compression / Expo
-      ImageManipulator). Skip — saves a download + re-upload round trip.
-    - Files > 2 MB: download from R2 → Pillow → re-upload.
+      ImageManipulator). Not re-encoded — saves a re-upload round trip.
+    - Files > 2 MB: Pillow → re-upload; renditions come from the new bytes.
     - On ANY failure: original file stays untouched in R2.
+
+    Renditions are generated afterwards in every case (already on a worker,
+    so inline rather than as another task). A duplicate of an image the
+    profile already has (users.models.ImageFingerprint) is pointed at the
+    stored copy instead, and the new key deleted.
     """
-    from users.models import Upload
-    from users.utils.image import process_image
+    from users.models import ImageFingerprint, Upload
+    from users.utils.image import image_fingerprint
 
     try:
         upload = Upload.objects.get(pk=upload_id)
@@ -132,26 +436,67 @@ def process_uploaded_image(upload_id):
     if not upload.image:
         return "no image"
 
-    # Check file size via storage backend (HEAD request, no download)
+    workdir = tempfile.mkdtemp(prefix="image_")
     try:
-        size = upload.image.storage.size(upload.image.name)
-    except Exception:
-        return "size check failed — skipping"
+        path = os.path.join(workdir, "src")
+        try:
+            _download(upload.image, path)
+        except Exception as e:
+            log.warning("Could not download upload %s: %s", upload.pk, e)
+            return f"download failed — skipping: {e}"
+
+        with open(path, "rb") as raw:
+            local = File(raw, name=upload.image.name)
+            fingerprint = image_fingerprint(local)
+            duplicate = ImageFingerprint.find_duplicate(
+                upload.profile_id, "gallery", fingerprint
+            )
+            if duplicate and duplicate[0] != upload.image.name:
+                return _reuse_duplicate_image(upload, *duplicate)
+
+            result, processed = _shrink_presigned_image(upload, local)
+            ImageFingerprint.record(
+                upload.profile_id, "gallery", fingerprint, upload.image.name
+            )
+            _save_renditions(upload, "image", "gallery", source=processed or local)
+            return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
 
-    if size <= 2 * 1024 * 1024:  # 2 MB
-        return f"skipped — {size} bytes (under 2 MB)"
 
-    # Download, process, re-upload
+def _reuse_duplicate_image(upload, name, renditions):
+    """Point the upload at the profile's stored copy and drop the new key."""
+    raw = upload.image.name
+    upload.image.name = name
+    upload.image_renditions = renditions
+    upload.save(update_fields=["image", "image_renditions"])
     try:
-        from io import BytesIO
+        upload.image.storage.delete(raw)
+    except Exception as e:
+        log.warning("Could not delete duplicate image %s: %s", raw, e)
+    if not renditions:
+        generate_image_renditions(upload._meta.label, upload.pk, "image", "gallery")
+    return f"duplicate of {name}"
+
+
+def _shrink_presigned_image(upload, local):
+    """Re-encode the downloaded copy `local` if it is over 2 MB.
 
-        with upload.image.open("rb") as f:
-            raw = BytesIO(f.read())
-            raw.name = upload.image.name.split("/")[-1]
+    Returns (result message, the processed file or None if nothing was
+    stored).
+    """
+    from users.utils.image import process_image
+
+    size = local.size
+    if size <= 2 * 1024 * 1024:  # 2 MB
+        return f"skipped — {size} bytes (under 2 MB)", None
 
-        processed = process_image(raw, "gallery")
-        if processed is raw:
-            return "pillow returned original unchanged"
+    # Pillow decodes the local copy at reduced scale, so the full-size
+    # bitmap never sits in RAM.
+    try:
+        processed = process_image(local, "gallery")
+        if processed is local:
+            return "pillow returned original unchanged", None
 
         # Save processed file — overwrites the R2 key
         old_name = upload.image.name
@@ -164,47 +509,407 @@ def process_uploaded_image(upload_id):
             except Exception as e:
                 log.warning("Could not delete original image %s: %s", old_name, e)
 
-        return f"processed — {size} → {upload.image.size} bytes"
+        return f"processed — {size} → {processed.size} bytes", processed
+
+    except Exception as e:
+        log.warning(
+            "process_uploaded_image(%s) failed: %s — original untouched", upload.pk, e
+        )
+        return f"error: {e}", None
+
+
+@shared_task(time_limit=120, soft_time_limit=110)
+def process_profile_image(profile_id, field, kind, raw_name):
+    """Swap a freshly stored avatar / cover photo in, processed.
+
+    Profile.save() stores the raw upload as `<field>_pending` — the field
+    keeps the previous picture, since the raw file may carry EXIF/GPS — and
+    queues this after commit, so Pillow never blocks a web worker. The
+    compressed file and its renditions are written first, then swapped in
+    (pending cleared) with one save(update_fields=...) — which re-projects
+    the FeedCard and bumps the profile/feed cache families like any profile
+    edit. If a newer upload took the pending slot meanwhile our output is
+    discarded. The raw file is deleted either way; on any failure the
+    previous picture stays.
+    """
+    from django.db import transaction
+
+    from users.models import ImageFingerprint, Profile
+    from users.utils.image import build_renditions, image_fingerprint, process_image
+
+    pending = f"{field}_pending"
+    profile = Profile.objects.filter(pk=profile_id, **{pending: raw_name}).first()
+    if profile is None:
+        # A newer upload took the pending slot (or the profile is gone)
+        storage = Profile._meta.get_field(field).storage
+        try:
+            storage.delete(raw_name)
+        except Exception as e:
+            log.warning("Could not delete %s: %s", raw_name, e)
+        return "superseded — discarded"
+    fieldfile = getattr(profile, field)
+    storage = fieldfile.storage
+    written = []
+    current = None
 
+    try:
+        with storage.open(raw_name, "rb") as f:
+            fingerprint = image_fingerprint(f)
+            duplicate = ImageFingerprint.find_duplicate(profile_id, kind, fingerprint)
+            processed = f if duplicate else process_image(f, kind)
+            if processed is f and not duplicate:
+                # Never publish the raw file (EXIF/GPS and all)
+                raise ValueError("image could not be processed")
+            if not duplicate:
+                filename = os.path.basename(processed.name)
+                written.append(
+                    storage.save(
+                        fieldfile.field.generate_filename(profile, filename),
+                        processed,
+                    )
+                )
+        if duplicate:
+            # The profile already has this picture stored: reuse it. It isn't
+            # ours to clean up, so nothing goes into `written`.
+            fieldfile.name, renditions = duplicate
+            if not renditions:
+                renditions = build_renditions(fieldfile, kind)
+        else:
+            fieldfile.name = written[0]
+            renditions = build_renditions(fieldfile, kind)
+            written += [n for widths in renditions.values() for n in widths.values()]
+
+        with transaction.atomic():
+            current = (
+                Profile.objects.select_for_update()
+                .filter(pk=profile_id, **{pending: raw_name})
+                .first()
+            )
+            if current is not None:
+                setattr(current, field, fieldfile.name)
+                setattr(current, f"{field}_renditions", renditions)
+                setattr(current, pending, "")
+                current.save(update_fields=[field, f"{field}_renditions", pending])
+                if not duplicate:
+                    ImageFingerprint.record(
+                        profile_id, kind, fingerprint, fieldfile.name
+                    )
     except Exception as e:
         log.warning(
-            "process_uploaded_image(%s) failed: %s — original untouched", upload_id, e
+            "process_profile_image(%s, %s) failed: %s — previous picture kept",
+            profile_id,
+            field,
+            e,
         )
-        return f"error: {e}"
+        current = None
+        Profile.objects.filter(pk=profile_id, **{pending: raw_name}).update(
+            **{pending: ""}
+        )
+
+    # The raw original is never referenced once we're done; our own output
+    # only survives a successful swap.
+    stale = [raw_name] + (written if current is None else [])
+    for name in stale:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            log.warning("Could not delete %s: %s", name, e)
+    if current is None:
+        return "not swapped"
+    return f"processed {field} → {fieldfile.name}"
+
+
+@shared_task(time_limit=120, soft_time_limit=110)
+def generate_image_renditions(model_label, pk, field, kind):
+    """Write AVIF/WebP thumbnail renditions for `<model>.<field>` and record
+    them in `<field>_renditions`.
+
+    The map is only saved if the source file is still the one we rendered —
+    a newer upload queues its own run. On failure the field stays {} and
+    clients keep using the full image.
+    """
+    from django.apps import apps
+
+    model = apps.get_model(model_label)
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None or not getattr(obj, field):
+        return "no image"
+    return _save_renditions(obj, field, kind)
+
+
+def _save_renditions(obj, field, kind, source=None):
+    """build_renditions for `obj.<field>` (decoding the local copy `source`
+    if given) and record the map if the source is still current."""
+    from users.utils.image import build_renditions
+
+    model = type(obj)
+    name = getattr(obj, field).name
+
+    renditions = build_renditions(getattr(obj, field), kind, source=source)
+    if not renditions:
+        return "no renditions"
+    if not model.objects.filter(pk=obj.pk, **{field: name}).exists():
+        return "source replaced — discarded"
+
+    setattr(obj, f"{field}_renditions", renditions)
+    obj.save(update_fields=[f"{field}_renditions"])
+    return f"{sum(len(w) for w in renditions.values())} renditions"
+
+
+LIVE_DIGEST_SCHEDULED_KEY = "live_events:digest:scheduled"
 
 
 @shared_task(time_limit=120, soft_time_limit=110)
 def notify_new_live_event(engagement_id):
     """
-    Broadcast "new live event" notification to ALL users.
+    Announce a newly accepted engagement to ALL users — debounced.
+
+    Called asynchronously from Engagement.accept() via .delay(). Accepts
+    come in bursts, and each one used to mean a full broadcast; now the
+    first accept of a window schedules send_live_event_digest
+    LIVE_EVENT_DIGEST["WINDOW_SECONDS"] later and the rest ride along, so
+    a burst becomes one "3 new live events!" push and users get at most
+    one per window. What goes out is decided from the database when the
+    digest runs (accepted, not yet announced); `engagement_id` is only
+    logged. A window of 0 sends straight away.
+    """
+    window = settings.LIVE_EVENT_DIGEST["WINDOW_SECONDS"]
+    if window <= 0:
+        return send_live_event_digest()
+    # The flag outlives the window a little so a digest stuck in the queue
+    # doesn't let a second one be scheduled behind it.
+    if cache.add(LIVE_DIGEST_SCHEDULED_KEY, engagement_id, window + 300):
+        send_live_event_digest.apply_async(countdown=window)
+        return f"digest scheduled in {window}s"
+    return "digest already scheduled"
+
+
+def _live_event_message(events):
+    """(title, body, exclude_user) announcing `events`, oldest accept first."""
+    if len(events) == 1:
+        e = events[0]
+        return (
+            "New live event!",
+            f"{e.performer.username} is performing"
+            f" at {e.occasion} on {e.date.strftime('%b %d')}",
+            # Don't notify the performer — they just tapped accept, they know.
+            e.performer,
+        )
+    names = list(dict.fromkeys(e.performer.username for e in events))
+    if len(names) == 1:
+        who = f"{names[0]} is"
+    elif len(names) == 2:
+        who = f"{names[0]} and {names[1]} are"
+    else:
+        who = f"{names[0]}, {names[1]} and {len(names) - 2} more are"
+    return (
+        f"{len(events)} new live events!",
+        f"{who} performing soon",
+        events[0].performer if len(names) == 1 else None,
+    )
+
 
-    Called asynchronously from Engagement.accept() via .delay().
-    We run this in a Celery worker (not in the request cycle) because
-    broadcasting to 50k+ users means hundreds of Expo API calls — that
-    would make the accept() response hang for minutes.
+@shared_task(time_limit=120, soft_time_limit=110)
+def send_live_event_digest():
+    """
+    Broadcast every accepted, upcoming engagement not announced yet.
 
-    time_limit=120: hard kill after 2 minutes (safety net).
-    soft_time_limit=110: Celery raises SoftTimeLimitExceeded at ~1m50s
-    so we can log and exit cleanly.
+    The rows are claimed (live_announced_at stamped) under a row lock
+    before the broadcast is queued, so overlapping digests never announce
+    the same event twice. Nothing pending = nothing sent.
     """
+    from django.db import transaction
+    from django.utils import timezone
+
     from bookings.models import Engagement
 
-    try:
-        engagement = Engagement.objects.select_related("performer", "client").get(
-            pk=engagement_id
+    # Accepts from here on schedule the next digest.
+    cache.delete(LIVE_DIGEST_SCHEDULED_KEY)
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            Engagement.objects.filter(
+                status=Engagement.STATUS_ACCEPTED,
+                live_announced_at__isnull=True,
+                date__gte=timezone.localdate(),
+            )
+            .select_related("performer")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("accepted_at")
+        )
+        if not events:
+            return "nothing to announce"
+        Engagement.objects.filter(pk__in=[e.pk for e in events]).update(
+            live_announced_at=now
         )
-    except Engagement.DoesNotExist:
-        return
 
-    broadcast_push_notification(
-        title="New live event!",
-        body=(
-            f"{engagement.performer.username} is performing"
-            f" at {engagement.occasion} on {engagement.date.strftime('%b %d')}"
-        ),
+    title, body, exclude_user = _live_event_message(events)
+    fan_out_broadcast(
+        title=title,
+        body=body,
         data={
             "screen": "LiveEvents",
         },
-        # Don't notify the performer — they just tapped accept, they know.
-        exclude_user=engagement.performer,
+        exclude_user=exclude_user,
+    )
+    return f"announced {len(events)} live event(s)"
+
+
+def fan_out_broadcast(title, body, data=None, exclude_user=None):
+    """
+    Queue a broadcast as a group of send_broadcast_chunk tasks.
+
+    The audience is split into PushToken id ranges of
+    EXPO_PUSH["BROADCAST_CHUNK"] tokens, so throughput scales with the
+    worker pool, no single task holds the whole audience against its time
+    limit, and a failing chunk is retried on its own. Returns the broadcast
+    id; users.notifications.broadcast_progress(id) reports how far it got.
+    """
+    from uuid import uuid4
+
+    from celery import group
+
+    exclude_user_id = getattr(exclude_user, "pk", exclude_user)
+    ranges = token_id_ranges(
+        broadcast_tokens(exclude_user_id), settings.EXPO_PUSH["BROADCAST_CHUNK"]
+    )
+    if not ranges:
+        return None
+    broadcast_id = uuid4().hex
+    start_progress(broadcast_id, len(ranges))
+    message = {"title": title, "body": body, "data": data or {}}
+    group(
+        send_broadcast_chunk.s(broadcast_id, lo, hi, message, exclude_user_id)
+        for lo, hi in ranges
+    ).apply_async()
+    log.info("broadcast %s: %d chunks queued", broadcast_id, len(ranges))
+    return broadcast_id
+
+
+# How long one send_broadcast_chunk may spend sending (incl. Expo backoff):
+# well inside its 110 s soft limit, leaving room for the queries around it.
+BROADCAST_CHUNK_BUDGET = 90
+
+
+@shared_task(bind=True, max_retries=3, time_limit=120, soft_time_limit=110)
+def send_broadcast_chunk(
+    self, broadcast_id, lo, hi, message, exclude_user_id=None, tokens=None
+):
+    """
+    Send one id range [lo, hi) of a fan_out_broadcast (hi None = open-ended).
+
+    Tokens whose batch failed (network, or Expo still 429/5xx after the
+    sender's own backoff) are retried with a growing countdown — only
+    those tokens, passed as `tokens`, so the rest of the chunk is never
+    sent twice. Sending stops at BROADCAST_CHUNK_BUDGET — tokens not sent by
+    then are retried the same way instead of the soft time limit cutting the
+    task off mid-chunk. Whatever is left after max_retries is counted as
+    failed.
+    """
+    from users.models import PushToken
+
+    if tokens is None:
+        qs = broadcast_tokens(exclude_user_id).filter(id__gte=lo)
+        if hi is not None:
+            qs = qs.filter(id__lt=hi)
+    else:
+        # A retry: skip tokens pruned or re-registered meanwhile
+        qs = PushToken.objects.filter(token__in=tokens)
+    failed = []
+    stats = send_to_tokens(
+        qs.order_by("id").values_list("token", flat=True).iterator(chunk_size=2000),
+        message["title"],
+        message["body"],
+        message["data"],
+        failed=failed,
+        deadline=time.monotonic() + BROADCAST_CHUNK_BUDGET,
+    )
+    sent = stats["tokens"] - len(failed)
+    if failed and self.request.retries < self.max_retries:
+        # Count what went out now; the retry counts the rest.
+        add_progress(broadcast_id, sent, 0, finished=False)
+        raise self.retry(
+            args=(broadcast_id, lo, hi, message, exclude_user_id),
+            kwargs={"tokens": failed},
+            countdown=30 * 2**self.request.retries,
+        )
+    add_progress(broadcast_id, sent, len(failed))
+    return f"broadcast {broadcast_id} [{lo}, {hi}): {sent} sent, {len(failed)} failed"
+
+
+@shared_task(time_limit=120, soft_time_limit=110)
+def warm_hot_caches():
+    """Re-fill hot feed / live-events payloads that are about to expire.
+
+    Candidates are the CACHE_WARM["TOP_N"] payloads with the most sampled
+    reads over the last two hours, plus page 1 of everything (so a deploy or
+    Redis flush is covered before the first user arrives). An entry with more
+    than CACHE_WARM["AHEAD"] seconds left is skipped, so a run over a warm
+    cache costs one GET per candidate. Returns the number recomputed.
+    """
+    from users.api import payloads
+
+    conf = settings.CACHE_WARM
+    warmed = 0
+    for kind, *args in payloads.hot_payloads(conf["TOP_N"]):
+        try:
+            if payloads.warm(kind, *args, min_remaining=conf["AHEAD"]):
+                warmed += 1
+        except Exception:
+            log.exception("warm_hot_caches: %s%r failed", kind, tuple(args))
+    return warmed
+
+
+@shared_task(bind=True, max_retries=3, time_limit=60, soft_time_limit=50)
+def purge_edge_cache(self, keys):
+    """Purge surrogate `keys` at the CDN; retried if the purge API is down.
+
+    Until the purge lands, the edge serves the old page for at most
+    EDGE_CACHE["S_MAXAGE"] seconds.
+    """
+    import requests
+
+    from myproject import edge_cache
+
+    try:
+        edge_cache.send_purge(keys)
+    except requests.RequestException as exc:
+        log.warning("purge_edge_cache(%s) failed: %s", keys, exc)
+        raise self.retry(exc=exc, countdown=30)
+
+
+@shared_task(time_limit=3600, soft_time_limit=3540)
+def collect_orphan_media():
+    """Delete orphaned media objects (users.utils.media_gc).
+
+    Scans at most MEDIA_GC["MAX_KEYS_PER_RUN"] keys; an unfinished scan
+    resumes from its checkpoint on the next run. Returns a one-line summary.
+    """
+    from users.utils.media_gc import collect_orphans
+
+    report = collect_orphans()
+    stats = report["prefixes"].values()
+    return (
+        f"scanned {sum(s['scanned'] for s in stats)}, "
+        f"deleted {sum(s['deleted'] for s in stats)}"
+        + ("" if report["complete"] else " (resumes next run)")
     )
+
+
+@shared_task(time_limit=300, soft_time_limit=280)
+def check_push_receipts():
+    """Fetch Expo push receipts and delete dead tokens (users.notifications).
+
+    Returns a one-line summary.
+    """
+    stats = check_receipts()
+    return f"checked {stats['checked']} receipts, removed {stats['dead']} tokens"
+
+
+@shared_task(time_limit=120, soft_time_limit=110)
+def dispatch_notifications():
+    """Drain the NotificationOutbox (users.notifications.dispatch_outbox)."""
+    stats = dispatch_outbox()
+    if stats is None:
+        return "another dispatcher is running"
+    return f"{stats['rows']} queued, {stats['pushes']} pushes sent"
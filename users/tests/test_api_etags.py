@@ -0,0 +1,78 @@
+"""
+ETag / 304 on cached API endpoints (users.api.etags).
+
+A matching If-None-Match must return 304 without touching the payload cache
+or the database; any write that bumps the endpoint's cache family must
+change the ETag. ETags are per requester because bodies strip the viewer.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.api import payloads
+
+ENDPOINTS = [
+    "/api/users/me/",
+    "/api/users/feed/",
+    "/api/users/professions/",
+    "/api/users/live-events/",
+]
+
+
+class TestCachedEndpointETags(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user("viewer", password="x")
+        self.artist = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.viewer)
+
+    def test_every_cached_endpoint_sends_an_etag(self):
+        for url in ENDPOINTS + [f"/api/users/profiles/{self.artist.id}/"]:
+            r = self.api.get(url)
+            self.assertEqual(r.status_code, 200, url)
+            self.assertTrue(r["ETag"].startswith('W/"'), url)
+
+    def test_matching_etag_short_circuits_before_cache_and_db(self):
+        etag = self.api.get("/api/users/feed/")["ETag"]
+        with (
+            patch.object(payloads, "feed_page") as feed_page,
+            CaptureQueriesContext(connection) as ctx,
+        ):
+            r = self.api.get("/api/users/feed/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r["ETag"], etag)
+        self.assertEqual(r.content, b"")
+        feed_page.assert_not_called()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_strong_form_of_the_tag_also_matches(self):
+        etag = self.api.get("/api/users/professions/")["ETag"]
+        r = self.api.get(
+            "/api/users/professions/", HTTP_IF_NONE_MATCH=etag.removeprefix("W/")
+        )
+        self.assertEqual(r.status_code, 304)
+
+    def test_write_changes_the_etag(self):
+        etag = self.api.get("/api/users/feed/")["ETag"]
+        profile = self.artist.profile
+        profile.profession = "Magician"
+        profile.save()
+        r = self.api.get("/api/users/feed/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r["ETag"], etag)
+        self.assertEqual(r.data["results"][0]["profession"], "Magician")
+
+    def test_etag_varies_by_query_and_requester(self):
+        page1 = self.api.get("/api/users/feed/")["ETag"]
+        page2 = self.api.get("/api/users/feed/", {"page": "2"})["ETag"]
+        self.assertNotEqual(page1, page2)
+        other = APIClient()
+        other.force_authenticate(user=self.artist)
+        self.assertNotEqual(page1, other.get("/api/users/feed/")["ETag"])
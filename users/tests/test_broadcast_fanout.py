@@ -0,0 +1,149 @@
+"""
+Tests for chunked broadcasts — users.tasks.fan_out_broadcast and
+send_broadcast_chunk, plus token_id_ranges / progress in users.notifications.
+Celery runs eagerly; Expo is mocked at the pooled session's post().
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from users.models import PushToken
+from users.notifications import broadcast_progress, token_id_ranges
+from users.tasks import fan_out_broadcast
+
+
+@pytest.fixture
+def eager(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    settings.EXPO_PUSH = {
+        **settings.EXPO_PUSH,
+        "BROADCAST_CHUNK": 4,
+        "MAX_RETRIES": 0,
+    }
+    cache.clear()
+
+
+def _make_tokens(n):
+    users = User.objects.bulk_create(
+        [User(username=f"fan{i}", password="!") for i in range(n)]
+    )
+    PushToken.objects.bulk_create(
+        [
+            PushToken(user=u, token=f"ExponentPushToken[f{i}]")
+            for i, u in enumerate(users)
+        ]
+    )
+    return users
+
+
+def _response(json, status=200):
+    resp = MagicMock(ok=status == 200, status_code=status, headers={})
+    resp.json.return_value = {"data": [{"status": "ok"}] * len(json)}
+    return resp
+
+
+def _patch_post(monkeypatch, post):
+    session = MagicMock()
+    session.post = post
+    monkeypatch.setattr("users.notifications.get_session", lambda: session)
+
+
+class TestTokenIdRanges:
+    def test_ranges_cover_every_token_once(self, db):
+        _make_tokens(10)
+        ranges = token_id_ranges(PushToken.objects.all(), 4)
+        assert len(ranges) == 3
+        assert ranges[-1][1] is None
+        covered = []
+        for lo, hi in ranges:
+            qs = PushToken.objects.filter(id__gte=lo)
+            if hi is not None:
+                qs = qs.filter(id__lt=hi)
+            covered.extend(qs.values_list("id", flat=True))
+        assert sorted(covered) == sorted(PushToken.objects.values_list("id", flat=True))
+
+    def test_no_tokens(self, db):
+        assert token_id_ranges(PushToken.objects.all(), 4) == []
+
+
+class TestFanOutBroadcast:
+    def test_every_token_sent_once_across_chunks(self, db, eager, monkeypatch):
+        users = _make_tokens(10)
+        post = MagicMock(side_effect=lambda url, json, timeout: _response(json))
+        _patch_post(monkeypatch, post)
+
+        broadcast_id = fan_out_broadcast("Hi", "There", exclude_user=users[0])
+
+        sent = [m["to"] for c in post.call_args_list for m in c.kwargs["json"]]
+        assert sorted(sent) == sorted(f"ExponentPushToken[f{i}]" for i in range(1, 10))
+        assert post.call_count == 3
+        assert broadcast_progress(broadcast_id) == {
+            "chunks": 3,
+            "done": 3,
+            "sent": 9,
+            "failed": 0,
+        }
+
+    def test_failed_chunk_retries_only_its_tokens(self, db, eager, monkeypatch):
+        _make_tokens(8)
+        calls = []
+
+        def post(url, json, timeout):
+            calls.append([m["to"] for m in json])
+            # The second chunk's first attempt fails; everything else succeeds.
+            return _response(json, status=503 if len(calls) == 2 else 200)
+
+        _patch_post(monkeypatch, post)
+
+        broadcast_id = fan_out_broadcast("Hi", "There")
+
+        assert len(calls) == 3
+        assert sorted(calls[2]) == sorted(calls[1])
+        assert not set(calls[2]) & set(calls[0])
+        assert broadcast_progress(broadcast_id) == {
+            "chunks": 2,
+            "done": 2,
+            "sent": 8,
+            "failed": 0,
+        }
+
+    def test_backoff_never_outlasts_the_chunk_budget(
+        self, db, eager, settings, monkeypatch
+    ):
+        settings.EXPO_PUSH = {**settings.EXPO_PUSH, "MAX_RETRIES": 4}
+        monkeypatch.setattr("users.tasks.BROADCAST_CHUNK_BUDGET", 15)
+        monkeypatch.setattr(
+            "users.notifications.time.sleep",
+            MagicMock(side_effect=AssertionError("slept past the budget")),
+        )
+        _make_tokens(3)
+
+        def post(url, json, timeout):
+            resp = _response(json, status=429)
+            resp.headers = {"Retry-After": "30"}
+            return resp
+
+        post = MagicMock(side_effect=post)
+        _patch_post(monkeypatch, post)
+
+        broadcast_id = fan_out_broadcast("Hi", "There")
+
+        # One attempt per run (the 30 s pause doesn't fit), then the unsent
+        # tokens go back through the task's own retries.
+        assert post.call_count == 4
+        assert broadcast_progress(broadcast_id) == {
+            "chunks": 1,
+            "done": 1,
+            "sent": 0,
+            "failed": 3,
+        }
+
+    def test_nothing_to_send(self, db, eager, monkeypatch):
+        post = MagicMock()
+        _patch_post(monkeypatch, post)
+
+        assert fan_out_broadcast("Hi", "There") is None
+        post.assert_not_called()
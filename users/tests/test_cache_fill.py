@@ -0,0 +1,129 @@
+"""
+Stampede-safe cache fill (myproject.cache_fill).
+
+A hot key expiring must trigger one recompute, not one per concurrent
+request: lock losers get the stale value, cold-miss waiters get the winner's
+value, and a failing recompute falls back to stale data.
+"""
+
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from myproject import cache_fill
+from myproject.cache_fill import _Entry, cached
+
+
+class _Counter:
+    def __init__(self, value="v"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestCachedFill(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _store(self, key, value, expires_in, delta=0.0):
+        cache.set(key, _Entry(value, delta, time.time() + expires_in), 600)
+
+    def test_miss_computes_then_hit_reuses(self):
+        fn = _Counter("fresh")
+        self.assertEqual(cached("k", 60, fn), "fresh")
+        self.assertEqual(cached("k", 60, fn), "fresh")
+        self.assertEqual(fn.calls, 1)
+
+    def test_fresh_entry_is_not_recomputed(self):
+        self._store("k", "old", expires_in=60)
+        fn = _Counter("new")
+        self.assertEqual(cached("k", 60, fn, beta=0), "old")
+        self.assertEqual(fn.calls, 0)
+
+    def test_expired_entry_is_recomputed_by_lock_holder(self):
+        self._store("k", "old", expires_in=-1)
+        fn = _Counter("new")
+        self.assertEqual(cached("k", 60, fn), "new")
+        self.assertEqual(fn.calls, 1)
+        self.assertIsNone(cache.get("lock:k"))
+
+    def test_expired_lock_taken_over_is_not_released(self):
+        # Our recompute outlives LOCK_TIMEOUT and another worker takes the lock.
+        def slow():
+            cache.set("lock:k", 42, 10)
+            return "new"
+
+        self.assertEqual(cached("k", 60, slow), "new")
+        self.assertEqual(cache.get("lock:k"), 42)
+
+    def test_warm_releases_only_its_own_lock(self):
+        self.assertTrue(cache_fill.warm("k", 60, lambda: "v", min_remaining=30))
+        self.assertIsNone(cache.get("lock:k"))
+
+        def slow():
+            cache.set("lock:k", 42, 10)
+            return "v2"
+
+        self.assertTrue(cache_fill.warm("k", 60, slow, min_remaining=120))
+        self.assertEqual(cache.get("lock:k"), 42)
+
+    def test_stale_served_while_another_worker_refreshes(self):
+        self._store("k", "old", expires_in=-1)
+        cache.add("lock:k", 1, 10)
+        fn = _Counter("new")
+        self.assertEqual(cached("k", 60, fn), "old")
+        self.assertEqual(fn.calls, 0)
+
+    def test_cold_miss_waits_for_winner(self):
+        cache.add("lock:k", 1, 10)
+        fn = _Counter("mine")
+
+        def winner_fills(_):
+            self._store("k", "winner", expires_in=60)
+
+        with patch.object(cache_fill.time, "sleep", side_effect=winner_fills):
+            self.assertEqual(cached("k", 60, fn), "winner")
+        self.assertEqual(fn.calls, 0)
+
+    def test_cold_miss_computes_when_winner_gives_up(self):
+        cache.add("lock:k", 1, 10)
+        fn = _Counter("mine")
+        with patch.object(
+            cache_fill.time, "sleep", side_effect=lambda _: cache.delete("lock:k")
+        ):
+            self.assertEqual(cached("k", 60, fn), "mine")
+        self.assertEqual(fn.calls, 1)
+
+    def test_slow_values_refresh_early(self):
+        # 10s to compute, 5s left: a large beta makes early refresh certain.
+        self._store("k", "old", expires_in=5, delta=10.0)
+        fn = _Counter("new")
+        self.assertEqual(cached("k", 60, fn, beta=1000), "new")
+
+    def test_compute_error_serves_stale(self):
+        self._store("k", "old", expires_in=-1)
+
+        def boom():
+            raise RuntimeError("db down")
+
+        with self.assertLogs("myproject.cache_fill", "ERROR"):
+            self.assertEqual(cached("k", 60, boom), "old")
+        self.assertIsNone(cache.get("lock:k"))
+
+    def test_compute_error_without_stale_raises(self):
+        def boom():
+            raise RuntimeError("db down")
+
+        with self.assertRaises(RuntimeError):
+            cached("k", 60, boom)
+        self.assertIsNone(cache.get("lock:k"))
+
+    def test_stale_entry_outlives_logical_ttl(self):
+        with patch.object(cache, "set", wraps=cache.set) as set_:
+            cached("k", 60, _Counter())
+        self.assertGreater(set_.call_args.args[2], 60)
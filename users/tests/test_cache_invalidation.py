@@ -0,0 +1,159 @@
+"""
+Generation-based cache invalidation (myproject.cache_registry).
+
+Model writes must bump the right key families — including the feed and
+live-events pages that used to rely on TTL expiry — in one cache write, and
+saves that touch unrelated columns must leave hot families alone.
+"""
+
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from bookings.models import Engagement
+from myproject import cache_registry
+from myproject.cache_registry import generation, make_key
+from users.models import Profile, Upload
+
+
+class TestMakeKey(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_key_embeds_generation_and_is_stable(self):
+        k1 = make_key("feed", 1, "Dancer")
+        self.assertTrue(k1.startswith("feed:g"))
+        self.assertTrue(k1.endswith(":1:Dancer"))
+        self.assertEqual(k1, make_key("feed", 1, "Dancer"))
+
+    def test_bump_changes_only_targeted_families(self):
+        me = make_key("me", entity=1)
+        other = make_key("me", entity=2)
+        feed = make_key("feed", 1, "")
+        cache_registry.bump([("me", 1), ("feed", None)])
+        self.assertNotEqual(me, make_key("me", entity=1))
+        self.assertNotEqual(feed, make_key("feed", 1, ""))
+        self.assertEqual(other, make_key("me", entity=2))
+
+    def test_bump_is_one_cache_write(self):
+        with patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            cache_registry.bump([("me", 1), ("profile", 1), ("feed", None)])
+        set_many.assert_called_once()
+        self.assertEqual(len(set_many.call_args.args[0]), 3)
+
+
+class TestModelWritesBumpFamilies(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", password="x")
+        self.profile = self.user.profile
+
+    def _gens(self, *targets):
+        return {t: generation(*t) for t in targets}
+
+    def test_profile_save_bumps_user_and_feed_families(self):
+        targets = [
+            ("me", self.user.id),
+            ("profile", self.user.id),
+            ("web:profile", self.user.id),
+            ("feed", None),
+        ]
+        before = self._gens(*targets)
+        self.profile.bio = "new"
+        self.profile.save()
+        after = self._gens(*targets)
+        for t in targets:
+            self.assertNotEqual(before[t], after[t], t)
+
+    def test_kyc_only_save_leaves_feed_alone(self):
+        feed = generation("feed")
+        me = generation("me", self.user.id)
+        self.profile.razorpay_kyc_status = "approved"
+        self.profile.save(update_fields=["razorpay_kyc_status"])
+        self.assertEqual(feed, generation("feed"))
+        self.assertNotEqual(me, generation("me", self.user.id))
+
+    def test_queryset_update_bumps_families(self):
+        me = generation("me", self.user.id)
+        Profile.objects.filter(pk=self.profile.pk).update(client_approved=True)
+        self.assertNotEqual(me, generation("me", self.user.id))
+
+    def test_login_does_not_bump_feed(self):
+        feed = generation("feed")
+        self.client.login(username="alice", password="x")
+        self.assertEqual(feed, generation("feed"))
+
+    def test_upload_create_and_delete_bump_owner(self):
+        uploads = generation("uploads", self.user.id)
+        upload = Upload.objects.create(profile=self.profile, image="profile_pics/a.jpg")
+        after_create = generation("uploads", self.user.id)
+        self.assertNotEqual(uploads, after_create)
+        upload.delete()
+        self.assertNotEqual(after_create, generation("uploads", self.user.id))
+
+    def test_deleting_user_with_uploads_does_not_crash(self):
+        Upload.objects.create(profile=self.profile, image="profile_pics/a.jpg")
+        self.user.delete()
+
+    def test_engagement_accept_bumps_live_events(self):
+        client = User.objects.create_user("client", password="x")
+        eng = Engagement.objects.create(
+            client=client,
+            performer=self.user,
+            date=date.today() + timedelta(days=5),
+            time=time(19, 0),
+            venue="Hall",
+            occasion="Wedding",
+        )
+        events = generation("events")
+        eng.status = Engagement.STATUS_ACCEPTED
+        eng.save(update_fields=["status"])
+        self.assertNotEqual(events, generation("events"))
+
+    def test_payment_only_save_leaves_live_events_alone(self):
+        client = User.objects.create_user("client", password="x")
+        eng = Engagement.objects.create(
+            client=client,
+            performer=self.user,
+            date=date.today() + timedelta(days=5),
+            time=time(19, 0),
+            venue="Hall",
+            occasion="Wedding",
+        )
+        events = generation("events")
+        eng.payment_status = Engagement.PAYMENT_PAID
+        eng.save(update_fields=["payment_status"])
+        self.assertEqual(events, generation("events"))
+
+
+class TestViewsServeFreshDataAfterWrites(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user("viewer", password="x")
+        self.artist = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.viewer)
+
+    def test_feed_reflects_profile_edit_without_waiting_for_ttl(self):
+        r1 = self.api.get("/api/users/feed/")
+        self.assertEqual(r1.data["results"][0]["profession"], "")
+        p = self.artist.profile
+        p.profession = "Magician"
+        p.save()
+        r2 = self.api.get("/api/users/feed/")
+        self.assertEqual(r2.data["results"][0]["profession"], "Magician")
+
+    def test_professions_reflect_new_profession(self):
+        self.assertEqual(
+            self.api.get("/api/users/professions/").data["professions"], []
+        )
+        p = self.artist.profile
+        p.profession = "Magician"
+        p.save()
+        self.assertEqual(
+            self.api.get("/api/users/professions/").data["professions"], ["Magician"]
+        )
@@ -0,0 +1,104 @@
+"""
+In-process L1 cache tier (myproject.cache_l1).
+
+Hot families must be served from process memory once warm, generation bumps
+must evict locally and broadcast the eviction, and a disabled tier must be a
+no-op.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from myproject import cache_l1, cache_registry
+from myproject.cache_fill import cached
+from myproject.cache_l1 import LRUCache
+
+L1_ON = {
+    "ENABLED": True,
+    "MAX_ENTRIES": 100,
+    "PUBSUB": False,
+    "TTLS": {"gen": 30, "feed": 30, "web": 1, "web:profile": 5},
+}
+
+
+class TestLRUCache(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(2)
+        lru.set("a", 1, 60)
+        lru.set("b", 2, 60)
+        lru.get("a")
+        lru.set("c", 3, 60)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("c"), 3)
+
+    def test_expired_entries_are_misses(self):
+        lru = LRUCache(2)
+        lru.set("a", 1, -1)
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(len(lru), 0)
+
+
+@override_settings(CACHE_L1=L1_ON)
+class TestL1Tier(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        cache_l1.clear()
+        patcher = patch.object(cache_l1, "_redis")
+        self.redis = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_family_ttl_uses_longest_prefix(self):
+        self.assertEqual(cache_l1.ttl_for("feed:g1:1:"), 30)
+        self.assertEqual(cache_l1.ttl_for("web:profile:7:g1"), 5)
+        self.assertIsNone(cache_l1.ttl_for("me:42:g1"))
+
+    def test_hot_key_served_without_redis_after_first_read(self):
+        cached("feed:g1:1:", 60, lambda: "page")
+        with patch.object(cache, "get") as redis_get:
+            self.assertEqual(cached("feed:g1:1:", 60, lambda: "other"), "page")
+        redis_get.assert_not_called()
+
+    def test_unlisted_family_always_reads_redis(self):
+        cached("me:42:g1", 60, lambda: "me")
+        with patch.object(cache, "get", wraps=cache.get) as redis_get:
+            cached("me:42:g1", 60, lambda: "me")
+        redis_get.assert_called()
+
+    def test_generation_is_cached_and_bump_evicts_and_publishes(self):
+        gen = cache_registry.generation("feed")
+        with patch.object(cache, "get") as redis_get:
+            self.assertEqual(cache_registry.generation("feed"), gen)
+        redis_get.assert_not_called()
+
+        cache_registry.bump([("feed", None)])
+        self.assertNotEqual(cache_registry.generation("feed"), gen)
+        channel, payload = self.redis.return_value.publish.call_args.args
+        self.assertEqual(channel, cache_l1.CHANNEL)
+        self.assertEqual(json.loads(payload), ["gen:feed"])
+
+    def test_pubsub_message_evicts_keys(self):
+        cache_registry.generation("feed")
+        cache.set("gen:feed", 123, None)  # another pod bumped it
+        cache_l1.handle_message(
+            {"type": "message", "data": json.dumps(["gen:feed"]).encode()}
+        )
+        self.assertEqual(cache_registry.generation("feed"), 123)
+
+    def test_publish_failure_is_not_fatal(self):
+        self.redis.return_value.publish.side_effect = ConnectionError
+        with self.assertLogs("myproject.cache_l1", "WARNING"):
+            cache_registry.bump([("feed", None)])
+
+
+class TestL1Disabled(SimpleTestCase):
+    def test_disabled_tier_is_a_noop(self):
+        redis = MagicMock()
+        with patch.object(cache_l1, "_redis", redis):
+            cache_l1.set("feed:g1:1:", "x")
+            self.assertIsNone(cache_l1.get("feed:g1:1:"))
+            cache_l1.invalidate(["gen:feed"])
+        redis.assert_not_called()
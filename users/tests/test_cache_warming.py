@@ -0,0 +1,130 @@
+"""
+Cache warming (users.tasks.warm_hot_caches + users.api.payloads demand stats).
+
+The beat task must fill cold hot payloads, leave comfortably-fresh ones
+alone, re-fill ones about to expire, and pick extra candidates from sampled
+hit counts — without ever failing when Redis stats are unavailable.
+"""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from myproject import cache_fill, redis_client
+from myproject.cache_fill import _Entry
+from users.api import payloads
+from users.models import FeedCard
+from users.tasks import warm_hot_caches
+
+WARM = {
+    "TOP_N": 10,
+    "AHEAD": 90,
+    "HIT_SAMPLE_RATE": 1.0,
+    "BASE_URL": "http://testserver",
+}
+
+
+@override_settings(CACHE_WARM=WARM)
+class TestWarmHotCaches(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = MagicMock()
+        self.redis.zrevrange.return_value = []
+        patcher = patch.object(redis_client, "get_client", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.viewer = User.objects.create_user("viewer", password="x")
+        User.objects.create_user("artist", password="x")
+
+    def test_cold_cache_is_filled_then_left_alone(self):
+        self.assertEqual(warm_hot_caches(), len(payloads.ALWAYS_WARM))
+        self.assertEqual(warm_hot_caches(), 0)
+
+    def test_warmed_feed_is_a_hit_for_the_api(self):
+        warm_hot_caches()
+        api = APIClient()
+        api.force_authenticate(user=self.viewer)
+        with CaptureQueriesContext(connection) as ctx:
+            r = api.get("/api/users/feed/")
+        self.assertEqual(r.data["results"][0]["username"], "artist")
+        self.assertFalse(
+            [q for q in ctx.captured_queries if "users_feedcard" in q["sql"]]
+        )
+
+    @override_settings(USE_S3=False, MEDIA_URL="/media/")
+    def test_warmed_feed_matches_on_demand_fill(self):
+        FeedCard.objects.filter(username="artist").update(
+            profile_picture="profile_pics/a.jpg"
+        )
+        api = APIClient()
+        api.force_authenticate(user=self.viewer)
+        warm_hot_caches()
+        warmed = api.get("/api/users/feed/").data
+        cache.clear()
+        self.assertEqual(api.get("/api/users/feed/").data, warmed)
+        self.assertEqual(
+            warmed["results"][0]["profile_picture_url"],
+            "http://testserver/media/profile_pics/a.jpg",
+        )
+
+    @override_settings(CACHE_WARM={**WARM, "BASE_URL": "https://api.example.com"})
+    def test_feed_warmed_for_another_host_is_not_served(self):
+        warm_hot_caches()
+        api = APIClient()
+        api.force_authenticate(user=self.viewer)
+        with CaptureQueriesContext(connection) as ctx:
+            api.get("/api/users/feed/")
+        self.assertTrue(
+            [q for q in ctx.captured_queries if "users_feedcard" in q["sql"]]
+        )
+
+    def test_entry_about_to_expire_is_refreshed(self):
+        warm_hot_caches()
+        key, _, _ = payloads._professions_spec()
+        entry = cache.get(key)
+        cache.set(key, entry._replace(expires_at=time.time() + 10), 600)
+        self.assertEqual(warm_hot_caches(), 1)
+        self.assertGreater(cache.get(key).expires_at, time.time() + 90)
+
+    def test_hot_payloads_from_hit_stats(self):
+        hot = json.dumps(["feed", "2", ["Dancer"]]).encode()
+        self.redis.zrevrange.return_value = [(hot, 4.0)]
+        self.assertIn(("feed", "2", ["Dancer"]), payloads.hot_payloads(10))
+        self.assertEqual(warm_hot_caches(), len(payloads.ALWAYS_WARM) + 1)
+
+    def test_stats_outage_still_warms_defaults(self):
+        self.redis.zrevrange.side_effect = ConnectionError
+        with self.assertLogs("users.api.payloads", "WARNING"):
+            self.assertEqual(warm_hot_caches(), len(payloads.ALWAYS_WARM))
+
+    def test_reads_record_hits(self):
+        payloads.feed_page(None, "3", ["Singer", ""])
+        pipe = self.redis.pipeline.return_value
+        member = pipe.zincrby.call_args.args[2]
+        self.assertEqual(json.loads(member), ["feed", "3", ["Singer"]])
+
+    def test_hit_recording_failure_is_silent(self):
+        self.redis.pipeline.side_effect = ConnectionError
+        self.assertEqual(payloads.events_page("upcoming", "1")["count"], 0)
+
+
+class TestCacheFillWarm(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_skips_while_a_request_holds_the_lock(self):
+        cache.add("lock:k", 1, 10)
+        self.assertFalse(cache_fill.warm("k", 60, lambda: "v", min_remaining=30))
+        self.assertIsNone(cache.get("k"))
+
+    def test_fresh_entry_is_left_alone(self):
+        cache.set("k", _Entry("old", 0.0, time.time() + 60), 120)
+        self.assertFalse(cache_fill.warm("k", 60, lambda: "v", min_remaining=30))
+        self.assertEqual(cache.get("k").value, "old")
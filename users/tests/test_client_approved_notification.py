@@ -6,7 +6,7 @@ client_approved has no dedicated view — it's flipped from Django admin's
 Profile change form. ProfileAdmin.save_model() is the one place that
 transition passes through, so that's where the notification hooks in.
 
-send_push_notification is monkey-patched so these tests never touch Expo's
+queue_notification is monkey-patched so these tests never touch Expo's
 API.
 """
 
@@ -23,7 +23,7 @@ from users.models import Profile
 @pytest.fixture
 def mock_send(monkeypatch):
     mock = MagicMock()
-    monkeypatch.setattr("users.admin.send_push_notification", mock)
+    monkeypatch.setattr("users.admin.queue_notification", mock)
     return mock
 
 
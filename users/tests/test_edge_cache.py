@@ -0,0 +1,155 @@
+"""
+Public, edge-cacheable feed / live-events (myproject.edge_cache).
+
+Public listings must be anonymous, `public, s-maxage` and surrogate-tagged;
+model writes must purge the matching keys after commit; the local stand-in
+purge endpoint must accept exactly what the purge task sends.
+"""
+
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bookings.models import Engagement
+from myproject import edge_cache
+
+EDGE = {
+    "PURGE_URL": "http://testserver/api/edge/purge/",
+    "PURGE_TOKEN": "s3cret",
+    "LOCAL_STANDIN": True,
+    "MAX_AGE": 30,
+    "S_MAXAGE": 600,
+}
+
+
+class _StandInTransport:
+    """requests.post stand-in that routes purge calls to the Django view."""
+
+    def __init__(self):
+        self.client = APIClient()
+        self.calls = []
+
+    def __call__(self, url, json, headers, timeout):
+        self.calls.append(json["tags"])
+        r = self.client.post(
+            "/api/edge/purge/",
+            json,
+            format="json",
+            HTTP_AUTHORIZATION=headers["Authorization"],
+        )
+        r.raise_for_status = lambda: None
+        return r
+
+
+@override_settings(EDGE_CACHE=EDGE)
+class TestPublicListings(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.artist = User.objects.create_user("artist", password="x")
+        self.client_user = User.objects.create_user("client", password="x")
+        self.api = APIClient()
+
+    def test_public_feed_is_anonymous_and_edge_cacheable(self):
+        r = self.api.get("/api/public/feed/")
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("public", r["Cache-Control"])
+        self.assertIn("s-maxage=600", r["Cache-Control"])
+        self.assertNotIn("Set-Cookie", r.headers)
+        tags = r["Cache-Tag"].split(",")
+        self.assertIn("feed", tags)
+        self.assertIn(f"profile-{self.artist.id}", tags)
+        self.assertEqual(r["Surrogate-Key"], " ".join(sorted(tags)))
+        self.assertEqual(
+            {p["username"] for p in r.data["results"]}, {"artist", "client"}
+        )
+
+    def test_public_live_events_hide_the_client(self):
+        Engagement.objects.create(
+            client=self.client_user,
+            performer=self.artist,
+            date=date.today() + timedelta(days=3),
+            time=time(19, 0),
+            venue="Hall",
+            occasion="Wedding",
+            status=Engagement.STATUS_ACCEPTED,
+        )
+        r = self.api.get("/api/public/live-events/")
+        self.assertEqual(r.status_code, 200)
+        event = r.data["results"][0]
+        self.assertNotIn("client", event)
+        self.assertEqual(event["performer"]["username"], "artist")
+        self.assertIn(f"profile-{self.artist.id}", r["Cache-Tag"].split(","))
+
+    def test_public_listings_never_render_html(self):
+        r = self.api.get("/api/public/feed/", HTTP_ACCEPT="text/html")
+        self.assertIn(r.status_code, (200, 406))
+        self.assertNotIn("text/html", r.get("Content-Type", ""))
+
+    def test_not_modified_keeps_the_public_headers(self):
+        etag = self.api.get("/api/public/feed/")["ETag"]
+        r = self.api.get("/api/public/feed/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+        self.assertIn("public", r["Cache-Control"])
+        self.assertIn("s-maxage=600", r["Cache-Control"])
+        self.assertEqual(r["Cache-Tag"], "feed")
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    def test_profile_write_purges_its_keys_after_commit(self):
+        transport = _StandInTransport()
+        with patch("requests.post", transport):
+            with self.captureOnCommitCallbacks(execute=True):
+                profile = self.artist.profile
+                profile.profession = "Magician"
+                profile.save()
+        self.assertEqual(transport.calls, [["feed", f"profile-{self.artist.id}"]])
+        self.assertEqual(
+            cache.get(edge_cache.STANDIN_LOG_KEY), ["feed", f"profile-{self.artist.id}"]
+        )
+
+    def test_purges_are_batched(self):
+        transport = _StandInTransport()
+        with patch("requests.post", transport):
+            edge_cache.send_purge([f"profile-{i}" for i in range(45)])
+        self.assertEqual([len(c) for c in transport.calls], [30, 15])
+
+    @override_settings(EDGE_CACHE={**EDGE, "PURGE_URL": ""})
+    def test_no_purge_url_means_no_purge(self):
+        with patch("users.tasks.purge_edge_cache.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.artist.profile.save()
+        delay.assert_not_called()
+
+
+@override_settings(EDGE_CACHE=EDGE)
+class TestPurgeStandIn(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+
+    def _purge(self, body, token="s3cret"):
+        return self.api.post(
+            "/api/edge/purge/",
+            body,
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+    def test_records_tags(self):
+        r = self._purge({"tags": ["feed", "events"]})
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.data["success"])
+        self.assertEqual(cache.get(edge_cache.STANDIN_LOG_KEY), ["feed", "events"])
+
+    def test_wrong_token_rejected(self):
+        self.assertEqual(self._purge({"tags": ["feed"]}, token="nope").status_code, 403)
+
+    def test_bad_body_rejected(self):
+        self.assertEqual(self._purge({"tags": "feed"}).status_code, 400)
+
+    @override_settings(EDGE_CACHE={**EDGE, "LOCAL_STANDIN": False})
+    def test_disabled_outside_dev(self):
+        self.assertEqual(self._purge({"tags": ["feed"]}).status_code, 404)
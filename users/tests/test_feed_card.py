@@ -0,0 +1,85 @@
+"""
+FeedCard — the denormalized read model behind GlobalFeedAPIView.
+
+The projection must track every write path that can change what a feed card
+shows (signup, profile save, queryset .update(), username rename, delete),
+and a feed cache miss must be one single-table query.
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.models import FeedCard, Profile
+
+
+class TestFeedCardSync(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="x")
+        self.profile = Profile.objects.get(user=self.user)
+
+    def test_card_created_with_user(self):
+        card = FeedCard.objects.get(profile=self.profile)
+        self.assertEqual(card.user_id, self.user.id)
+        self.assertEqual(card.username, "alice")
+
+    def test_profile_save_updates_card(self):
+        self.profile.profession = "Dancer"
+        self.profile.bio = "Kathak since 2009"
+        self.profile.is_performer = True
+        self.profile.save()
+        card = FeedCard.objects.get(profile=self.profile)
+        self.assertEqual(card.profession, "Dancer")
+        self.assertEqual(card.bio, "Kathak since 2009")
+        self.assertTrue(card.is_performer)
+
+    def test_queryset_update_refreshes_card(self):
+        Profile.objects.filter(user=self.user).update(profession="Singer")
+        self.assertEqual(
+            FeedCard.objects.get(profile=self.profile).profession, "Singer"
+        )
+
+    def test_update_of_unrelated_fields_skips_refresh(self):
+        with CaptureQueriesContext(connection) as ctx:
+            Profile.objects.filter(user=self.user).update(pan_number="ABCDE1234F")
+        self.assertFalse(
+            any("users_feedcard" in q["sql"] for q in ctx.captured_queries)
+        )
+
+    def test_username_rename_propagates(self):
+        self.user.username = "alice2"
+        self.user.save()
+        self.assertEqual(FeedCard.objects.get(profile=self.profile).username, "alice2")
+
+    def test_deleting_user_removes_card(self):
+        self.user.delete()
+        self.assertFalse(FeedCard.objects.filter(user_id=self.user.id).exists())
+
+
+class TestFeedReadsProjection(TestCase):
+    def setUp(self):
+        cache.clear()
+        viewer = User.objects.create_user("viewer", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=viewer)
+        for i in range(5):
+            u = User.objects.create_user(f"artist{i}", password="x")
+            p = u.profile
+            p.bio = f"bio {i}"
+            p.save()
+
+    def test_cache_miss_is_one_join_free_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.api.get("/api/users/feed/", {"cursor": ""})
+        self.assertEqual(r.status_code, 200)
+        feed_sql = [
+            q["sql"] for q in ctx.captured_queries if "users_feedcard" in q["sql"]
+        ]
+        self.assertEqual(len(feed_sql), 1)
+        self.assertNotIn("JOIN", feed_sql[0].upper())
+        self.assertEqual(
+            [p["bio"] for p in r.data["results"]], [f"bio {i}" for i in range(5)]
+        )
@@ -0,0 +1,107 @@
+"""
+Keyset (cursor) pagination for the global feed — API and web.
+
+Cursor mode is opt-in via ?cursor= and must walk every profile exactly once,
+never issue a COUNT(*), and degrade to the first page on a garbage cursor.
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.models import Profile
+from users.utils.cursor import decode_cursor, encode_cursor
+
+
+class TestCursorCodec(TestCase):
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(1234)), 1234)
+
+    def test_empty_and_garbage_cursor_mean_first_page(self):
+        self.assertIsNone(decode_cursor(""))
+        self.assertIsNone(decode_cursor(None))
+        self.assertIsNone(decode_cursor("!!not-base64!!"))
+        self.assertIsNone(decode_cursor(encode_cursor("abc")))
+
+
+class TestGlobalFeedAPICursor(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user("viewer", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.viewer)
+        for i in range(45):
+            u = User.objects.create_user(f"artist{i}", password="x")
+            Profile.objects.filter(user=u).update(
+                profession="Dancer" if i % 3 == 0 else "Singer"
+            )
+
+    def _walk(self, params):
+        seen, cursor, pages = [], "", 0
+        while True:
+            r = self.api.get("/api/users/feed/", {**params, "cursor": cursor})
+            self.assertEqual(r.status_code, 200)
+            self.assertNotIn("count", r.data)
+            seen.extend(p["username"] for p in r.data["results"])
+            pages += 1
+            if not r.data["has_next"]:
+                self.assertIsNone(r.data["next_cursor"])
+                return seen, pages
+            cursor = r.data["next_cursor"]
+
+    def test_walks_every_profile_once_excluding_self(self):
+        seen, pages = self._walk({})
+        self.assertEqual(pages, 3)  # 46 profiles / 20 per page
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(len(set(seen)), 45)
+        self.assertNotIn("viewer", seen)
+
+    def test_profession_filter_applies_in_cursor_mode(self):
+        seen, _ = self._walk({"profession": "Dancer"})
+        self.assertEqual(len(seen), 15)
+        self.assertTrue(all(int(n[6:]) % 3 == 0 for n in seen))
+
+    def test_cursor_mode_never_counts(self):
+        first = self.api.get("/api/users/feed/", {"cursor": ""})
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.api.get("/api/users/feed/", {"cursor": first.data["next_cursor"]})
+        sql = " ".join(q["sql"].upper() for q in ctx.captured_queries)
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_garbage_cursor_returns_first_page(self):
+        r = self.api.get("/api/users/feed/", {"cursor": "garbage"})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["results"][0]["username"], "artist0")
+
+    def test_page_mode_unchanged_without_cursor(self):
+        r = self.api.get("/api/users/feed/")
+        self.assertEqual(r.data["count"], 45)
+        self.assertEqual(r.data["num_pages"], 3)
+        self.assertNotIn("next_cursor", r.data)
+
+
+class TestGlobalFeedWebCursor(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user("viewer", password="testpass")
+        self.client.login(username="viewer", password="testpass")
+        for i in range(25):
+            User.objects.create_user(f"artist{i}", password="testpass")
+
+    def test_next_link_carries_cursor_and_hides_count(self):
+        p1 = self.client.get("/users/global-feed/", {"cursor": ""})
+        self.assertEqual(p1.status_code, 200)
+        self.assertNotContains(p1, "on stage")
+        next_cursor = p1.context["next_cursor"]
+        self.assertIsNotNone(next_cursor)
+        self.assertContains(p1, f"?cursor={next_cursor}")
+
+        p2 = self.client.get("/users/global-feed/", {"cursor": next_cursor})
+        self.assertEqual(len(p2.context["profiles"]), 6)
+        self.assertIsNone(p2.context["next_cursor"])
+        self.assertNotContains(p2, "Next &rarr;")
@@ -0,0 +1,209 @@
+"""
+Image deduplication (users.models.ImageFingerprint).
+
+A profile re-uploading a photo it already has — byte-identical, or a
+re-encoded / smaller copy — gets the stored object and its renditions back
+instead of another Pillow pass and another copy in storage.
+"""
+
+import os
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from users.models import ImageFingerprint, Upload
+from users.tasks import process_uploaded_image
+from users.utils import image
+from users.utils.image import color_distance, hash_distance, image_fingerprint
+
+_TEMP_MEDIA = tempfile.mkdtemp()
+
+
+def _photo_bytes(size=(1200, 900), fmt="JPEG", color="teal", flip=False):
+    img = Image.new("RGB", (400, 300), color)
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((40, 30, 220, 250), fill="orange")
+    draw.rectangle((260, 60, 380, 280), fill="navy")
+    if flip:
+        img = img.transpose(Image.FLIP_LEFT_RIGHT)
+    buf = BytesIO()
+    img.resize(size).save(buf, format=fmt, quality=90)
+    return buf.getvalue()
+
+
+def _photo(name="photo.jpg", **kwargs):
+    return SimpleUploadedFile(name, _photo_bytes(**kwargs), content_type="image/jpeg")
+
+
+class TestFingerprint(SimpleTestCase):
+    def test_reencoded_copy_is_close(self):
+        a = image_fingerprint(_photo())
+        b = image_fingerprint(_photo(size=(800, 600), fmt="WEBP"))
+        self.assertNotEqual(a[0], b[0])
+        self.assertLessEqual(hash_distance(a[1], b[1]), 4)
+        self.assertLessEqual(color_distance(a[2], b[2]), 12)
+        self.assertEqual(a[3], (1200, 900))
+
+    def test_different_pictures_are_far(self):
+        a = image_fingerprint(_photo())
+        self.assertGreater(
+            hash_distance(a[1], image_fingerprint(_photo(flip=True))[1]), 4
+        )
+        # dHash alone can't tell flat colours apart; the mean colour can
+        red, blue = (image_fingerprint(_photo(color=c)) for c in ("red", "blue"))
+        self.assertGreater(color_distance(red[2], blue[2]), 12)
+
+    def test_undecodable_file(self):
+        junk = SimpleUploadedFile("junk.jpg", b"not an image")
+        self.assertIsNone(image_fingerprint(junk))
+        self.assertEqual(junk.read(), b"not an image")
+
+
+@override_settings(
+    MEDIA_ROOT=_TEMP_MEDIA,
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class TestDedup(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("artist", password="x")
+        self.profile = self.user.profile
+
+    def _upload(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = Upload.objects.create(profile=self.profile, image=_photo(**kwargs))
+        upload.refresh_from_db()
+        return upload
+
+    def test_identical_upload_reuses_stored_image_and_renditions(self):
+        first = self._upload()
+        with patch("users.models.process_image", wraps=image.process_image) as proc:
+            second = self._upload()
+        proc.assert_not_called()
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(second.image_renditions, first.image_renditions)
+        self.assertEqual(ImageFingerprint.objects.count(), 1)
+
+    def test_smaller_reencoded_copy_is_a_duplicate(self):
+        first = self._upload(size=(2000, 1500))
+        second = self._upload(size=(1440, 1080), fmt="WEBP")
+        self.assertEqual(second.image.name, first.image.name)
+
+    def test_higher_resolution_copy_is_processed(self):
+        first = self._upload(size=(600, 450))
+        second = self._upload(size=(2000, 1500))
+        self.assertNotEqual(second.image.name, first.image.name)
+        self.assertEqual(ImageFingerprint.objects.count(), 2)
+
+    def test_other_profiles_are_not_matched(self):
+        first = self._upload()
+        other = User.objects.create_user("other", password="x").profile
+        theirs = Upload.objects.create(profile=other, image=_photo())
+        self.assertNotEqual(theirs.image.name, first.image.name)
+
+    def test_deleted_upload_reused_until_its_file_is_gone(self):
+        first = self._upload()
+        name = first.image.name
+        first.delete()
+        again = self._upload()
+        self.assertEqual(again.image.name, name)
+        self.assertEqual(set(again.image_renditions["webp"]), {"320", "640"})
+
+        again.delete()
+        default_storage.delete(name)
+        stale = ImageFingerprint.objects.get(profile=self.profile)
+        with patch("users.models.process_image", wraps=image.process_image) as proc:
+            fresh = self._upload()
+        proc.assert_called_once()
+        self.assertTrue(default_storage.exists(fresh.image.name))
+        self.assertNotEqual(ImageFingerprint.objects.get(profile=self.profile), stale)
+
+    def test_presigned_duplicate_points_at_stored_copy(self):
+        first = self._upload()
+        raw = default_storage.save(
+            f"profile_pics/user_{self.user.id}/dup.jpg", ContentFile(_photo_bytes())
+        )
+        upload = Upload.objects.create(profile=self.profile, image=raw)
+        self.assertEqual(
+            process_uploaded_image(upload.pk), f"duplicate of {first.image.name}"
+        )
+        upload.refresh_from_db()
+        self.assertEqual(upload.image.name, first.image.name)
+        self.assertEqual(upload.image_renditions, first.image_renditions)
+        self.assertFalse(default_storage.exists(raw))
+
+    def test_repeated_avatar_reuses_processed_file(self):
+        self.profile.profile_picture = _photo("me.jpg")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.profile.refresh_from_db()
+        stored = self.profile.profile_picture.name
+        renditions = self.profile.profile_picture_renditions
+
+        self.profile.profile_picture = _photo("me-again.jpg")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+            raw = self.profile.profile_picture_pending
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.profile_picture.name, stored)
+        self.assertEqual(self.profile.profile_picture_renditions, renditions)
+        self.assertFalse(default_storage.exists(raw))
+        self.assertTrue(default_storage.exists(stored))
+
+    @override_settings(IMAGE_DEDUP={"ENABLED": False})
+    def test_disabled(self):
+        first = self._upload()
+        second = self._upload()
+        self.assertNotEqual(second.image.name, first.image.name)
+        self.assertFalse(ImageFingerprint.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=_TEMP_MEDIA)
+class TestPresignedSingleDownload(TestCase):
+    """process_uploaded_image reads the stored object once, whatever its size."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("artist", password="x")
+
+    def _process(self, data):
+        raw = default_storage.save(
+            f"profile_pics/user_{self.user.id}/raw.jpg", ContentFile(data)
+        )
+        upload = Upload.objects.create(profile=self.user.profile, image=raw)
+        opened = []
+        real_open = FileSystemStorage._open
+
+        def spy(storage, name, mode="rb"):
+            opened.append(name)
+            return real_open(storage, name, mode)
+
+        with patch.object(FileSystemStorage, "_open", spy):
+            result = process_uploaded_image(upload.pk)
+        upload.refresh_from_db()
+        self.assertEqual(opened, [raw])
+        self.assertEqual(set(upload.image_renditions["webp"]), {"320", "640"})
+        return result, upload
+
+    def test_small_file(self):
+        result, _ = self._process(_photo_bytes())
+        self.assertTrue(result.startswith("skipped"))
+
+    def test_large_file(self):
+        noise = Image.frombytes("RGB", (2000, 1500), os.urandom(2000 * 1500 * 3))
+        buf = BytesIO()
+        noise.save(buf, format="JPEG", quality=90)
+        self.assertGreater(len(buf.getvalue()), 2 * 1024 * 1024)
+
+        result, upload = self._process(buf.getvalue())
+        self.assertTrue(result.startswith("processed"), result)
+        self.assertLess(upload.image.size, 2 * 1024 * 1024)
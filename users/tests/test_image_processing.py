@@ -0,0 +1,82 @@
+"""
+Bounded-memory image processing (users.utils.image.process_image).
+
+JPEGs decode at reduced DCT scale close to the target size, EXIF rotation
+is still honoured, and formats that can't reduce while decoding are
+reduced right after, within Pillow's own pixel limit.
+"""
+
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from users.utils import image
+
+
+def _jpeg(size, orientation=None):
+    buf = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new("RGB", size, color="navy").save(buf, format="JPEG", exif=exif)
+    return SimpleUploadedFile("photo.jpg", buf.getvalue(), content_type="image/jpeg")
+
+
+def _png(size):
+    buf = BytesIO()
+    Image.new("RGBA", size).save(buf, format="PNG")
+    return SimpleUploadedFile("shot.png", buf.getvalue(), content_type="image/png")
+
+
+class TestReducedDecode(SimpleTestCase):
+    def test_jpeg_decodes_at_reduced_scale(self):
+        img, size = image._decode(_jpeg((4000, 3000)), lambda w, h: 1080 / w)
+        self.assertEqual(size, (4000, 3000))
+        # 1/2 scale is the smallest that still covers 1080x810
+        self.assertEqual(img.size, (2000, 1500))
+
+    def test_output_is_capped_webp(self):
+        out = image.process_image(_jpeg((4000, 3000)), "gallery")
+        self.assertEqual(out.content_type, "image/webp")
+        self.assertEqual(Image.open(out).size, (1080, 810))
+
+    def test_exif_rotation_survives_reduced_decode(self):
+        out = image.process_image(_jpeg((4000, 3000), orientation=6), "gallery")
+        self.assertEqual(Image.open(out).size, (810, 1080))
+
+    def test_png_over_budget_is_reduced_and_stripped(self):
+        # 6000x4100 = 24.6 MP: over MAX_DECODE_PIXELS, and draft() can't help
+        buf = BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x8825] = {2: (12.0, 58.0, 0.0)}  # GPSLatitude
+        Image.new("L", (6000, 4100)).save(buf, format="PNG", exif=exif)
+        original = SimpleUploadedFile(
+            "big.png", buf.getvalue(), content_type="image/png"
+        )
+
+        out = image.process_image(original, "gallery")
+
+        self.assertIsNot(out, original)
+        result = Image.open(out)
+        self.assertEqual(result.format, "WEBP")
+        self.assertEqual(max(result.size), 1080)
+        self.assertLess(result.size[0], result.size[1])  # rotation applied
+        self.assertFalse(dict(result.getexif()))
+
+    def test_reduced_bitmap_stays_under_budget(self):
+        with patch.object(image, "MAX_DECODE_PIXELS", 1_000_000):
+            img, size = image._decode(_png((1200, 1200)), lambda w, h: 1)
+        self.assertEqual(size, (1200, 1200))
+        self.assertLessEqual(img.size[0] * img.size[1], 1_000_000)
+
+    def test_beyond_pillow_limit_keeps_original(self):
+        original = _png((1200, 1200))
+        with (
+            patch.object(image, "MAX_DECODE_PIXELS", 100_000),
+            patch.object(Image, "MAX_IMAGE_PIXELS", 1_000_000),
+        ):
+            self.assertIs(image.process_image(original, "gallery"), original)
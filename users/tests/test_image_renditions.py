@@ -0,0 +1,200 @@
+"""
+Thumbnail renditions (users.utils.image.build_renditions).
+
+Fresh uploads, avatars and covers get smaller AVIF/WebP widths under
+deterministic keys after commit; the serializers expose them as a srcset map
+and the upload thumbnail points at the narrowest one.
+"""
+
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import FeedCard, Upload
+from users.utils.image import rendition_name
+
+_TEMP_MEDIA = tempfile.mkdtemp()
+
+
+def _image(name="photo.jpg", size=(1200, 800)):
+    buf = BytesIO()
+    Image.new("RGB", size, color="teal").save(buf, format="JPEG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+class TestRenditionName(SimpleTestCase):
+    def test_deterministic_key_next_to_source(self):
+        self.assertEqual(
+            rendition_name("profile_pics/abc.webp", 320, "avif"),
+            "profile_pics/abc_320w.avif",
+        )
+
+
+@override_settings(
+    MEDIA_ROOT=_TEMP_MEDIA,
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class TestRenditions(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def test_upload_gets_gallery_widths_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = Upload.objects.create(
+                profile=self.user.profile, image=_image(size=(2000, 1000))
+            )
+        upload.refresh_from_db()
+        webp = upload.image_renditions["webp"]
+        self.assertEqual(set(webp), {"320", "640"})
+        self.assertEqual(webp["320"], rendition_name(upload.image.name, 320, "webp"))
+        with upload.image.storage.open(webp["320"]) as f:
+            self.assertEqual(Image.open(f).size, (320, 160))
+
+    def test_no_upscaled_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = Upload.objects.create(
+                profile=self.user.profile, image=_image(size=(400, 400))
+            )
+        upload.refresh_from_db()
+        self.assertEqual(set(upload.image_renditions["webp"]), {"320"})
+
+    def test_upload_serializer_exposes_srcset_and_small_thumbnail(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Upload.objects.create(profile=self.user.profile, image=_image())
+        item = self.api.get("/api/users/me/uploads/").data[0]
+        self.assertEqual(set(item["image_srcset"]["webp"]), {"320", "640"})
+        self.assertTrue(item["image_thumbnail_url"].endswith("_320w.webp"))
+        self.assertNotEqual(item["image_thumbnail_url"], item["image_url"])
+
+    def test_thumbnail_falls_back_to_full_image_before_renditions(self):
+        Upload.objects.create(profile=self.user.profile, image=_image())
+        item = self.api.get("/api/users/me/uploads/").data[0]
+        self.assertEqual(item["image_srcset"], {})
+        self.assertEqual(item["image_thumbnail_url"], item["image_url"])
+
+    def test_avatar_renditions_reach_the_feed_card(self):
+        profile = self.user.profile
+        profile.profile_picture = _image("me.jpg", size=(900, 900))
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        card = FeedCard.objects.get(user_id=self.user.id)
+        self.assertEqual(set(card.profile_picture_renditions["webp"]), {"128", "256"})
+
+        viewer = APIClient()
+        viewer.force_authenticate(User.objects.create_user("viewer", password="x"))
+        row = viewer.get("/api/users/feed/").data["results"][0]
+        self.assertTrue(row["profile_picture_srcset"]["webp"]["128"].endswith(".webp"))
+
+    def test_new_avatar_keeps_previous_picture_until_processed(self):
+        profile = self.user.profile
+        profile.profile_picture = _image("one.jpg", size=(900, 900))
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        profile.refresh_from_db()
+        first, renditions = (
+            profile.profile_picture.name,
+            profile.profile_picture_renditions,
+        )
+        self.assertTrue(renditions)
+        profile.profile_picture = _image("two.jpg", size=(900, 900))
+        profile.save()  # processing task not run yet
+        profile.refresh_from_db()
+        self.assertEqual(profile.profile_picture.name, first)
+        self.assertEqual(profile.profile_picture_renditions, renditions)
+        self.assertTrue(profile.profile_picture_pending.endswith(".jpg"))
+        card = FeedCard.objects.get(user_id=self.user.id)
+        self.assertEqual(card.profile_picture.name, first)
+
+
+@override_settings(
+    MEDIA_ROOT=_TEMP_MEDIA,
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class TestBackgroundProfileImages(TestCase):
+    """Avatars/covers are stored raw, then swapped by process_profile_image."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def test_raw_stored_then_swapped_after_commit(self):
+        profile = self.user.profile
+        profile.cover_photo = _image("cover.jpg", size=(3000, 1500))
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+            raw = profile.cover_photo_pending
+            self.assertTrue(raw.endswith(".jpg"))  # no Pillow in the request
+            self.assertFalse(profile.cover_photo)  # raw file never served
+        profile.refresh_from_db()
+        self.assertTrue(profile.cover_photo.name.endswith(".webp"))
+        self.assertEqual(profile.cover_photo_pending, "")
+        self.assertFalse(profile.cover_photo.storage.exists(raw))
+        with profile.cover_photo.open("rb") as f:
+            self.assertEqual(Image.open(f).size, (1920, 960))
+        self.assertEqual(set(profile.cover_photo_renditions["webp"]), {"640", "1280"})
+
+    def test_swap_invalidates_cached_profile(self):
+        self.assertEqual(self.api.get("/api/users/me/").data["profile_picture_url"], "")
+        profile = self.user.profile
+        profile.profile_picture = _image("me.jpg", size=(900, 900))
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        me = self.api.get("/api/users/me/").data
+        self.assertTrue(me["profile_picture_url"].endswith(".webp"))
+        self.assertEqual(set(me["profile_picture_srcset"]["webp"]), {"128", "256"})
+        card = FeedCard.objects.get(user_id=self.user.id)
+        self.assertTrue(card.profile_picture.name.endswith(".webp"))
+
+    def test_superseded_upload_is_discarded(self):
+        from users.models import Profile
+        from users.tasks import process_profile_image
+
+        profile = self.user.profile
+        profile.profile_picture = _image("old.jpg", size=(900, 900))
+        profile.save()  # task not run yet
+        raw = profile.profile_picture_pending
+        written = []
+
+        def newer_upload_lands(fieldfile, kind):
+            written.append(fieldfile.name)
+            Profile.objects.filter(pk=profile.pk).update(
+                profile_picture_pending="profile_pics/newer.jpg"
+            )
+            return {}
+
+        with patch("users.utils.image.build_renditions", newer_upload_lands):
+            process_profile_image(profile.pk, "profile_picture", "avatar", raw)
+        profile.refresh_from_db()
+        self.assertFalse(profile.profile_picture)
+        self.assertEqual(profile.profile_picture_pending, "profile_pics/newer.jpg")
+        storage = profile.profile_picture.storage
+        self.assertFalse(storage.exists(written[0]))
+        self.assertFalse(storage.exists(raw))
+
+    def test_unprocessable_upload_is_never_published(self):
+        profile = self.user.profile
+        profile.profile_picture = SimpleUploadedFile(
+            "me.jpg", b"not an image", content_type="image/jpeg"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+            raw = profile.profile_picture_pending
+        profile.refresh_from_db()
+        self.assertFalse(profile.profile_picture)
+        self.assertEqual(profile.profile_picture_pending, "")
+        self.assertFalse(profile.profile_picture.storage.exists(raw))
+        self.assertFalse(FeedCard.objects.get(user_id=self.user.id).profile_picture)
@@ -34,10 +34,10 @@ class TestLiveEventsWebIntegration(TestCase):
         )
 
     def _upcoming_pks(self, resp):
-        return [e.pk for e in resp.context["events"]]
+        return [e["id"] for e in resp.context["events"]]
 
     def _past_pks(self, resp):
-        return [e.pk for e in resp.context["past_events"]]
+        return [e["id"] for e in resp.context["past_events"]]
 
     def test_login_required(self):
         self.client.logout()
@@ -102,16 +102,16 @@ class TestLiveEventsWebIntegration(TestCase):
             self._gig(1, venue=f"gig-p{i:02d}")
         page1 = self.client.get("/users/live-events/")
         self.assertEqual(len(page1.context["events"]), 10)
-        paginator = page1.context["page_obj"].paginator
-        self.assertEqual(paginator.count, 15)
-        self.assertEqual(paginator.num_pages, 2)
-        self.assertTrue(page1.context["page_obj"].has_next())
-        self.assertFalse(page1.context["page_obj"].has_previous())
+        page = page1.context["page"]
+        self.assertEqual(page["count"], 15)
+        self.assertEqual(page["num_pages"], 2)
+        self.assertTrue(page["has_next"])
+        self.assertFalse(page["has_previous"])
         self.assertContains(page1, '<span class="pill-accent">15</span>', html=True)
         page2 = self.client.get("/users/live-events/?page=2")
         self.assertEqual(len(page2.context["events"]), 5)
-        self.assertFalse(page2.context["page_obj"].has_next())
-        self.assertTrue(page2.context["page_obj"].has_previous())
+        self.assertFalse(page2.context["page"]["has_next"])
+        self.assertTrue(page2.context["page"]["has_previous"])
 
     def test_upcoming_sorted_by_date_then_time(self):
         late = self._gig(1, at=time(20, 0), venue="venue-late")
@@ -121,7 +121,7 @@ class TestLiveEventsWebIntegration(TestCase):
         self.assertIn(late.pk, self._upcoming_pks(resp))
         self.assertIn(early.pk, self._upcoming_pks(resp))
         self.assertIn(mid.pk, self._upcoming_pks(resp))
-        venues = [e.venue for e in resp.context["events"]]
+        venues = [e["venue"] for e in resp.context["events"]]
         self.assertEqual(venues, ["venue-early", "venue-mid", "venue-late"])
 
     def test_past_most_recent_20_no_pagination(self):
@@ -131,6 +131,6 @@ class TestLiveEventsWebIntegration(TestCase):
         past = resp.context["past_events"]
         self.assertEqual(len(past), 20)
         self.assertEqual(
-            [e.venue for e in past], [f"past-gig-{i:02d}" for i in range(20)]
+            [e["venue"] for e in past], [f"past-gig-{i:02d}" for i in range(20)]
         )
         self.assertEqual(self._upcoming_pks(resp), [])
@@ -0,0 +1,198 @@
+"""
+Orphaned media cleanup (users.utils.media_gc, gc_media command).
+
+Runs against filesystem storage in a throwaway MEDIA_ROOT; file ages are
+set with os.utime. The S3 DeleteObjects batching is checked against a fake
+client.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from users.models import ImageFingerprint, Upload
+from users.utils import media_gc
+
+OLD = time.time() - 3 * 86400
+
+
+class TestMediaGC(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.profile = User.objects.create_user("artist", password="x").profile
+
+    def _put(self, name, old=True):
+        name = default_storage.save(name, ContentFile(b"x" * 10))
+        if old:
+            os.utime(default_storage.path(name), (OLD, OLD))
+        return name
+
+    def _seed(self):
+        """Referenced files plus every kind of leftover."""
+        self.profile.profile_picture = self._put("profile_pics/me.webp")
+        self.profile.profile_picture_renditions = {
+            "webp": {"128": self._put("profile_pics/me_128w.webp")}
+        }
+        self.profile.cover_photo_pending = self._put("cover_photos/queued.jpg")
+        self.profile.save()
+        Upload.objects.create(
+            profile=self.profile,
+            video=self._put("profile_videos/clip.mp4"),
+            video_poster=self._put("video_posters/clip.jpg"),
+            video_hls="profile_videos/hls/1/master.m3u8",
+        )
+        self._put("profile_videos/hls/1/master.m3u8")
+        self._put("profile_videos/hls/1/360p_000.ts")
+        return {
+            "unconfirmed": self._put("profile_pics/user_1/presigned.jpg"),
+            "raw": self._put("profile_videos/raw.mp4"),
+            "chunk": self._put("tmp/video_chunks/9/abc/chunk_000.mp4"),
+            "dead_hls": self._put("profile_videos/hls/2/master.m3u8"),
+            "young": self._put("profile_pics/user_1/uploading.jpg", old=False),
+        }
+
+    def test_deletes_old_orphans_only(self):
+        leftovers = self._seed()
+        ImageFingerprint.objects.create(
+            profile=self.profile,
+            kind="gallery",
+            sha256="a" * 64,
+            dhash="0" * 16,
+            color="000000",
+            width=1,
+            height=1,
+            name=leftovers["unconfirmed"],
+        )
+        ImageFingerprint.objects.update(used_at=timezone.now() - timedelta(days=30))
+
+        report = media_gc.collect_orphans()
+
+        self.assertTrue(report["complete"])
+        for key in ("unconfirmed", "raw", "chunk", "dead_hls"):
+            self.assertFalse(default_storage.exists(leftovers[key]), key)
+        self.assertTrue(default_storage.exists(leftovers["young"]))
+        for name in (
+            "profile_pics/me.webp",
+            "profile_pics/me_128w.webp",
+            "cover_photos/queued.jpg",
+            "profile_videos/clip.mp4",
+            "video_posters/clip.jpg",
+            "profile_videos/hls/1/360p_000.ts",
+        ):
+            self.assertTrue(default_storage.exists(name), name)
+        self.assertEqual(report["prefixes"]["profile_videos/"]["deleted"], 2)
+        self.assertFalse(ImageFingerprint.objects.exists())
+        self.assertIsNone(cache.get(media_gc.CHECKPOINT_KEY))
+
+    def test_recently_matched_fingerprint_is_kept(self):
+        name = self._put("profile_pics/old_avatar.webp")
+        ImageFingerprint.objects.create(
+            profile=self.profile,
+            kind="avatar",
+            sha256="a" * 64,
+            dhash="0" * 16,
+            color="000000",
+            width=1,
+            height=1,
+            name=name,
+        )
+        media_gc.collect_orphans()
+        self.assertTrue(default_storage.exists(name))
+
+    def test_dry_run_reports_without_deleting(self):
+        leftovers = self._seed()
+        report = media_gc.collect_orphans(dry_run=True)
+        stats = report["prefixes"]["profile_pics/"]
+        self.assertEqual(stats["orphans"], 1)
+        self.assertEqual(stats["bytes"], 10)
+        self.assertEqual(stats["sample"], [leftovers["unconfirmed"]])
+        self.assertEqual(stats["deleted"], 0)
+        self.assertTrue(default_storage.exists(leftovers["unconfirmed"]))
+
+    def test_resumes_from_checkpoint(self):
+        leftovers = self._seed()
+        first = media_gc.collect_orphans(max_keys=3)
+        self.assertFalse(first["complete"])
+        self.assertEqual(list(first["prefixes"]), ["profile_pics/"])
+        self.assertEqual(cache.get(media_gc.CHECKPOINT_KEY)[0], "profile_pics/")
+
+        second = media_gc.collect_orphans()
+        self.assertTrue(second["complete"])
+        self.assertEqual(second["prefixes"]["profile_pics/"]["scanned"], 1)
+        self.assertFalse(default_storage.exists(leftovers["raw"]))
+        self.assertIsNone(cache.get(media_gc.CHECKPOINT_KEY))
+
+    def test_row_added_mid_run_is_not_deleted(self):
+        name = self._put("profile_pics/late.webp")
+        real = media_gc.referenced_names
+
+        def then_confirmed(cutoff):
+            refs = real(cutoff)
+            Upload.objects.create(profile=self.profile, image=name)
+            return refs
+
+        media_gc.referenced_names = then_confirmed
+        self.addCleanup(setattr, media_gc, "referenced_names", real)
+        media_gc.collect_orphans()
+        self.assertTrue(default_storage.exists(name))
+
+    def test_command_dry_run(self):
+        leftovers = self._seed()
+        out = StringIO()
+        call_command("gc_media", "--dry-run", stdout=out)
+        self.assertIn(leftovers["raw"], out.getvalue())
+        self.assertIn("nothing deleted", out.getvalue())
+        self.assertTrue(default_storage.exists(leftovers["raw"]))
+
+
+class TestS3Batching(SimpleTestCase):
+    def test_delete_objects_batches_and_skips_errors(self):
+        storage = MagicMock(bucket_name="bucket", location="")
+        client = storage.connection.meta.client
+        client.delete_objects.side_effect = [
+            {"Errors": [{"Key": "k3", "Code": "AccessDenied"}]},
+            {},
+        ]
+        names = [f"k{i}" for i in range(1500)]
+        deleted = media_gc.delete_objects(storage, names)
+        batches = [
+            c.kwargs["Delete"]["Objects"] for c in client.delete_objects.mock_calls
+        ]
+        self.assertEqual([len(b) for b in batches], [1000, 500])
+        self.assertEqual(len(deleted), 1499)
+        self.assertNotIn("k3", deleted)
+
+    def test_listing_strips_location(self):
+        storage = MagicMock(bucket_name="bucket", location="media")
+        paginator = storage.connection.meta.client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {
+                "Contents": [
+                    {"Key": "media/profile_pics/a.jpg", "Size": 5, "LastModified": 1}
+                ]
+            }
+        ]
+        objs = list(media_gc.iter_objects(storage, "profile_pics/", "profile_pics/0"))
+        self.assertEqual(objs, [("profile_pics/a.jpg", 5, 1)])
+        paginator.paginate.assert_called_once_with(
+            Bucket="bucket",
+            Prefix="media/profile_pics/",
+            StartAfter="media/profile_pics/0",
+        )
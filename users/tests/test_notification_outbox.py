@@ -0,0 +1,131 @@
+"""
+Tests for the notification outbox — users.notifications.queue_notification
+and dispatch_outbox (run by the dispatch_notifications task). Expo is mocked
+at the pooled session's post().
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+from users.models import NotificationOutbox, PushToken
+from users.notifications import OUTBOX_LOCK_KEY, dispatch_outbox, queue_notification
+
+
+@pytest.fixture(autouse=True)
+def fresh(settings):
+    settings.EXPO_PUSH = {**settings.EXPO_PUSH, "MAX_RETRIES": 0}
+    cache.clear()
+
+
+@pytest.fixture
+def alice(db):
+    user = User.objects.create_user("alice", password="x")
+    PushToken.objects.create(user=user, token="ExponentPushToken[a1]")
+    PushToken.objects.create(user=user, token="ExponentPushToken[a2]")
+    return user
+
+
+@pytest.fixture
+def bob(db):
+    user = User.objects.create_user("bob", password="x")
+    PushToken.objects.create(user=user, token="ExponentPushToken[b1]")
+    return user
+
+
+def _patch_post(monkeypatch, status=200):
+    def post(url, json, timeout):
+        resp = MagicMock(ok=status == 200, status_code=status, headers={})
+        resp.json.return_value = {"data": [{"status": "ok"}] * len(json)}
+        return resp
+
+    mock = MagicMock(side_effect=post)
+    session = MagicMock()
+    session.post = mock
+    monkeypatch.setattr("users.notifications.get_session", lambda: session)
+    return mock
+
+
+def _sent(post):
+    return {m["to"]: m for c in post.call_args_list for m in c.kwargs["json"]}
+
+
+class TestQueueNotification:
+    def test_rolled_back_transaction_queues_nothing(self, alice):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                queue_notification(alice, "Hi", "There")
+                raise RuntimeError
+
+        assert not NotificationOutbox.objects.exists()
+
+    def test_commit_kicks_the_dispatcher(
+        self, alice, settings, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+        post = _patch_post(monkeypatch)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            queue_notification(alice, "Booking confirmed!", "See you", {"id": 4})
+            post.assert_not_called()
+
+        sent = _sent(post)
+        assert set(sent) == {"ExponentPushToken[a1]", "ExponentPushToken[a2]"}
+        assert sent["ExponentPushToken[a1]"]["data"] == {"id": 4}
+        assert not NotificationOutbox.objects.exists()
+
+
+class TestDispatchOutbox:
+    def test_coalesces_per_user(self, alice, bob, monkeypatch):
+        queue_notification(alice, "New hire request!", "carol wants to book you")
+        queue_notification(alice, "New hire request!", "carol wants to book you")
+        queue_notification(alice, "New hire request!", "dave wants to book you")
+        queue_notification(bob, "Payment sent!", "₹1900 has been sent")
+        post = _patch_post(monkeypatch)
+
+        stats = dispatch_outbox()
+
+        sent = _sent(post)
+        assert len(sent) == 3
+        assert sent["ExponentPushToken[a1]"]["body"] == (
+            "dave wants to book you (+1 more)"
+        )
+        assert sent["ExponentPushToken[b1]"]["body"] == "₹1900 has been sent"
+        assert stats == {"rows": 4, "pushes": 3, "retried": 0}
+        assert not NotificationOutbox.objects.exists()
+
+    def test_user_without_devices_is_cleared(self, db, monkeypatch):
+        user = User.objects.create_user("nodevice", password="x")
+        queue_notification(user, "Hi", "There")
+        post = _patch_post(monkeypatch)
+
+        dispatch_outbox()
+
+        post.assert_not_called()
+        assert not NotificationOutbox.objects.exists()
+
+    def test_failed_push_is_retried_then_dropped(self, bob, settings, monkeypatch):
+        settings.NOTIFICATION_OUTBOX = {
+            **settings.NOTIFICATION_OUTBOX,
+            "MAX_ATTEMPTS": 2,
+        }
+        queue_notification(bob, "Hi", "There")
+        _patch_post(monkeypatch, status=503)
+
+        assert dispatch_outbox()["retried"] == 1
+        assert NotificationOutbox.objects.get().attempts == 1
+
+        dispatch_outbox()
+        assert not NotificationOutbox.objects.exists()
+
+    def test_single_flight(self, bob, monkeypatch):
+        queue_notification(bob, "Hi", "There")
+        post = _patch_post(monkeypatch)
+        cache.add(OUTBOX_LOCK_KEY, 1)
+
+        assert dispatch_outbox() is None
+        post.assert_not_called()
+        assert NotificationOutbox.objects.count() == 1
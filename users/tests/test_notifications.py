@@ -1,17 +1,22 @@
 """
-Tests for users/notifications.py — send_push_notification (1:1) and
-broadcast_push_notification (batched). Expo's API is fully mocked via
-monkeypatching requests.post so these tests never touch the network.
+Tests for users/notifications.py — send_push_notification (1:1),
+broadcast_push_notification (batched) and check_receipts (push receipts).
+Expo's API is fully mocked via monkeypatching the pooled session's post()
+so these tests never touch the network.
 """
 
+from datetime import timedelta
 from unittest.mock import MagicMock
 
 import pytest
 from django.contrib.auth.models import User
+from django.utils import timezone
 
-from users.models import PushToken
+from users.models import PushTicket, PushToken
 from users.notifications import (
+    EXPO_RECEIPTS_URL,
     broadcast_push_notification,
+    check_receipts,
     send_push_notification,
 )
 
@@ -24,14 +29,21 @@ def user(db):
 def _ok_response(results):
     resp = MagicMock()
     resp.ok = True
+    resp.status_code = 200
     resp.json.return_value = {"data": results}
     return resp
 
 
+def _patch_post(monkeypatch, post):
+    session = MagicMock()
+    session.post = post
+    monkeypatch.setattr("users.notifications.get_session", lambda: session)
+
+
 class TestSendPushNotification:
     def test_no_tokens_is_a_noop(self, user, monkeypatch):
         post = MagicMock()
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         send_push_notification(user=user, title="Hi", body="There")
 
@@ -44,7 +56,7 @@ class TestSendPushNotification:
         post = MagicMock(
             return_value=_ok_response([{"status": "ok"}, {"status": "ok"}])
         )
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         send_push_notification(
             user=user,
@@ -66,9 +78,8 @@ class TestSendPushNotification:
         import requests
 
         PushToken.objects.create(user=user, token="ExponentPushToken[dev1]")
-        monkeypatch.setattr(
-            "users.notifications.requests.post",
-            MagicMock(side_effect=requests.RequestException("boom")),
+        _patch_post(
+            monkeypatch, MagicMock(side_effect=requests.RequestException("boom"))
         )
 
         # Should not raise — push notifications are best-effort.
@@ -87,7 +98,7 @@ class TestSendPushNotification:
                 ]
             )
         )
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         send_push_notification(user=user, title="Hi", body="There")
 
@@ -101,7 +112,7 @@ class TestSendPushNotification:
                 [{"status": "error", "details": {"error": "MessageTooBig"}}]
             )
         )
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         send_push_notification(user=user, title="Hi", body="There")
 
@@ -111,7 +122,7 @@ class TestSendPushNotification:
 class TestBroadcastPushNotification:
     def test_no_tokens_is_a_noop(self, db, monkeypatch):
         post = MagicMock()
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         broadcast_push_notification(title="Hi", body="There")
 
@@ -124,7 +135,7 @@ class TestBroadcastPushNotification:
         PushToken.objects.create(user=included, token="ExponentPushToken[incl]")
 
         post = MagicMock(return_value=_ok_response([{"status": "ok"}]))
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         broadcast_push_notification(
             title="New live event!", body="Someone is performing", exclude_user=excluded
@@ -141,15 +152,14 @@ class TestBroadcastPushNotification:
             PushToken.objects.create(user=u, token=f"ExponentPushToken[t{i}]")
 
         post = MagicMock(return_value=_ok_response([{"status": "ok"}] * 100))
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         broadcast_push_notification(title="Hi", body="There")
 
         assert post.call_count == 2
-        first_batch = post.call_args_list[0].kwargs["json"]
-        second_batch = post.call_args_list[1].kwargs["json"]
-        assert len(first_batch) == 100
-        assert len(second_batch) == 50
+        # Batches go out concurrently, so either may be sent first.
+        sizes = sorted(len(c.kwargs["json"]) for c in post.call_args_list)
+        assert sizes == [50, 100]
 
     def test_one_batch_failure_does_not_stop_others(self, db, monkeypatch):
         import requests
@@ -164,9 +174,174 @@ class TestBroadcastPushNotification:
                 _ok_response([{"status": "ok"}] * 50),
             ]
         )
-        monkeypatch.setattr("users.notifications.requests.post", post)
+        _patch_post(monkeypatch, post)
 
         # Should not raise, and should still attempt the second batch.
         broadcast_push_notification(title="Hi", body="There")
 
         assert post.call_count == 2
+
+
+def _tokens(n, prefix="w"):
+    users = User.objects.bulk_create(
+        [User(username=f"{prefix}{i}", password="!") for i in range(n)]
+    )
+    PushToken.objects.bulk_create(
+        [
+            PushToken(user=u, token=f"ExponentPushToken[{prefix}{i}]")
+            for i, u in enumerate(users)
+        ]
+    )
+
+
+class TestConcurrentBroadcast:
+    def test_in_flight_batches_are_bounded(self, db, monkeypatch, settings):
+        import threading
+        import time
+
+        settings.EXPO_PUSH = {**settings.EXPO_PUSH, "MAX_IN_FLIGHT": 3}
+        _tokens(1000)
+        lock, active, peak = threading.Lock(), [0], [0]
+
+        def post(url, json, timeout):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return _ok_response([{"status": "ok"}] * len(json))
+
+        _patch_post(monkeypatch, post)
+
+        stats = broadcast_push_notification(title="Hi", body="There")
+
+        assert stats == {"tokens": 1000, "batches": 10, "failed_batches": 0}
+        assert 1 < peak[0] <= 3
+
+    def test_rate_limited_batch_is_retried(self, db, monkeypatch):
+        _tokens(1)
+        limited = MagicMock(ok=False, status_code=429, headers={"Retry-After": "0"})
+        post = MagicMock(side_effect=[limited, _ok_response([{"status": "ok"}])])
+        _patch_post(monkeypatch, post)
+
+        stats = broadcast_push_notification(title="Hi", body="There")
+
+        assert post.call_count == 2
+        assert stats["failed_batches"] == 0
+
+    def test_gives_up_after_max_retries(self, db, monkeypatch, settings):
+        settings.EXPO_PUSH = {
+            **settings.EXPO_PUSH,
+            "MAX_RETRIES": 2,
+            "BACKOFF_BASE": 0,
+        }
+        _tokens(1)
+        down = MagicMock(ok=False, status_code=503, headers={})
+        post = MagicMock(return_value=down)
+        _patch_post(monkeypatch, post)
+
+        stats = broadcast_push_notification(title="Hi", body="There")
+
+        assert post.call_count == 3
+        assert stats["failed_batches"] == 1
+
+    def test_dead_tokens_are_removed_in_bulk(self, db, monkeypatch):
+        _tokens(150)
+        dead = {"status": "error", "details": {"error": "DeviceNotRegistered"}}
+        _patch_post(
+            monkeypatch,
+            lambda url, json, timeout: _ok_response([dead] * len(json)),
+        )
+
+        broadcast_push_notification(title="Hi", body="There")
+
+        assert not PushToken.objects.exists()
+
+    def test_session_is_shared(self):
+        from users.notifications import get_session
+
+        assert get_session() is get_session()
+
+
+class TestPushReceipts:
+    def _age_tickets(self, minutes=20):
+        PushTicket.objects.update(
+            created_at=timezone.now() - timedelta(minutes=minutes)
+        )
+
+    def test_broadcast_records_ok_tickets(self, db, monkeypatch):
+        _tokens(3, prefix="r")
+        _patch_post(
+            monkeypatch,
+            lambda url, json, timeout: _ok_response(
+                [{"status": "ok", "id": f"ticket-{m['to']}"} for m in json]
+            ),
+        )
+
+        broadcast_push_notification(title="Hi", body="There")
+
+        assert PushTicket.objects.count() == 3
+        ticket = PushTicket.objects.get(token="ExponentPushToken[r1]")
+        assert ticket.ticket_id == "ticket-ExponentPushToken[r1]"
+
+    def test_receipts_prune_dead_tokens(self, db, monkeypatch):
+        _tokens(3, prefix="s")
+        for i, name in enumerate(("dead", "ok", "pending")):
+            PushTicket.objects.create(ticket_id=name, token=f"ExponentPushToken[s{i}]")
+        self._age_tickets()
+        post = MagicMock(
+            return_value=_ok_response(
+                {
+                    "dead": {
+                        "status": "error",
+                        "details": {"error": "DeviceNotRegistered"},
+                    },
+                    "ok": {"status": "ok"},
+                }
+            )
+        )
+        _patch_post(monkeypatch, post)
+
+        stats = check_receipts()
+
+        assert post.call_args.args[0] == EXPO_RECEIPTS_URL
+        assert sorted(post.call_args.kwargs["json"]["ids"]) == [
+            "dead",
+            "ok",
+            "pending",
+        ]
+        assert stats["dead"] == 1
+        assert stats["errors"] == {"DeviceNotRegistered": 1}
+        assert not PushToken.objects.filter(token="ExponentPushToken[s0]").exists()
+        assert PushToken.objects.count() == 2
+        assert list(PushTicket.objects.values_list("ticket_id", flat=True)) == [
+            "pending"
+        ]
+
+    def test_receipts_are_fetched_in_batches_of_1000(self, db, monkeypatch):
+        PushTicket.objects.bulk_create(
+            [PushTicket(ticket_id=f"t{i}", token="x") for i in range(1500)]
+        )
+        self._age_tickets()
+        post = MagicMock(return_value=_ok_response({}))
+        _patch_post(monkeypatch, post)
+
+        check_receipts()
+
+        sizes = [len(c.kwargs["json"]["ids"]) for c in post.call_args_list]
+        assert sizes == [1000, 500]
+
+    def test_recent_and_expired_tickets_are_not_fetched(self, db, monkeypatch):
+        PushTicket.objects.create(ticket_id="fresh", token="x")
+        PushTicket.objects.create(ticket_id="stale", token="y")
+        PushTicket.objects.filter(ticket_id="stale").update(
+            created_at=timezone.now() - timedelta(hours=25)
+        )
+        post = MagicMock()
+        _patch_post(monkeypatch, post)
+
+        check_receipts()
+
+        post.assert_not_called()
+        assert list(PushTicket.objects.values_list("ticket_id", flat=True)) == ["fresh"]
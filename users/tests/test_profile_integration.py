@@ -75,25 +75,29 @@ class TestProfileWebIntegration(TestCase):
         self.assertEqual(self.profile.location, "Delhi")
 
     def test_profile_picture_upload(self):
-        resp = self.client.post(
-            "/users/profile/",
-            {
-                **self._base_payload(),
-                "profile_picture": self._fake_image(),
-            },
-        )
+        # Processed and swapped in by process_profile_image after commit
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                "/users/profile/",
+                {
+                    **self._base_payload(),
+                    "profile_picture": self._fake_image(),
+                },
+            )
         self.assertEqual(resp.status_code, 302)
         self.profile.refresh_from_db()
         self.assertTrue(self.profile.profile_picture)
 
     def test_cover_photo_upload(self):
-        resp = self.client.post(
-            "/users/profile/",
-            {
-                **self._base_payload(),
-                "cover_photo": self._fake_image(),
-            },
-        )
+        # Processed and swapped in by process_profile_image after commit
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                "/users/profile/",
+                {
+                    **self._base_payload(),
+                    "cover_photo": self._fake_image(),
+                },
+            )
         self.assertEqual(resp.status_code, 302)
         self.profile.refresh_from_db()
         self.assertTrue(self.profile.cover_photo)
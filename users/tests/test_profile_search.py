@@ -0,0 +1,119 @@
+"""
+Profile search — GET /api/users/search/ (users.utils.search over FeedCard).
+
+Matches on username, profession, location and bio; ranked keyset pages with
+no duplicates or gaps; one cache entry per normalized query, invalidated by
+profile edits.
+"""
+
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from users.models import FeedCard
+from users.utils.cursor import decode_rank_cursor, encode_rank_cursor
+from users.utils.search import normalize_query
+
+
+class TestSearchHelpers(SimpleTestCase):
+    def test_rank_cursor_round_trip(self):
+        c = encode_rank_cursor(0.0607927, 42)
+        self.assertEqual(decode_rank_cursor(c), (0.0607927, 42))
+
+    def test_malformed_rank_cursor_is_first_page(self):
+        self.assertIsNone(decode_rank_cursor("%%%"))
+        self.assertIsNone(decode_rank_cursor(""))
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Kathak   DANCER "), "kathak dancer")
+        self.assertEqual(normalize_query(None), "")
+
+
+class TestProfileSearchAPI(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user("viewer", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.viewer)
+
+    def _artist(self, username, **fields):
+        user = User.objects.create_user(username, password="x")
+        profile = user.profile
+        for k, v in fields.items():
+            setattr(profile, k, v)
+        profile.save()
+        return user
+
+    def _search(self, q, **params):
+        return self.api.get("/api/users/search/", {"q": q, **params})
+
+    def _usernames(self, r):
+        return [p["username"] for p in r.data["results"]]
+
+    def test_matches_each_searchable_field(self):
+        self._artist("meera", profession="Dancer")
+        self._artist("arjun", location="Mysore")
+        self._artist("kiran", bio="Kathak since 2009")
+        self._artist("nobody", profession="Magician")
+        self.assertEqual(self._usernames(self._search("meera")), ["meera"])
+        self.assertEqual(self._usernames(self._search("dancer")), ["meera"])
+        self.assertEqual(self._usernames(self._search("mysore")), ["arjun"])
+        self.assertEqual(self._usernames(self._search("kathak")), ["kiran"])
+
+    def test_result_shape_matches_feed_cards(self):
+        self._artist("meera", profession="Dancer")
+        card = self._search("meera").data["results"][0]
+        self.assertEqual(
+            set(card),
+            {
+                "user_id",
+                "username",
+                "profession",
+                "profile_picture_url",
+                "profile_picture_srcset",
+                "is_performer",
+                "bio",
+            },
+        )
+
+    def test_requester_is_excluded(self):
+        self._artist("viewer2")
+        self.assertEqual(self._usernames(self._search("viewer")), ["viewer2"])
+
+    def test_short_query_rejected(self):
+        self.assertEqual(self._search(" a ").status_code, 400)
+
+    def test_keyset_pages_cover_all_matches_once(self):
+        for i in range(25):
+            self._artist(f"artist{i}", profession="Dancer")
+        seen, cursor = [], ""
+        while True:
+            r = self._search("dancer", cursor=cursor)
+            seen += self._usernames(r)
+            cursor = r.data["next_cursor"]
+            if not r.data["has_next"]:
+                break
+        self.assertEqual(sorted(seen), sorted(f"artist{i}" for i in range(25)))
+
+    def test_equivalent_queries_share_a_cache_entry(self):
+        self._artist("meera", profession="Dancer")
+        self._search("Dancer")
+        FeedCard.objects.all().delete()  # bypasses signals: only the cache answers
+        self.assertEqual(self._usernames(self._search("  DANCER ")), ["meera"])
+
+    def test_profile_edit_invalidates_results(self):
+        user = self._artist("meera", profession="Dancer")
+        self.assertEqual(self._usernames(self._search("singer")), [])
+        profile = user.profile
+        profile.profession = "Singer"
+        profile.save()
+        self.assertEqual(self._usernames(self._search("singer")), ["meera"])
+
+    @skipUnless(connection.vendor == "postgresql", "trigram matching is Postgres-only")
+    def test_typo_tolerant_on_postgres(self):
+        self._artist("meera", profession="Bharatanatyam")
+        self.assertEqual(self._usernames(self._search("bharatnatyam")), ["meera"])
@@ -0,0 +1,64 @@
+"""
+Shared S3/R2 connection (myproject.s3_client).
+
+One boto3 Session per process and one resource per endpoint, reused by
+presigning and media storage, rebuilt after a fork.
+"""
+
+from unittest.mock import patch
+
+import boto3
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from myproject import s3_client
+from myproject.storage import SharedS3Storage
+
+S3 = dict(
+    USE_S3=True,
+    AWS_STORAGE_BUCKET_NAME="bucket",
+    AWS_S3_ENDPOINT_URL="https://r2.example",
+    AWS_S3_REGION_NAME="auto",
+    AWS_ACCESS_KEY_ID="ak",
+    AWS_SECRET_ACCESS_KEY="sk",
+)
+
+
+@override_settings(**S3)
+class TestSharedClient(TestCase):
+    def setUp(self):
+        s3_client._pid = None
+        self.addCleanup(setattr, s3_client, "_pid", None)
+
+    def test_presigns_reuse_one_session(self):
+        user = User.objects.create_user("artist", password="x")
+        api = APIClient()
+        api.force_authenticate(user=user)
+        with patch("boto3.session.Session", wraps=boto3.session.Session) as session:
+            for _ in range(3):
+                r = api.post(
+                    "/api/users/me/uploads/presign/",
+                    {"content_type": "image/jpeg"},
+                    format="json",
+                )
+                self.assertEqual(r.status_code, 200)
+                self.assertIn("X-Amz-Signature", r.data["url"])
+        session.assert_called_once()
+
+    def test_one_client_per_endpoint(self):
+        a = s3_client.get_client()
+        self.assertIs(s3_client.get_client("https://r2.example"), a)
+        self.assertIsNot(s3_client.get_client("https://cdn.example"), a)
+
+    def test_rebuilt_after_fork(self):
+        before = s3_client.get_client()
+        with patch("os.getpid", return_value=-1):
+            self.assertIsNot(s3_client.get_client(), before)
+
+    def test_storage_uses_shared_resource(self):
+        storage = SharedS3Storage(
+            bucket_name="bucket", endpoint_url="https://r2.example"
+        )
+        self.assertIs(storage.connection, s3_client.get_resource("https://r2.example"))
+        self.assertEqual(storage.bucket.name, "bucket")
@@ -0,0 +1,82 @@
+"""
+Web feed / live-events views render the API's cached payloads (users.api.payloads).
+
+A page filled by one surface must be a cache hit for the other, and what
+lands in Redis must be plain data — no Page, QuerySet or model instances.
+"""
+
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Model
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from bookings.models import Engagement
+from users.api import payloads
+
+
+def _only_plain_data(value):
+    if isinstance(value, dict):
+        return all(_only_plain_data(v) for v in value.values())
+    if isinstance(value, list):
+        return all(_only_plain_data(v) for v in value)
+    return not isinstance(value, Model) and type(value).__module__ in (
+        "builtins",
+        "datetime",
+    )
+
+
+class TestSharedPayloads(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user("viewer", password="x")
+        self.client.login(username="viewer", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.viewer)
+        performer = User.objects.create_user("artist", password="x")
+        Engagement.objects.create(
+            client=self.viewer,
+            performer=performer,
+            date=date.today() + timedelta(days=2),
+            time=time(19, 0),
+            venue="Hall",
+            occasion="Wedding",
+            status=Engagement.STATUS_ACCEPTED,
+        )
+
+    def _feedcard_queries(self, fn):
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        return [q for q in ctx.captured_queries if "users_feedcard" in q["sql"]]
+
+    def test_api_fill_is_a_web_hit(self):
+        self.assertTrue(
+            self._feedcard_queries(lambda: self.api.get("/api/users/feed/"))
+        )
+        self.assertFalse(
+            self._feedcard_queries(lambda: self.client.get("/users/global-feed/"))
+        )
+
+    def test_web_fill_is_an_api_hit(self):
+        self.client.get("/users/live-events/")
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.api.get("/api/users/live-events/")
+        self.assertFalse(
+            [q for q in ctx.captured_queries if "bookings_engagement" in q["sql"]]
+        )
+        self.assertEqual(r.data["results"][0]["performer"]["username"], "artist")
+
+    def test_payloads_are_plain_data(self):
+        self.assertTrue(_only_plain_data(payloads.feed_page(None, "1", [])))
+        self.assertTrue(_only_plain_data(payloads.events_page("upcoming", "1")))
+        self.assertTrue(_only_plain_data(payloads.recent_past_events()))
+
+    def test_web_feed_renders_from_payload(self):
+        r = self.client.get("/users/global-feed/")
+        self.assertContains(r, "artist")
+        self.assertNotContains(r, "viewer")
+        self.assertContains(r, "2 artists on stage")
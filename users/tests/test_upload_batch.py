@@ -0,0 +1,128 @@
+"""
+Batch presign / confirm — /api/users/me/uploads/presign-batch/ and
+/api/users/me/uploads/confirm-batch/.
+
+One presign call signs every file with one client; one confirm call checks
+the upload limit once, bulk-inserts, bumps the caches and enqueues a single
+Celery group. Any invalid item rejects the whole batch.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import Upload
+
+
+@override_settings(
+    USE_S3=True,
+    AWS_STORAGE_BUCKET_NAME="bucket",
+    AWS_S3_ENDPOINT_URL="https://r2.example",
+    AWS_S3_REGION_NAME="auto",
+    AWS_ACCESS_KEY_ID="ak",
+    AWS_SECRET_ACCESS_KEY="sk",
+)
+class TestPresignBatch(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def test_one_client_signs_the_whole_batch(self):
+        with patch("myproject.s3_client.get_client") as client:
+            client.return_value.generate_presigned_url.return_value = "https://signed"
+            r = self.api.post(
+                "/api/users/me/uploads/presign-batch/",
+                {"content_types": ["image/jpeg", "image/png", "video/mp4"]},
+                format="json",
+            )
+        self.assertEqual(r.status_code, 200)
+        client.assert_called_once()
+        items = r.data["uploads"]
+        self.assertEqual([i["content_type"] for i in items][2], "video/mp4")
+        self.assertTrue(items[2]["key"].endswith(".mp4"))
+        for item in items:
+            self.assertTrue(
+                item["key"].startswith(f"profile_pics/user_{self.user.id}/")
+            )
+            self.assertEqual(item["url"], "https://signed")
+
+    def test_rejects_bad_types_and_oversized_batches(self):
+        url = "/api/users/me/uploads/presign-batch/"
+        bad = self.api.post(url, {"content_types": ["image/gif"]}, format="json")
+        self.assertEqual(bad.status_code, 400)
+        big = self.api.post(url, {"content_types": ["image/jpeg"] * 10}, format="json")
+        self.assertEqual(big.status_code, 400)
+
+    @override_settings(USE_S3=False)
+    def test_local_dev_not_implemented(self):
+        r = self.api.post(
+            "/api/users/me/uploads/presign-batch/",
+            {"content_types": ["image/jpeg"]},
+            format="json",
+        )
+        self.assertEqual(r.status_code, 501)
+
+
+class TestConfirmBatch(TestCase):
+    URL = "/api/users/me/uploads/confirm-batch/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.prefix = f"profile_pics/user_{self.user.id}"
+
+    def _confirm(self, keys):
+        return self.api.post(
+            self.URL,
+            {"uploads": [{"key": k, "caption": f"#{i}"} for i, k in enumerate(keys)]},
+            format="json",
+        )
+
+    def test_bulk_insert_single_group_and_cache_bump(self):
+        self.assertEqual(self.api.get("/api/users/me/uploads/").data, [])
+        keys = [f"{self.prefix}/a.jpg", f"{self.prefix}/b.jpg", f"{self.prefix}/c.mp4"]
+        with patch("celery.group") as group:
+            r = self._confirm(keys)
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(len(r.data["uploads"]), 3)
+
+        group.assert_called_once()
+        sigs = list(group.call_args.args[0])
+        self.assertEqual(
+            [s.task for s in sigs],
+            [
+                "users.tasks.process_uploaded_image",
+                "users.tasks.process_uploaded_image",
+                "users.tasks.compress_upload_video",
+            ],
+        )
+        group.return_value.apply_async.assert_called_once()
+
+        upload = Upload.objects.get(video=f"{self.prefix}/c.mp4")
+        self.assertEqual(upload.caption, "#2")
+        self.assertEqual(len(self.api.get("/api/users/me/uploads/").data), 3)
+
+    def test_limit_checked_for_the_whole_batch(self):
+        for i in range(Upload.MAX_UPLOADS_PER_USER - 2):
+            Upload.objects.create(
+                profile=self.user.profile, image=f"{self.prefix}/old{i}.jpg"
+            )
+        with patch("celery.group") as group:
+            r = self._confirm([f"{self.prefix}/{n}.jpg" for n in "abc"])
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("Maximum", r.data["detail"])
+        self.assertEqual(Upload.objects.count(), Upload.MAX_UPLOADS_PER_USER - 2)
+        group.assert_not_called()
+
+    def test_foreign_and_duplicate_keys_rejected(self):
+        other = f"profile_pics/user_{self.user.id + 1}/a.jpg"
+        self.assertEqual(self._confirm([other]).status_code, 400)
+        dup = f"{self.prefix}/a.jpg"
+        self.assertEqual(self._confirm([dup, dup]).status_code, 400)
+        self.assertFalse(Upload.objects.exists())
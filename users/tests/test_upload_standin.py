@@ -0,0 +1,145 @@
+"""
+Local stand-in for presigned uploads (users.api.presign.StandInSigner,
+UploadStandInView) and the bench_uploads command that drives it.
+
+With USE_S3=0 and UPLOAD_STANDIN["ENABLED"] the presign → PUT → confirm →
+process path runs entirely against filesystem storage.
+"""
+
+import tempfile
+from io import BytesIO, StringIO
+from urllib.parse import urlsplit
+
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+STANDIN = {"ENABLED": True, "BASE_URL": "http://testserver"}
+
+
+def _jpeg():
+    buf = BytesIO()
+    Image.new("RGB", (900, 600), color="olive").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@override_settings(
+    USE_S3=False,
+    UPLOAD_STANDIN=STANDIN,
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class TestUploadStandIn(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("artist", password="x")
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.anon = APIClient()
+
+    def _presign(self, content_type="image/jpeg"):
+        r = self.api.post(
+            "/api/users/me/uploads/presign/",
+            {"content_type": content_type},
+            format="json",
+        )
+        self.assertEqual(r.status_code, 200)
+        url = urlsplit(r.data["url"])
+        self.assertEqual(url.netloc, "testserver")
+        return f"{url.path}?{url.query}", r.data["key"]
+
+    def test_presign_put_confirm_process(self):
+        path, key = self._presign()
+        r = self.anon.put(path, _jpeg(), content_type="image/jpeg")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(default_storage.exists(key))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.api.post("/api/users/me/uploads/", {"key": key}, format="json")
+        self.assertEqual(r.status_code, 201)
+        item = self.api.get("/api/users/me/uploads/").data[0]
+        self.assertEqual(set(item["image_srcset"]["webp"]), {"320", "640"})
+
+    def test_put_is_checked_like_a_presigned_url(self):
+        path, key = self._presign()
+        self.assertEqual(
+            self.anon.put(path, b"x", content_type="image/png").status_code, 400
+        )
+        forged = path.replace("token=", "token=x")
+        self.assertEqual(
+            self.anon.put(forged, b"x", content_type="image/jpeg").status_code, 403
+        )
+        self.assertEqual(
+            self.anon.put(path, b"x", content_type="image/jpeg").status_code, 200
+        )
+        self.assertEqual(
+            self.anon.put(path, b"y", content_type="image/jpeg").status_code, 409
+        )
+        with default_storage.open(key) as f:
+            self.assertEqual(f.read(), b"x")
+
+    def test_put_streams_bodies_past_the_memory_limit(self):
+        path, key = self._presign()
+        body = b"\xff" * (3 * 1024 * 1024)
+        r = self.anon.put(path, body, content_type="image/jpeg")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(default_storage.size(key), len(body))
+
+    def test_put_over_the_size_limit(self):
+        path, key = self._presign()
+        r = self.anon.put(
+            path,
+            b"x",
+            content_type="image/jpeg",
+            CONTENT_LENGTH=str(25 * 1024 * 1024 + 1),
+        )
+        self.assertEqual(r.status_code, 413)
+        self.assertFalse(default_storage.exists(key))
+
+    @override_settings(UPLOAD_STANDIN={**STANDIN, "ENABLED": False})
+    def test_disabled(self):
+        r = self.api.post(
+            "/api/users/me/uploads/presign/",
+            {"content_type": "image/jpeg"},
+            format="json",
+        )
+        self.assertEqual(r.status_code, 501)
+        r = self.anon.put(
+            "/api/uploads/standin/?token=x", b"x", content_type="image/jpeg"
+        )
+        self.assertEqual(r.status_code, 404)
+
+    def test_bench_command_in_process(self):
+        bystander = User.objects.create_user("bench_upload_0", password="x")
+        out = StringIO()
+        call_command(
+            "bench_uploads",
+            "-n",
+            "2",
+            "-c",
+            "1",
+            "--in-process",
+            "--width",
+            "400",
+            "--height",
+            "300",
+            stdout=out,
+        )
+        text = out.getvalue()
+        self.assertIn("2/2 uploads", text)
+        for stage in ("presign", "put", "confirm", "process", "total"):
+            self.assertIn(stage, text)
+        self.assertEqual(
+            list(User.objects.filter(username__startswith="bench_")), [bystander]
+        )
+
+    @override_settings(USE_S3=True)
+    def test_bench_command_refuses_r2(self):
+        with self.assertRaises(CommandError):
+            call_command("bench_uploads", "-n", "1", "--in-process", stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith="bench_").exists())
@@ -0,0 +1,228 @@
+"""
+Video processing: poster frames, HLS ladders and segment-parallel encoding
+(users.utils.video, users.tasks).
+
+ffmpeg/ffprobe are faked: each fake writes the files the real command would,
+so the tests cover ladder selection, playlists, storage layout and the
+serializer fields without a real encoder.
+"""
+
+import os
+import subprocess
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import Upload
+from users.tasks import (
+    VIDEO_CHUNK_PREFIX,
+    build_upload_hls,
+    compress_upload_video,
+    encode_hls_rung,
+)
+from users.utils.video import ladder_for, master_playlist
+
+_TEMP_MEDIA = tempfile.mkdtemp()
+
+HLS = {
+    "ENABLED": True,
+    "SEGMENT_SECONDS": 4,
+    "LADDER": [(360, 800), (720, 2800), (1080, 5000)],
+    "AUDIO_KBPS": 128,
+}
+
+
+def fake_ffmpeg(size="1280,720", duration="12.5", calls=None):
+    """subprocess.run stand-in that writes each command's output file(s)."""
+
+    def run(cmd, **kwargs):
+        if calls is not None:
+            calls.append(cmd)
+        if cmd[0] == "ffprobe":
+            out = duration if "format=duration" in cmd else size
+            return subprocess.CompletedProcess(cmd, 0, stdout=f"{out}\n")
+        out = cmd[-1]
+        if "segment" in cmd:
+            for i in range(3):
+                with open(out.replace("%03d", f"{i:03d}"), "wb") as f:
+                    f.write(b"chunk")
+            return subprocess.CompletedProcess(cmd, 0)
+        if "-hls_segment_filename" in cmd:
+            seg = cmd[cmd.index("-hls_segment_filename") + 1]
+            for i in range(2):
+                with open(seg.replace("%03d", f"{i:03d}"), "wb") as f:
+                    f.write(b"ts")
+        with open(out, "wb") as f:
+            f.write(b"#EXTM3U\n" if out.endswith(".m3u8") else b"data")
+        return subprocess.CompletedProcess(cmd, 0)
+
+    return run
+
+
+@override_settings(VIDEO_HLS=HLS)
+class TestLadder(SimpleTestCase):
+    def test_landscape_ladder(self):
+        self.assertEqual(
+            ladder_for(1920, 1080),
+            [
+                ("360p", (640, 360), 800),
+                ("720p", (1280, 720), 2800),
+                ("1080p", (1920, 1080), 5000),
+            ],
+        )
+
+    def test_portrait_sized_by_short_edge_without_upscaling(self):
+        self.assertEqual(
+            ladder_for(720, 1280),
+            [("360p", (360, 640), 800), ("720p", (720, 1280), 2800)],
+        )
+
+    def test_tiny_source_gets_one_native_rung(self):
+        self.assertEqual(ladder_for(320, 240), [("240p", (320, 240), 800)])
+
+    def test_master_playlist(self):
+        text = master_playlist(ladder_for(1280, 720))
+        self.assertEqual(
+            text.splitlines(),
+            [
+                "#EXTM3U",
+                "#EXT-X-VERSION:3",
+                "#EXT-X-STREAM-INF:BANDWIDTH=984000,RESOLUTION=640x360",
+                "360p.m3u8",
+                "#EXT-X-STREAM-INF:BANDWIDTH=3124000,RESOLUTION=1280x720",
+                "720p.m3u8",
+            ],
+        )
+
+
+@override_settings(
+    MEDIA_ROOT=_TEMP_MEDIA,
+    VIDEO_HLS=HLS,
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class TestVideoTasks(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("artist", password="x")
+        self.upload = Upload.objects.create(
+            profile=self.user.profile,
+            video=SimpleUploadedFile("clip.mp4", b"\x00" * 100),
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+
+    def test_hls_ladder_is_stored_and_exposed(self):
+        with patch("subprocess.run", fake_ffmpeg()):
+            build_upload_hls(self.upload.pk)
+        self.upload.refresh_from_db()
+        prefix = f"profile_videos/hls/{self.upload.pk}"
+        self.assertEqual(self.upload.video_hls, f"{prefix}/master.m3u8")
+        storage = self.upload.video.storage
+        for name in ("master.m3u8", "360p.m3u8", "720p_001.ts"):
+            self.assertTrue(storage.exists(f"{prefix}/{name}"), name)
+        self.assertFalse(storage.exists(f"{prefix}/1080p.m3u8"))
+
+        item = self.api.get("/api/users/me/uploads/").data[0]
+        self.assertTrue(item["hls_url"].endswith(f"{prefix}/master.m3u8"))
+
+    def test_each_rung_is_its_own_task(self):
+        calls = []
+        with (
+            patch("subprocess.run", fake_ffmpeg(calls=calls)),
+            patch("users.tasks.encode_hls_rung.run", wraps=encode_hls_rung.run) as rung,
+        ):
+            build_upload_hls(self.upload.pk)
+        self.assertEqual(
+            sorted(c.args[2] for c in rung.call_args_list), ["360p", "720p"]
+        )
+        self.assertEqual(sum("-hls_segment_filename" in c for c in calls), 2)
+        self.upload.refresh_from_db()
+        self.assertTrue(self.upload.video_hls.endswith("/master.m3u8"))
+
+    def test_failed_rung_publishes_nothing(self):
+        ok = fake_ffmpeg()
+
+        def run(cmd, **kwargs):
+            if "-hls_segment_filename" in cmd and "720p.m3u8" in cmd[-1]:
+                raise subprocess.TimeoutExpired(cmd, 270)
+            return ok(cmd, **kwargs)
+
+        with patch("subprocess.run", run):
+            build_upload_hls(self.upload.pk)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.video_hls, "")
+
+    def test_ffmpeg_failure_leaves_mp4_only(self):
+        def broken(cmd, **kwargs):
+            raise subprocess.CalledProcessError(1, cmd)
+
+        with patch("subprocess.run", broken):
+            build_upload_hls(self.upload.pk)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.video_hls, "")
+        item = self.api.get("/api/users/me/uploads/").data[0]
+        self.assertEqual(item["hls_url"], "")
+        self.assertTrue(item["video_url"])
+
+    def test_compress_saves_poster_and_queues_hls(self):
+        with (
+            patch("subprocess.run", fake_ffmpeg()),
+            patch("users.tasks.build_upload_hls.delay") as hls,
+        ):
+            compress_upload_video(self.upload.pk)
+        self.upload.refresh_from_db()
+        self.assertTrue(self.upload.video_poster.name.endswith(".jpg"))
+        self.assertTrue(os.path.exists(self.upload.video_poster.path))
+        hls.assert_called_once_with(self.upload.pk)
+        item = self.api.get("/api/users/me/uploads/").data[0]
+        self.assertTrue(item["poster_url"].endswith(".jpg"))
+
+    @override_settings(VIDEO_HLS={**HLS, "ENABLED": False})
+    def test_hls_disabled(self):
+        with (
+            patch("subprocess.run", fake_ffmpeg()),
+            patch("users.tasks.build_upload_hls.delay") as hls,
+        ):
+            compress_upload_video(self.upload.pk)
+        hls.assert_not_called()
+
+    def test_long_video_is_encoded_as_a_chord_of_chunks(self):
+        raw = self.upload.video.name
+        calls = []
+        with patch("subprocess.run", fake_ffmpeg(duration="125.0", calls=calls)):
+            compress_upload_video(self.upload.pk)
+        ffmpeg = [c for c in calls if c[0] == "ffmpeg"]
+        # split, 3 chunk encodes, join, poster
+        self.assertIn("segment", ffmpeg[0])
+        self.assertEqual(sum("-an" in c and "libx264" in c for c in ffmpeg), 3)
+        self.assertIn("concat", ffmpeg[4])
+
+        self.upload.refresh_from_db()
+        storage = self.upload.video.storage
+        self.assertNotEqual(self.upload.video.name, raw)
+        self.assertFalse(storage.exists(raw))
+        self.assertTrue(self.upload.video_poster)
+        chunks = os.path.join(_TEMP_MEDIA, VIDEO_CHUNK_PREFIX, str(self.upload.pk))
+        self.assertEqual([f for _, _, fs in os.walk(chunks) for f in fs], [])
+
+    def test_failed_chunk_keeps_raw_and_cleans_up(self):
+        raw = self.upload.video.name
+        ok = fake_ffmpeg(duration="125.0")
+
+        def run(cmd, **kwargs):
+            if "libx264" in cmd and "-an" in cmd:
+                if not hasattr(run, "failed"):
+                    run.failed = True
+                    raise subprocess.TimeoutExpired(cmd, 270)
+            return ok(cmd, **kwargs)
+
+        with patch("subprocess.run", run):
+            compress_upload_video(self.upload.pk)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.video.name, raw)
+        chunks = os.path.join(_TEMP_MEDIA, VIDEO_CHUNK_PREFIX, str(self.upload.pk))
+        self.assertEqual([f for _, _, fs in os.walk(chunks) for f in fs], [])
@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination for pk-ordered listings.
+
+Paginator-based pages cost a COUNT(*) plus an OFFSET scan on every cache
+miss, and deep pages get slower as the table grows. Seeking on the primary
+key instead (`WHERE id > last_id ORDER BY id LIMIT n`) is a single index
+range scan, so page 500 costs the same as page 1.
+
+The cursor is opaque to clients (urlsafe base64 of the last id seen) so we
+can change the seek key later without breaking the Expo app. A malformed
+cursor never 500s — it falls back to the first page, matching the lenient
+behavior of paginator.get_page().
+"""
+
+import base64
+import binascii
+
+from django.db.models import Q
+
+
+def encode_cursor(last_id) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the last-seen id encoded in `cursor`, or None for a first page."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return last_id if last_id > 0 else None
+
+
+def keyset_page(queryset, cursor, page_size):
+    """Fetch the page after `cursor` from a pk-ordered queryset.
+
+    Reads page_size + 1 rows to learn whether another page exists, so no
+    COUNT(*) is ever issued. Returns (rows, next_cursor); next_cursor is
+    None on the last page.
+    """
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        queryset = queryset.filter(pk__gt=last_id)
+    rows = list(queryset.order_by("pk")[: page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1].pk)
+    return rows, None
+
+
+def encode_rank_cursor(rank, last_id) -> str:
+    return encode_cursor(f"{rank!r}:{last_id}")
+
+
+def decode_rank_cursor(cursor):
+    """Return (rank, last_id) from a ranked cursor, or None for a first page."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        rank, last_id = raw.rsplit(":", 1)
+        return float(rank), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def ranked_keyset_page(queryset, cursor, page_size, rank="rank"):
+    """Keyset page over a queryset annotated with `rank`, best first.
+
+    Seeks on (rank DESC, pk ASC) so equal-rank rows keep a stable order
+    across pages. Same return shape as keyset_page().
+    """
+    position = decode_rank_cursor(cursor)
+    if position is not None:
+        last_rank, last_id = position
+        queryset = queryset.filter(
+            Q(**{f"{rank}__lt": last_rank}) | Q(**{rank: last_rank, "pk__gt": last_id})
+        )
+    rows = list(queryset.order_by(f"-{rank}", "pk")[: page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_rank_cursor(getattr(rows[-1], rank), rows[-1].pk)
+    return rows, None
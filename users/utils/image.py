@@ -5,17 +5,49 @@ Catches every upload path (web form, DRF API, Django admin, future clients) and:
   - applies camera rotation from EXIF then STRIPS all EXIF (removes GPS, etc.)
   - downscales the longest edge to a per-kind cap
   - re-encodes as WebP quality 60 (storage-optimized, visually equivalent on mobile)
+  - decodes JPEGs at reduced scale (libjpeg DCT scaling, 1/2 - 1/8) close to
+    the target size, so a 48 MP phone photo never materialises at full size
+  - keeps decoded bitmaps under MAX_DECODE_PIXELS: formats without reduced
+    decoding (PNG, WebP, TIFF, ...) are decoded once, up to Pillow's own
+    MAX_IMAGE_PIXELS, and box-reduced straight away
   - is exception-safe: any PIL hiccup falls back to the original file untouched
 
-Called from model save() hooks via `is_fresh_upload()` so it only fires for
+Called from Upload.save() via `is_fresh_upload()` so it only fires for
 brand-new UploadedFile instances — never for files already in storage.
+Avatars and cover photos are stored raw and processed by the
+users.tasks.process_profile_image Celery task instead.
+
+Renditions: once the processed image is stored, `build_renditions()` (run by
+the users.tasks.generate_image_renditions Celery task) writes a few smaller
+widths per kind, as AVIF and WebP, under deterministic keys next to the
+source:
+
+    profile_pics/abc.webp  ->  profile_pics/abc_320w.avif, profile_pics/abc_320w.webp, ...
+
+The resulting {format: {width: key}} map is saved on the model
+(`<field>_renditions`) and exposed by the API serializers as a srcset map, so
+grids download a tile-sized file instead of the full image.
+
+Deduplication: `image_fingerprint()` hashes an upload's bytes (SHA-256) and
+its look (64-bit difference hash + mean colour). users.models.ImageFingerprint keeps one
+per processed image, so a profile re-uploading a photo it already has gets
+the stored object and its renditions back instead of another encode + copy.
 """
 
+import hashlib
 import logging
+import math
 from io import BytesIO
 
 from PIL import Image, ImageOps
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.db import transaction
+
+try:
+    import pillow_avif  # noqa: F401 — registers the AVIF codec on Pillow < 11.2
+except ImportError:
+    pass
 
 _log = logging.getLogger(__name__)
 
@@ -26,6 +58,30 @@ IMAGE_PROFILES = {
     "gallery": (1080, 60),  # Upload.image
 }
 
+# Largest bitmap we'll keep working on: 24 MP x 4 bytes (RGBA) ~ 96 MB per
+# job. JPEGs reduce far below this while decoding; a bigger PNG/WebP is
+# decoded once (within Image.MAX_IMAGE_PIXELS) and reduced right away.
+MAX_DECODE_PIXELS = 24_000_000
+
+# Pre-shrink with a cheap box reduce down to ~3x the target before the
+# LANCZOS pass — same visual result, a fraction of the CPU.
+REDUCING_GAP = 3.0
+
+# kind -> rendition widths (px). Sized for 2-3x screens: avatars in feed cards,
+# covers in profile headers, gallery tiles in the 3-column profile grid.
+RENDITION_WIDTHS = {
+    "avatar": (128, 256),
+    "cover": (640, 1280),
+    "gallery": (320, 640),
+}
+
+# (extension, PIL format, quality). AVIF is ~30% smaller than WebP at the same
+# quality; it's skipped when this Pillow build can't encode it.
+RENDITION_FORMATS = (
+    ("avif", "AVIF", 50),
+    ("webp", "WEBP", 60),
+)
+
 
 def is_fresh_upload(fieldfile) -> bool:
     """True only for a fresh upload that hasn't been saved to storage yet.
@@ -41,6 +97,43 @@ def is_fresh_upload(fieldfile) -> bool:
     return bool(fieldfile) and getattr(fieldfile, "_committed", True) is False
 
 
+def _decode(fp, scale_for):
+    """Open, reduced-scale decode, auto-rotate and mode-normalise an image.
+
+    `scale_for(w, h)` gets the displayed (post-rotation) size and returns the
+    downscale factor the caller will apply. JPEGs are then decoded at the
+    smallest DCT scale that still covers that target; other formats decode
+    at full size. Returns (image, displayed original size).
+    """
+    img = Image.open(fp)
+    w, h = img.size
+    rotated = img.getexif().get(0x0112) in (5, 6, 7, 8)  # EXIF orientation
+    dw, dh = (h, w) if rotated else (w, h)
+    scale = scale_for(dw, dh)
+    if scale < 1:
+        img.draft(None, (math.ceil(w * scale), math.ceil(h * scale)))
+    pixels = img.size[0] * img.size[1]
+    if pixels > MAX_DECODE_PIXELS:
+        # draft() only shrinks JPEGs. Anything else is decoded at full size
+        # — bounded by Pillow's decompression-bomb limit — and reduced by an
+        # integer factor at once, so only the reduced copy is worked on.
+        if pixels > Image.MAX_IMAGE_PIXELS:
+            raise ValueError(f"{w}x{h} exceeds Image.MAX_IMAGE_PIXELS")
+        factor = max(
+            math.floor(1 / scale) if scale < 1 else 1,
+            math.ceil(math.sqrt(pixels / MAX_DECODE_PIXELS)),
+        )
+        if img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGBA")
+        img = img.reduce(factor)
+    # Apply camera rotation, then EXIF is dropped (the re-encoded file has none)
+    img = ImageOps.exif_transpose(img)
+    # JPEG has no alpha; convert palette/RGBA to plain RGB
+    if img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGBA")
+    return img, (dw, dh)
+
+
 def process_image(uploaded_file, kind: str = "gallery"):
     """Resize + auto-rotate + strip EXIF + re-encode JPEG. ~50-150ms.
 
@@ -52,17 +145,15 @@ def process_image(uploaded_file, kind: str = "gallery"):
     max_edge, quality = IMAGE_PROFILES[kind]
 
     try:
-        img = Image.open(uploaded_file)
-        # Apply camera rotation, then EXIF is dropped (the re-encoded file has none)
-        img = ImageOps.exif_transpose(img)
-        # JPEG has no alpha; convert palette/RGBA to plain RGB
-        if img.mode not in ("RGB", "RGBA", "L"):
-            img = img.convert("RGBA")
+        img, (w, h) = _decode(uploaded_file, lambda w, h: max_edge / max(w, h))
         # Resize only if larger than the per-kind cap, preserving aspect
-        w, h = img.size
         if max(w, h) > max_edge:
             scale = max_edge / max(w, h)
-            img = img.resize((round(w * scale), round(h * scale)), Image.LANCZOS)
+            img = img.resize(
+                (round(w * scale), round(h * scale)),
+                Image.LANCZOS,
+                reducing_gap=REDUCING_GAP,
+            )
 
         buf = BytesIO()
         img.save(buf, format="WEBP", quality=quality)
@@ -85,3 +176,112 @@ def process_image(uploaded_file, kind: str = "gallery"):
         except Exception:
             pass
         return uploaded_file
+
+
+def image_fingerprint(fp):
+    """(sha256, dHash, mean colour, displayed (w, h)) of an image, or None.
+
+    The SHA-256 catches byte-identical re-uploads; the difference hash (sign
+    of the horizontal gradient over a 9x8 grayscale thumbnail, after EXIF
+    rotation) also matches re-encoded or resized copies. dHash is blind to
+    colour — every flat image hashes to 0 — so the mean colour ("rrggbb")
+    comes along. JPEGs decode at 1/8 scale for all of this, so it costs a
+    few ms next to process_image().
+    """
+    try:
+        digest = hashlib.sha256()
+        for chunk in fp.chunks():
+            digest.update(chunk)
+        fp.seek(0)
+        img, size = _decode(fp, lambda w, h: 64 / min(w, h))
+        px = img.convert("L").resize((9, 8), Image.BILINEAR).tobytes()
+        bits = 0
+        for row in range(8):
+            for col in range(8):
+                bits = bits << 1 | (px[row * 9 + col] > px[row * 9 + col + 1])
+        color = img.convert("RGB").resize((1, 1), Image.BOX).tobytes().hex()
+        return digest.hexdigest(), f"{bits:016x}", color, size
+    except Exception as e:
+        _log.warning("image_fingerprint(%s) failed: %s", getattr(fp, "name", fp), e)
+        return None
+    finally:
+        try:
+            fp.seek(0)
+        except Exception:
+            pass
+
+
+def hash_distance(a: str, b: str) -> int:
+    """Hamming distance between two hex dHashes (0 = same picture)."""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def color_distance(a: str, b: str) -> int:
+    """Largest per-channel difference between two "rrggbb" colours."""
+    return max(abs(x - y) for x, y in zip(bytes.fromhex(a), bytes.fromhex(b)))
+
+
+def rendition_name(name: str, width: int, ext: str) -> str:
+    """Deterministic storage key for one rendition of the file at `name`."""
+    return f"{name.rsplit('.', 1)[0]}_{width}w.{ext}"
+
+
+def _rendition_formats():
+    # Image.SAVE lists only the preloaded codecs until Image.init() runs
+    Image.init()
+    return [f for f in RENDITION_FORMATS if f[1] in Image.SAVE]
+
+
+def build_renditions(fieldfile, kind: str = "gallery", source=None) -> dict:
+    """Write the downscaled AVIF/WebP renditions of a stored image.
+
+    Returns {ext: {str(width): storage key}}; widths at or above the source
+    width are skipped (the original already serves them). Returns {} on ANY
+    failure — callers keep serving the original image. `source` is a local
+    file with the same bytes as `fieldfile`, decoded instead of downloading
+    the stored object again.
+    """
+    widths = RENDITION_WIDTHS.get(kind, RENDITION_WIDTHS["gallery"])
+    storage = fieldfile.storage
+    out = {}
+    try:
+        if source is None:
+            with fieldfile.open("rb") as f:
+                img, (w, h) = _decode(f, lambda w, h: max(widths) / w)
+                img.load()
+        else:
+            source.seek(0)
+            img, (w, h) = _decode(source, lambda w, h: max(widths) / w)
+            img.load()
+        for width in widths:
+            if width >= w:
+                continue
+            resized = img.resize(
+                (width, max(1, round(h * width / w))),
+                Image.LANCZOS,
+                reducing_gap=REDUCING_GAP,
+            )
+            for ext, fmt, quality in _rendition_formats():
+                buf = BytesIO()
+                resized.save(buf, format=fmt, quality=quality)
+                key = rendition_name(fieldfile.name, width, ext)
+                # Overwrite in place: storage would otherwise suffix the name.
+                if storage.exists(key):
+                    storage.delete(key)
+                out.setdefault(ext, {})[str(width)] = storage.save(
+                    key, ContentFile(buf.getvalue())
+                )
+        return out
+    except Exception as e:
+        _log.warning("build_renditions(%s, %s) failed: %s", fieldfile.name, kind, e)
+        return {}
+
+
+def schedule_renditions(instance, field: str, kind: str):
+    """Queue rendition generation for `instance.<field>` after commit."""
+    from users.tasks import generate_image_renditions
+
+    label, pk = instance._meta.label, instance.pk
+    transaction.on_commit(
+        lambda: generate_image_renditions.delay(label, pk, field, kind)
+    )
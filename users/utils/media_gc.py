@@ -0,0 +1,270 @@
+"""
+Orphaned media garbage collection.
+
+Objects nothing in the database points at pile up in the bucket: presigned
+PUTs that were never confirmed, raw originals whose delete failed after
+compression/processing, superseded avatars and covers with their
+renditions, chunks of abandoned segment-parallel encodes, and the HLS
+ladders of deleted uploads.
+
+`collect_orphans()` lists each prefix in key order and diffs it against one
+in-memory set of every key the database references. Whatever is left and is
+older than MEDIA_GC["MIN_AGE_HOURS"] is deleted, so an upload still waiting
+to be confirmed or processed is never touched. On S3/R2 the listing is
+ListObjectsV2 (key, size and age in one call per 1000 keys) and deletes are
+DeleteObjects batches of up to 1000 keys; filesystem storage is walked and
+deleted file by file, which is what dev and the tests run against.
+
+Progress is checkpointed in the cache after every batch. A run that uses up
+its key budget stops there, and the next run (the `gc_media` management
+command, or the daily `collect_orphan_media` beat task) resumes after the
+last key it finished.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+log = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = "media_gc:checkpoint"
+# S3 DeleteObjects takes at most 1000 keys per call
+DELETE_BATCH = 1000
+
+
+def prefixes():
+    """Every storage prefix the users app writes media under."""
+    from users.tasks import VIDEO_CHUNK_PREFIX
+
+    return (
+        "profile_pics/",
+        "cover_photos/",
+        "profile_videos/",
+        "video_posters/",
+        f"{VIDEO_CHUNK_PREFIX}/",
+    )
+
+
+def referenced_names(cutoff):
+    """(every storage key the database points at, HLS directories in use).
+
+    Built with a few streamed value queries, no model instances. Files
+    ImageFingerprint matched since `cutoff` count as referenced — a
+    re-upload may be about to point at them again.
+    """
+    from users.models import ImageFingerprint, Profile, Upload
+
+    names, hls_dirs = set(), set()
+
+    def add(name, renditions=None):
+        if name:
+            names.add(name)
+        for widths in (renditions or {}).values():
+            names.update(widths.values())
+
+    for pic, pic_r, pic_p, cover, cover_r, cover_p in Profile.objects.values_list(
+        "profile_picture",
+        "profile_picture_renditions",
+        "profile_picture_pending",
+        "cover_photo",
+        "cover_photo_renditions",
+        "cover_photo_pending",
+    ).iterator(chunk_size=2000):
+        add(pic, pic_r)
+        add(pic_p)
+        add(cover, cover_r)
+        add(cover_p)
+    for image, image_r, video, poster, hls in Upload.objects.values_list(
+        "image", "image_renditions", "video", "video_poster", "video_hls"
+    ).iterator(chunk_size=2000):
+        add(image, image_r)
+        add(video)
+        add(poster)
+        if hls:
+            # Segments and rung playlists live next to the master playlist
+            hls_dirs.add(hls.rsplit("/", 1)[0] + "/")
+    names.update(
+        ImageFingerprint.objects.filter(used_at__gte=cutoff).values_list(
+            "name", flat=True
+        )
+    )
+    return names, hls_dirs
+
+
+def _is_s3(storage):
+    return hasattr(storage, "bucket_name")
+
+
+def _s3_key(storage, name):
+    location = getattr(storage, "location", "")
+    return f"{location.rstrip('/')}/{name}" if location else name
+
+
+def iter_objects(storage, prefix, start_after=""):
+    """Yield (name, size, last modified) under `prefix`, in key order."""
+    if _is_s3(storage):
+        client = storage.connection.meta.client
+        location = getattr(storage, "location", "")
+        strip = len(location.rstrip("/")) + 1 if location else 0
+        kwargs = {"Bucket": storage.bucket_name, "Prefix": _s3_key(storage, prefix)}
+        if start_after:
+            kwargs["StartAfter"] = _s3_key(storage, start_after)
+        for page in client.get_paginator("list_objects_v2").paginate(**kwargs):
+            for obj in page.get("Contents", ()):
+                yield obj["Key"][strip:], obj["Size"], obj["LastModified"]
+        return
+
+    root = storage.path(prefix)
+    found = []
+    for dirpath, _dirs, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, "/")
+            if name > start_after:
+                found.append(name)
+    for name in sorted(found):
+        path = storage.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        yield (
+            name,
+            stat.st_size,
+            datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc),
+        )
+
+
+def delete_objects(storage, names):
+    """Delete `names`; returns the ones actually deleted."""
+    if not names:
+        return []
+    if not _is_s3(storage):
+        deleted = []
+        for name in names:
+            try:
+                storage.delete(name)
+                deleted.append(name)
+            except OSError as e:
+                log.warning("media gc: could not delete %s: %s", name, e)
+        return deleted
+
+    client = storage.connection.meta.client
+    failed = set()
+    for i in range(0, len(names), DELETE_BATCH):
+        batch = names[i : i + DELETE_BATCH]
+        resp = client.delete_objects(
+            Bucket=storage.bucket_name,
+            Delete={
+                "Objects": [{"Key": _s3_key(storage, n)} for n in batch],
+                "Quiet": True,
+            },
+        )
+        for err in resp.get("Errors", ()):
+            log.warning(
+                "media gc: could not delete %s: %s", err.get("Key"), err.get("Code")
+            )
+            failed.add(err.get("Key"))
+    return [n for n in names if _s3_key(storage, n) not in failed]
+
+
+def _still_referenced(names):
+    """Of `names`, those a row started using since the reference set was built."""
+    from users.models import Profile, Upload
+
+    hits = set()
+    for model, fields in (
+        (Profile, ("profile_picture", "cover_photo")),
+        (Upload, ("image", "video", "video_poster")),
+    ):
+        for field in fields:
+            hits.update(
+                model.objects.filter(**{f"{field}__in": names}).values_list(
+                    field, flat=True
+                )
+            )
+    return hits
+
+
+def collect_orphans(storage=None, dry_run=False, max_keys=None, only=None):
+    """Scan for (and unless `dry_run`, delete) orphaned media.
+
+    Resumes from the cached checkpoint and stops after scanning `max_keys`
+    keys (default MEDIA_GC["MAX_KEYS_PER_RUN"]). `only` scans just that
+    prefix, from the start. Returns a report:
+
+        {"complete": bool, "prefixes": {prefix: {"scanned", "orphans",
+         "bytes", "deleted", "sample"}}}
+
+    Dry runs and `only` runs neither read nor move the checkpoint.
+    """
+    from users.models import ImageFingerprint
+
+    storage = storage or default_storage
+    conf = settings.MEDIA_GC
+    budget = max_keys or conf["MAX_KEYS_PER_RUN"]
+    cutoff = timezone.now() - timedelta(hours=conf["MIN_AGE_HOURS"])
+    resumable = not (dry_run or only)
+    checkpoint = cache.get(CHECKPOINT_KEY) if resumable else None
+    names, hls_dirs = referenced_names(cutoff)
+
+    todo = [only] if only else list(prefixes())
+    if checkpoint and checkpoint[0] in todo:
+        todo = todo[todo.index(checkpoint[0]) :]
+    report = {"complete": True, "prefixes": {}}
+    scanned = 0
+
+    def flush(prefix, orphans, last_key):
+        stats = report["prefixes"][prefix]
+        if orphans and not dry_run:
+            live = _still_referenced(orphans)
+            doomed = [n for n in orphans if n not in live]
+            deleted = delete_objects(storage, doomed)
+            ImageFingerprint.objects.filter(name__in=deleted).delete()
+            stats["deleted"] += len(deleted)
+        if resumable:
+            cache.set(CHECKPOINT_KEY, (prefix, last_key), None)
+        orphans.clear()
+
+    for prefix in todo:
+        start = checkpoint[1] if checkpoint and checkpoint[0] == prefix else ""
+        stats = report["prefixes"][prefix] = {
+            "scanned": 0,
+            "orphans": 0,
+            "bytes": 0,
+            "deleted": 0,
+            "sample": [],
+        }
+        orphans, last_key = [], start
+        for name, size, modified in iter_objects(storage, prefix, start):
+            if scanned >= budget:
+                report["complete"] = False
+                break
+            scanned += 1
+            stats["scanned"] += 1
+            last_key = name
+            if (
+                modified >= cutoff
+                or name in names
+                or name.rsplit("/", 1)[0] + "/" in hls_dirs
+            ):
+                continue
+            stats["orphans"] += 1
+            stats["bytes"] += size
+            if len(stats["sample"]) < 20:
+                stats["sample"].append(name)
+            orphans.append(name)
+            if len(orphans) >= conf["BATCH_SIZE"]:
+                flush(prefix, orphans, last_key)
+        flush(prefix, orphans, last_key)
+        if not report["complete"]:
+            return report
+
+    if resumable:
+        cache.delete(CHECKPOINT_KEY)
+    return report
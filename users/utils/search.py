@@ -0,0 +1,68 @@
+"""
+Profile search over the FeedCard projection.
+
+On Postgres a row matches when the query hits the full-text vector over
+username / profession / location / bio (websearch syntax: quotes, -negation)
+or is trigram-similar to the username, profession or location — so typos
+like "kathk" or partial names still find people. Both predicates are served
+by the GIN indexes from migration 0018. Rank = ts_rank + best trigram
+similarity.
+
+Elsewhere (settings_sqlite) every query term must appear in one of the
+fields (icontains), with a flat rank — enough for local development.
+"""
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast, Greatest
+
+from users.models import FeedCard
+
+MAX_QUERY_LENGTH = 100
+SEARCH_FIELDS = ("username", "profession", "location", "bio")
+TRIGRAM_FIELDS = ("username", "profession", "location")
+
+
+def normalize_query(q):
+    """Collapse case and whitespace so equivalent queries share a cache entry."""
+    return " ".join((q or "").lower().split())[:MAX_QUERY_LENGTH]
+
+
+def search_feed_cards(q):
+    """FeedCards matching `q`, annotated with a float `rank` (higher is better)."""
+    if connection.vendor != "postgresql":
+        return _search_fallback(q)
+
+    # Must stay identical to SEARCH_VECTOR_SQL in migration 0018.
+    vector = SearchVector(*SEARCH_FIELDS, config="simple")
+    query = SearchQuery(q, config="simple", search_type="websearch")
+    trigram = Q()
+    for field in TRIGRAM_FIELDS:
+        trigram |= Q(**{f"{field}__trigram_similar": q})
+    return (
+        FeedCard.objects.alias(search=vector)
+        .filter(Q(search=query) | trigram)
+        .annotate(
+            rank=Cast(
+                SearchRank(vector, query)
+                + Greatest(*(TrigramSimilarity(f, q) for f in TRIGRAM_FIELDS)),
+                FloatField(),
+            )
+        )
+    )
+
+
+def _search_fallback(q):
+    qs = FeedCard.objects.all()
+    for term in q.split():
+        match = Q()
+        for field in SEARCH_FIELDS:
+            match |= Q(**{f"{field}__icontains": term})
+        qs = qs.filter(match)
+    return qs.annotate(rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,262 @@
+"""
+ffmpeg helpers for video processing: compression (single-pass or
+keyframe-aligned chunks), poster frames and HLS packaging.
+
+Compression targets ~1080p H.264 CRF 28 + AAC 128k with +faststart. For
+segment-parallel encoding the source is split at keyframes with stream copy
+(no re-encode, so cheap), each chunk is encoded video-only with the same
+settings, and the chunks are joined with the concat demuxer while the audio
+is encoded once from the original — so there are no AAC priming gaps at the
+joins.
+
+An HLS ladder is one H.264/AAC rendition per rung of settings.VIDEO_HLS
+["LADDER"], each cut into SEGMENT_SECONDS .ts segments with a media
+playlist, plus a master playlist listing the rungs by bandwidth:
+
+    <prefix>/master.m3u8
+    <prefix>/360p.m3u8   <prefix>/360p_000.ts ...
+    <prefix>/720p.m3u8   <prefix>/720p_000.ts ...
+
+Keyframes are forced every segment (fixed GOP, no scene-cut keyframes) so
+segment boundaries line up across rungs and players can switch cleanly.
+Rungs are sized by the short edge, so portrait phone videos get 360x640
+rather than 202x360.
+
+All helpers raise subprocess.CalledProcessError / TimeoutExpired / OSError
+on ffmpeg failure; callers own the non-regression fallback.
+"""
+
+import os
+import subprocess
+
+from django.conf import settings
+
+MASTER_PLAYLIST = "master.m3u8"
+
+# Fits inside 1920x1080 keeping aspect ratio.
+SCALE_1080 = (
+    "scale=w=1920:h=1080:force_original_aspect_ratio=decrease:force_divisible_by=2"
+)
+X264 = ["-c:v", "libx264", "-crf", "28", "-preset", "fast"]
+AAC = ["-c:a", "aac", "-b:a", "128k"]
+
+
+def _ffmpeg(args, timeout):
+    subprocess.run(["ffmpeg", *args], check=True, capture_output=True, timeout=timeout)
+
+
+def probe_duration(path, timeout=30):
+    """Container duration in seconds, via ffprobe."""
+    out = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "csv=p=0",
+            path,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    ).stdout
+    return float(out.strip())
+
+
+def compress_video(src, dst, timeout):
+    """Single-pass encode of `src` (video + audio) to `dst`."""
+    _ffmpeg(
+        ["-i", src, "-vf", SCALE_1080, *X264, *AAC]
+        + ["-movflags", "+faststart", "-y", dst],
+        timeout,
+    )
+
+
+def split_at_keyframes(src, out_dir, seconds, timeout):
+    """Stream-copy the video track into ~`seconds` chunks cut at keyframes.
+
+    Returns the chunk paths in playback order.
+    """
+    _ffmpeg(
+        ["-i", src, "-map", "0:v:0", "-c", "copy", "-an", "-f", "segment"]
+        + ["-segment_time", str(seconds), "-reset_timestamps", "1"]
+        + [os.path.join(out_dir, "chunk_%03d.mp4")],
+        timeout,
+    )
+    return [os.path.join(out_dir, n) for n in sorted(os.listdir(out_dir))]
+
+
+def encode_chunk(src, dst, timeout):
+    """Encode one video-only chunk with the single-pass video settings."""
+    _ffmpeg(["-i", src, "-vf", SCALE_1080, *X264, "-an", "-y", dst], timeout)
+
+
+def concat_with_audio(chunks, audio_src, dst, timeout):
+    """Join encoded chunks (stream copy) and add `audio_src`'s audio as AAC."""
+    listing = dst + ".txt"
+    with open(listing, "w") as f:
+        for path in chunks:
+            f.write(f"file '{path}'\n")
+    _ffmpeg(
+        ["-f", "concat", "-safe", "0", "-i", listing, "-i", audio_src]
+        + ["-map", "0:v", "-map", "1:a?", "-c:v", "copy", *AAC]
+        + ["-movflags", "+faststart", "-y", dst],
+        timeout,
+    )
+
+
+def probe_dimensions(path, timeout=30):
+    """(width, height) of the first video stream, via ffprobe."""
+    out = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height",
+            "-of",
+            "csv=p=0",
+            path,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    ).stdout
+    width, height = out.strip().split(",")[:2]
+    return int(width), int(height)
+
+
+def ladder_for(width, height):
+    """Rungs of the configured ladder that don't upscale the source.
+
+    Returns [(name, (w, h), video kbps)], smallest first. A source smaller
+    than the lowest rung still gets that one rung at native size.
+    """
+    short = min(width, height)
+    rungs = sorted(settings.VIDEO_HLS["LADDER"])
+    keep = [r for r in rungs if r[0] <= short] or [(short, rungs[0][1])]
+    out = []
+    for edge, kbps in keep:
+        scale = edge / short
+        # H.264 needs even dimensions
+        size = (round(width * scale / 2) * 2, round(height * scale / 2) * 2)
+        out.append((f"{edge}p", size, kbps))
+    return out
+
+
+def extract_poster(src, dst, timeout=60):
+    """Write a JPEG poster from ~1s in (or the first frame of a shorter clip)."""
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-ss",
+            "1",
+            "-i",
+            src,
+            "-frames:v",
+            "1",
+            "-vf",
+            "scale=w=1280:h=1280:force_original_aspect_ratio=decrease",
+            "-q:v",
+            "4",
+            "-update",
+            "1",
+            "-y",
+            dst,
+        ],
+        check=True,
+        capture_output=True,
+        timeout=timeout,
+    )
+    if not os.path.exists(dst):
+        # -ss past the end yields no frame; fall back to the first one
+        subprocess.run(
+            ["ffmpeg", "-i", src, "-frames:v", "1", "-q:v", "4", "-y", dst],
+            check=True,
+            capture_output=True,
+            timeout=timeout,
+        )
+
+
+def encode_rung(src, out_dir, name, size, kbps, timeout):
+    """Encode one ladder rung to `<out_dir>/<name>.m3u8` + segments."""
+    conf = settings.VIDEO_HLS
+    seg = conf["SEGMENT_SECONDS"]
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-i",
+            src,
+            "-vf",
+            f"scale={size[0]}:{size[1]}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "fast",
+            "-profile:v",
+            "main",
+            "-b:v",
+            f"{kbps}k",
+            "-maxrate",
+            f"{int(kbps * 1.07)}k",
+            "-bufsize",
+            f"{kbps * 2}k",
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{seg})",
+            "-sc_threshold",
+            "0",
+            "-c:a",
+            "aac",
+            "-b:a",
+            f"{conf['AUDIO_KBPS']}k",
+            "-ac",
+            "2",
+            "-f",
+            "hls",
+            "-hls_time",
+            str(seg),
+            "-hls_playlist_type",
+            "vod",
+            "-hls_segment_filename",
+            os.path.join(out_dir, f"{name}_%03d.ts"),
+            "-y",
+            os.path.join(out_dir, f"{name}.m3u8"),
+        ],
+        check=True,
+        capture_output=True,
+        timeout=timeout,
+    )
+
+
+def master_playlist(rungs):
+    """Master playlist text for [(name, (w, h), video kbps)] rungs."""
+    audio = settings.VIDEO_HLS["AUDIO_KBPS"]
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for name, (w, h), kbps in rungs:
+        # BANDWIDTH is the peak rate in bits/s: maxrate + audio
+        bandwidth = (int(kbps * 1.07) + audio) * 1000
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={w}x{h}")
+        lines.append(f"{name}.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def store_dir(storage, local_dir, prefix):
+    """Upload every file in `local_dir` under `prefix/`, keeping names exact.
+
+    Playlists reference segments by relative name, so keys must not get
+    storage's collision suffix: existing keys are overwritten.
+    """
+    names = []
+    for filename in sorted(os.listdir(local_dir)):
+        key = f"{prefix}/{filename}"
+        if storage.exists(key):
+            storage.delete(key)
+        with open(os.path.join(local_dir, filename), "rb") as f:
+            names.append(storage.save(key, f))
+    return names
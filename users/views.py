@@ -150,8 +150,9 @@ def profile(request):
 
 from django.db.models import Q
 from .forms import ProfessionFilterForm
-from django.core.paginator import Paginator
-from django.core.cache import cache
+from .api import payloads
+from myproject.cache_fill import cached
+from myproject.cache_registry import make_key
 
 
 @login_required
@@ -159,39 +160,37 @@ def global_feed(request):
     profession_filter_form = ProfessionFilterForm(request.GET or None)
     page_number = request.GET.get("page", "1")
     selected_profession = request.GET.get("professions", "")
-    professions_key = selected_profession or "all"
-    cache_key = f"web:feed:{page_number}:{professions_key}"
-
-    profiles_page = cache.get(cache_key)
-    if profiles_page is None:
-        profiles_qs = (
-            Profile.objects.select_related("user")
-            .only("user__id", "user__username", "profession", "profile_picture")
-            .order_by("id")
-        )
-        if profession_filter_form.is_valid():
-            professions = profession_filter_form.cleaned_data.get("professions")
-            if professions:
-                profiles_qs = profiles_qs.filter(profession__in=professions)
-        paginator = Paginator(profiles_qs, 20)
-        profiles_page = paginator.get_page(page_number)
-        cache.set(cache_key, profiles_page, 60)
-
-    # profiles_page is cached and shared across users, so self-exclusion
-    # happens post-cache (same pattern as GlobalFeedAPIView). Django's
-    # {% empty %} tag can't see past the template's inner self-check, so
-    # compute visibility explicitly for the empty-state message.
-    has_visible_profiles = any(p.user_id != request.user.id for p in profiles_page)
+    professions = []
+    if profession_filter_form.is_valid():
+        professions = profession_filter_form.cleaned_data.get("professions") or []
+
+    # Same cached payloads as GlobalFeedAPIView (users.api.payloads): plain
+    # dicts, one Redis entry per page/filter for both the app and the web.
+    # ?cursor= opts into keyset pagination: no COUNT(*), no OFFSET, just
+    # "Next" links carrying the opaque cursor.
+    cursor_mode = "cursor" in request.GET
+    if cursor_mode:
+        data = payloads.feed_keyset(request, request.GET.get("cursor", ""), professions)
+        page = None
+    else:
+        data = payloads.feed_page(request, page_number, professions)
+        page = {k: v for k, v in data.items() if k != "results"}
+
+    # The payload is shared across users, so self-exclusion happens
+    # post-cache (same pattern as GlobalFeedAPIView). The viewer still counts
+    # towards page.count — the cached total can't know who's asking.
+    profiles = [p for p in data["results"] if p["user_id"] != request.user.id]
 
     return render(
         request,
         "users/global_feed.html",
         {
-            "profiles": profiles_page,
+            "profiles": profiles,
+            "page": page,
             "profession_filter_form": profession_filter_form,
             "selected_profession": selected_profession,
-            "current_user_id": request.user.id,
-            "has_visible_profiles": has_visible_profiles,
+            "cursor_mode": cursor_mode,
+            "next_cursor": data.get("next_cursor"),
         },
     )
 
@@ -204,10 +203,9 @@ def profile_detail(request, user_id):
     from datetime import date
     from bookings.models import Engagement
 
-    cache_key = f"web:profile:{user_id}"
-    cached = cache.get(cache_key)
+    cache_key = make_key("web:profile", entity=user_id)
 
-    if cached is None:
+    def compute():
         user_profile = get_object_or_404(
             Profile.objects.select_related("user"),
             user__id=user_id,
@@ -221,16 +219,16 @@ def profile_detail(request, user_id):
             status=Engagement.STATUS_ACCEPTED,
             date__lt=today,
         )
-        cached = {
+        return {
             "profile": user_profile,
             "uploads": uploads,
             "gigs_count": gig_qs.count(),
             "last_engagement": gig_qs.order_by("-date").first(),
         }
-        cache.set(cache_key, cached, 60)
 
+    context = cached(cache_key, 300, compute)
     viewer = request.user
-    profile = cached["profile"]
+    profile = context["profile"]
     hire_state = "none"
     if viewer.is_authenticated and viewer != profile.user and profile.is_performer:
         if viewer.profile.client_blacklisted:
@@ -246,7 +244,7 @@ def profile_detail(request, user_id):
         request,
         "users/profile_detail.html",
         {
-            **cached,
+            **context,
             "hire_state": hire_state,
         },
     )
@@ -460,45 +458,26 @@ def message_thread(request, user_id):
 from datetime import date
 from .models import Message
 
-from bookings.models import Engagement
 from datetime import date
 
 
 @login_required
 def live_events(request):
-    """Upcoming + past accepted engagements, optimized + paginated."""
-    page_number = request.GET.get("page", "1")
-    cache_key = f"web:events:{page_number}"
-    cached = cache.get(cache_key)
+    """Upcoming (paginated) + recent past accepted engagements.
 
-    if cached is None:
-        today = date.today()
-        events_qs = (
-            Engagement.objects.filter(
-                status=Engagement.STATUS_ACCEPTED,
-                date__gte=today,
-            )
-            .select_related("client", "performer", "performer__profile")
-            .order_by("date", "time")
-        )
-        paginator = Paginator(events_qs, 10)
-        page_obj = paginator.get_page(page_number)
-        past_events = list(
-            Engagement.objects.filter(
-                status=Engagement.STATUS_ACCEPTED,
-                date__lt=today,
-            )
-            .select_related("client", "performer", "performer__profile")
-            .order_by("-date", "-time")[:20]
-        )
-        cached = {
-            "events": page_obj.object_list,
-            "page_obj": page_obj,
-            "past_events": past_events,
-        }
-        cache.set(cache_key, cached, 60)
-
-    return render(request, "users/live_events.html", cached)
+    Renders the cached LiveEventsAPIView payloads (users.api.payloads), so the
+    app and the web share one Redis entry per page.
+    """
+    data = payloads.events_page("upcoming", request.GET.get("page", "1"))
+    return render(
+        request,
+        "users/live_events.html",
+        {
+            "events": data["results"],
+            "page": {k: v for k, v in data.items() if k != "results"},
+            "past_events": payloads.recent_past_events(),
+        },
+    )
 
 
 # ---------------------------------------------------------------------------